@@ -0,0 +1,48 @@
+"""
+deckgen - shared rendering engine for the leijunskill PPT generators.
+
+Usage from a generator script::
+
+    from deckgen import DeckEngine
+
+    deck = DeckEngine()
+    deck.content_slide("汇报大纲", ["1. ...", "2. ..."], notes)
+    deck.save(out_path)
+
+For 500+ slide decks, ``StreamingDeckWriter(out_path)`` has the same page
+methods but writes each slide to the zip as it is added.
+"""
+
+import importlib
+
+# name -> submodule; resolved on first access (PEP 562) so that ``import
+# deckgen.lint`` or ``python -m deckgen lint`` does not load python-pptx.
+_EXPORTS = {
+    "BG_COLOR": "engine",
+    "DEEPSEEK_GREEN": "engine",
+    "GOLD": "engine",
+    "LIGHT_GRAY": "engine",
+    "THEME": "engine",
+    "TIANYI_BLUE": "engine",
+    "WHITE": "engine",
+    "ZONED_THEME": "engine",
+    "DeckEngine": "engine",
+    "StreamingDeckWriter": "writer",
+    "compile_theme": "engine",
+    "derive_theme": "engine",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
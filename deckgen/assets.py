@@ -0,0 +1,146 @@
+"""
+Image caches shared by every deck rendered in one process (or across runs).
+
+Generators reference the same illustrations (``IMG_NGRAM``, ``IMG_PREFETCH`` ...)
+across many decks. ``ImageCache`` reads each file once per process;
+``AssetCache`` additionally keeps downscaled, recompressed renditions on disk,
+keyed by content hash and display box, so a 2K PNG shown 6.3" wide is embedded
+at the chosen DPI instead of full resolution.
+
+Set ``DECKGEN_ASSET_CACHE=<dir>`` (and optionally ``DECKGEN_ASSET_DPI``) to make
+every DeckEngine, including the ones in the generate_*.py scripts, use it.
+"""
+
+import hashlib
+import io
+import os
+
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+
+
+class ImageCache:
+    """Path -> image bytes, read on first use and again when the file changes."""
+
+    def __init__(self):
+        self._blobs = {}
+
+    def _load(self, img_path, width=None, height=None):
+        with open(img_path, "rb") as f:
+            return f.read()
+
+    def open(self, img_path, width=None, height=None):
+        """Return a fresh stream over ``img_path``'s bytes, or None if it is missing.
+
+        ``width`` / ``height`` are the display size in inches (either may be None);
+        the plain cache ignores them.
+        """
+        if not img_path:
+            return None
+        try:
+            st = os.stat(img_path)
+        except OSError:
+            return None
+        key = (img_path, width, height)
+        stamp = (st.st_size, st.st_mtime_ns)
+        entry = self._blobs.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = self._blobs[key] = (stamp, self._load(img_path, width, height))
+        return io.BytesIO(entry[1])
+
+    def source(self, img_path, width=None, height=None):
+        """Path of the file whose bytes ``open`` returns, or None if ``img_path`` is missing.
+
+        StreamingDeckWriter maps this file instead of holding its bytes.
+        """
+        return img_path if img_path and os.path.exists(img_path) else None
+
+    def __len__(self):
+        return len(self._blobs)
+
+
+def _write_atomic(path, data):
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class AssetCache(ImageCache):
+    """On-disk renditions keyed by (content sha256, display box, dpi).
+
+    Source digests are remembered per (path, size, mtime), so warm runs neither
+    re-read nor re-hash the originals. Images with alpha stay PNG, opaque ones
+    are recompressed as JPEG; images are never upscaled.
+    """
+
+    def __init__(self, cache_dir, dpi=DEFAULT_DPI):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        for sub in ("index", "renditions"):
+            os.makedirs(os.path.join(cache_dir, sub), exist_ok=True)
+
+    def digest(self, img_path):
+        """sha256 of ``img_path``'s content, via the stat-keyed index."""
+        st = os.stat(img_path)
+        stat_key = "%s|%d|%d" % (os.path.abspath(img_path), st.st_size, st.st_mtime_ns)
+        index_path = os.path.join(self.cache_dir, "index", hashlib.sha1(stat_key.encode("utf-8")).hexdigest())
+        try:
+            with open(index_path) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            pass
+        h = hashlib.sha256()
+        with open(img_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _write_atomic(index_path, digest.encode("ascii"))
+        return digest
+
+    def rendition_path(self, img_path, width=None, height=None):
+        """Path of the cached rendition for this display box, creating it if needed."""
+        box = "%sx%s" % (width or "-", height or "-")
+        stem = "%s_%s@%d" % (self.digest(img_path)[:32], box, self.dpi)
+        for ext in (".png", ".jpg"):
+            path = os.path.join(self.cache_dir, "renditions", stem + ext)
+            if os.path.exists(path):
+                return path
+        data, ext = self._render(img_path, width, height)
+        path = os.path.join(self.cache_dir, "renditions", stem + ext)
+        _write_atomic(path, data)
+        return path
+
+    def _render(self, img_path, width, height):
+        from PIL import Image
+
+        with Image.open(img_path) as img:
+            img.load()
+            max_w = round(width * self.dpi) if width else img.width
+            max_h = round(height * self.dpi) if height else img.height
+            if img.width > max_w or img.height > max_h:
+                img.thumbnail((max_w, max_h), Image.LANCZOS)
+            buf = io.BytesIO()
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            if has_alpha:
+                img.save(buf, "PNG", optimize=True, dpi=(self.dpi, self.dpi))
+                return buf.getvalue(), ".png"
+            img.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, dpi=(self.dpi, self.dpi))
+            return buf.getvalue(), ".jpg"
+
+    def _load(self, img_path, width=None, height=None):
+        return super()._load(self.rendition_path(img_path, width, height))
+
+    def source(self, img_path, width=None, height=None):
+        if not super().source(img_path):
+            return None
+        return self.rendition_path(img_path, width, height)
+
+
+def default_images():
+    """AssetCache configured from ``DECKGEN_ASSET_CACHE``, or None when unset."""
+    cache_dir = os.environ.get("DECKGEN_ASSET_CACHE")
+    if not cache_dir:
+        return None
+    return AssetCache(cache_dir, dpi=int(os.environ.get("DECKGEN_ASSET_DPI", DEFAULT_DPI)))
@@ -0,0 +1,125 @@
+"""
+Process-pool batch renderer: builds many decks concurrently, one per core.
+
+Targets are deck specs (``.json`` / ``.yaml``) or the legacy ``generate_*.py``
+scripts (their single ``create_*`` entry point is called with the output
+directory as cwd). Each worker process keeps a warm DeckBuilder for its output
+directory and options, results are streamed back as decks finish, and the
+first failure cancels everything still queued.
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import re
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+
+SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+
+_builder = None
+_builder_key = None  # (out_dir, options) _builder was made for
+
+
+class BatchError(RuntimeError):
+    """A deck in the batch failed; ``target`` names it."""
+
+    def __init__(self, target, cause):
+        super().__init__("%s: %s: %s" % (target, type(cause).__name__, cause))
+        self.target = target
+
+
+def _key(out_dir, options):
+    return out_dir, sorted((options or {}).items())
+
+
+def _init_worker(out_dir, options=None):
+    global _builder, _builder_key
+    from .spec import DeckBuilder
+
+    _builder = DeckBuilder(out_dir=out_dir, **(options or {}))
+    _builder_key = _key(out_dir, options)
+
+
+def _entry_point(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    entries = [getattr(module, n) for n in dir(module) if n.startswith("create_") and callable(getattr(module, n))]
+    if len(entries) != 1:
+        raise ValueError("expected exactly one create_* function, found %d" % len(entries))
+    return entries[0]
+
+
+def _run_script(path, out_dir):
+    entry = _entry_point(os.path.abspath(path))
+    cwd = os.getcwd()
+    out = io.StringIO()
+    os.makedirs(out_dir, exist_ok=True)
+    os.chdir(out_dir)
+    try:
+        with contextlib.redirect_stdout(out):
+            entry()
+    finally:
+        os.chdir(cwd)
+    saved = re.search(r"Presentation saved to: (.+)", out.getvalue())
+    slides = re.search(r"Total slides: (\d+)", out.getvalue())
+    return (saved.group(1).strip() if saved else None), (int(slides.group(1)) if slides else None)
+
+
+def build_one(target, out_dir=None, options=None):
+    """Build a single target in the current process; returns a result dict.
+
+    ``options`` are DeckBuilder keyword arguments (``stream``, ``incremental``, ``autofit``).
+    The process's builder is reused while ``out_dir`` and ``options`` stay the same.
+    """
+    start = time.perf_counter()
+    if target.endswith(SPEC_SUFFIXES):
+        if _builder is None or _builder_key != _key(out_dir, options):
+            _init_worker(out_dir, options)
+        out_path, slides = _builder.build(target)
+    else:
+        out_path, slides = _run_script(target, out_dir or os.getcwd())
+    return {
+        "target": target,
+        "output": out_path,
+        "slides": slides,
+        "seconds": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+
+def default_jobs():
+    return os.cpu_count() or 1
+
+
+def run_batch(targets, jobs=None, out_dir=None, on_result=None, **options):
+    """Build ``targets`` across ``jobs`` processes (default: one per core).
+
+    ``options`` are passed to each worker's DeckBuilder (``stream``, ``incremental``, ``autofit``).
+    ``on_result(result)`` is called as each deck finishes. On the first failure
+    queued builds are cancelled and BatchError is raised. Returns the results
+    in completion order.
+    """
+    jobs = min(jobs or default_jobs(), len(targets)) or 1
+    out_dir = os.path.abspath(out_dir) if out_dir else None
+    results = []
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(out_dir, options))
+    try:
+        pending = {pool.submit(build_one, t, out_dir, options): t for t in targets}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_EXCEPTION)
+            for future in done:
+                target = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    raise BatchError(target, error)
+                results.append(future.result())
+                if on_result is not None:
+                    on_result(results[-1])
+    finally:
+        # On failure this drops everything still queued; on success it is a no-op.
+        pool.shutdown(wait=True, cancel_futures=True)
+    return results
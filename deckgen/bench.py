@@ -0,0 +1,195 @@
+"""
+Benchmark harness with regression gating for deck builds.
+
+Each target -- a ``generate_*.py`` script (its ``create_*`` entry point) or a
+deck spec -- is built ``runs`` times, every run in a fresh interpreter so
+imports, caches and peak RSS are measured from a cold start. Per target the
+harness records:
+
+* ``seconds``  -- median wall time of the build inside the child process;
+* ``peak_rss`` -- largest peak resident set size over the runs, in bytes
+  (where the ``resource`` module exists; on Windows ``peak_traced``, the
+  tracemalloc peak of Python allocations, is recorded instead);
+* ``size``     -- the output .pptx size in bytes;
+* ``parts``    -- compressed bytes per part group (slides, notes, media, other).
+
+``compare()`` checks a run against a stored baseline and reports every metric
+that grew past its threshold (relative, with a small absolute slack for
+timings), which ``python -m deckgen bench`` turns into a non-zero exit.
+"""
+
+import collections
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import pptx
+
+from .assets import _write_atomic
+
+BASELINE_VERSION = 1
+DEFAULT_RUNS = 3
+# metric -> allowed relative growth over the baseline
+THRESHOLDS = {"seconds": 0.25, "peak_rss": 0.20, "peak_traced": 0.20, "size": 0.05, "parts": 0.05}
+# peak memory metric recorded on this platform (see _child)
+MEMORY_METRIC = "peak_rss" if resource is not None else "peak_traced"
+TIME_SLACK = 0.05  # seconds; smaller slowdowns are noise
+PART_GROUPS = (
+    ("slides", "ppt/slides/"),
+    ("notes", "ppt/notesSlides/"),
+    ("media", "ppt/media/"),
+)
+
+Regression = collections.namedtuple("Regression", "target metric baseline current limit")
+
+
+class BenchError(RuntimeError):
+    """A benchmark run failed; ``target`` names it."""
+
+    def __init__(self, target, detail):
+        super().__init__("%s: %s" % (target, detail))
+        self.target = target
+
+
+def part_sizes(pptx_path):
+    """Compressed bytes of ``pptx_path`` per part group (see ``PART_GROUPS``)."""
+    sizes = dict.fromkeys([name for name, _ in PART_GROUPS] + ["other"], 0)
+    with zipfile.ZipFile(pptx_path) as zf:
+        for info in zf.infolist():
+            group = next((name for name, prefix in PART_GROUPS if info.filename.startswith(prefix)), "other")
+            sizes[group] += info.compress_size
+    return sizes
+
+
+def _peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # kilobytes on Linux
+
+
+def _child(target, out_dir, options):
+    """Run one build in this (fresh) process and print its measurements as JSON."""
+    from .batch import build_one
+
+    if resource is None:
+        tracemalloc.start()
+    result = build_one(target, out_dir, options)
+    peak = _peak_rss() if resource is not None else tracemalloc.get_traced_memory()[1]
+    output = result["output"]
+    if not output or not os.path.exists(output):
+        raise BenchError(target, "no output reported")
+    print(json.dumps({
+        "seconds": result["seconds"],
+        MEMORY_METRIC: peak,
+        "size": os.path.getsize(output),
+        "parts": part_sizes(output),
+        "slides": result["slides"],
+    }))
+
+
+def run_once(target, options=None):
+    """Build ``target`` once in a new interpreter; returns its measurement dict."""
+    out_dir = tempfile.mkdtemp(prefix="deckgen-bench-")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "deckgen.bench", os.path.abspath(target), out_dir, json.dumps(options or {})],
+            capture_output=True, text=True, env=env,
+        )
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            raise BenchError(target, lines[-1] if lines else "exit status %d" % proc.returncode)
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def run_target(target, runs=DEFAULT_RUNS, options=None):
+    """Median time / max peak memory over ``runs`` isolated builds of ``target``."""
+    samples = [run_once(target, options) for _ in range(runs)]
+    last = samples[-1]
+    return {
+        "seconds": statistics.median(s["seconds"] for s in samples),
+        MEMORY_METRIC: max(s[MEMORY_METRIC] for s in samples),
+        "size": last["size"],
+        "parts": last["parts"],
+        "slides": last["slides"],
+        "runs": runs,
+    }
+
+
+def run_suite(targets, runs=DEFAULT_RUNS, options=None, on_result=None):
+    """``{target name: metrics}`` for every target; targets are keyed by basename."""
+    results = {}
+    for target in targets:
+        start = time.perf_counter()
+        results[os.path.basename(target)] = metrics = run_target(target, runs, options)
+        if on_result is not None:
+            on_result(target, metrics, time.perf_counter() - start)
+    return results
+
+
+def environment():
+    return {"python": platform.python_version(), "pptx": pptx.__version__, "machine": platform.machine()}
+
+
+def load_baseline(path):
+    """Stored results from ``path``, or None when there is no usable baseline."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if data.get("version") == BASELINE_VERSION else None
+
+
+def save_baseline(path, results, baseline=None):
+    """Write ``results`` to ``path``, keeping baseline entries for targets not re-run."""
+    targets = dict(baseline["targets"]) if baseline else {}
+    targets.update(results)
+    data = {"version": BASELINE_VERSION, "environment": environment(), "targets": targets}
+    _write_atomic(path, json.dumps(data, indent=1, sort_keys=True).encode("utf-8"))
+
+
+def _grew(target, metric, old, new, limit, slack=0):
+    if old and new > old * (1 + limit) + slack:
+        return Regression(target, metric, old, new, limit)
+    return None
+
+
+def compare(baseline, results, thresholds=None):
+    """Regressions of ``results`` against ``baseline``; targets missing from it are skipped."""
+    limits = dict(THRESHOLDS, **(thresholds or {}))
+    found = []
+    for target, current in sorted(results.items()):
+        old = baseline["targets"].get(target)
+        if old is None:
+            continue
+        checks = [
+            _grew(target, "seconds", old["seconds"], current["seconds"], limits["seconds"], TIME_SLACK),
+            _grew(target, "size", old["size"], current["size"], limits["size"]),
+        ]
+        # only compare memory measured the same way (RSS vs tracemalloc)
+        checks += [_grew(target, metric, old[metric], current[metric], limits[metric])
+                   for metric in ("peak_rss", "peak_traced") if metric in old and metric in current]
+        for group, size in sorted(current["parts"].items()):
+            checks.append(_grew(target, "parts." + group, old["parts"].get(group, 0), size, limits["parts"]))
+        found.extend(r for r in checks if r is not None)
+    return found
+
+
+if __name__ == "__main__":
+    _child(sys.argv[1], sys.argv[2], json.loads(sys.argv[3]))
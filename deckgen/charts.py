@@ -0,0 +1,145 @@
+"""
+Native PPTX charts for the chart page type, styled for the dark deck theme.
+
+``BaseDeck.chart_slide`` puts a ``(CHART, spec)`` entry in the page's shape
+list, where ``spec`` is plain data (box, chart type, categories, series,
+number format, theme style). DeckEngine hands it to python-pptx's
+``add_chart``; StreamingDeckWriter writes the same chart and workbook parts
+itself via ``chart_parts``. Either way the chart is built from
+``CategoryChartData`` and styled by ``style_chart``: theme text colour and
+size, dim grid lines, series colours from the theme palette, value labels,
+legend only for multi-series charts, no chart background so the slide's
+``BG_COLOR`` shows through.
+
+The embedded workbook needs XlsxWriter, as for any python-pptx chart. Its
+creation date is pinned like the deck's in reproducible builds.
+"""
+
+import copy
+import io
+import zipfile
+
+from pptx.chart.chart import Chart
+from pptx.chart.data import CategoryChartData
+from pptx.dml.color import RGBColor
+from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
+from pptx.opc.oxml import serialize_part_xml
+from pptx.oxml import parse_xml
+from pptx.oxml.shapes.graphfrm import CT_GraphicalObjectFrame
+from pptx.util import Pt
+
+from .engine import _NSDECLS
+from .package import copy_entry, source_date, stamp_core
+
+CHART_TYPES = {
+    "column": XL_CHART_TYPE.COLUMN_CLUSTERED,
+    "stacked": XL_CHART_TYPE.COLUMN_STACKED,
+    "bar": XL_CHART_TYPE.BAR_CLUSTERED,
+    "line": XL_CHART_TYPE.LINE_MARKERS,
+    "pie": XL_CHART_TYPE.PIE,
+}
+
+
+def chart_type(spec):
+    return CHART_TYPES[spec["type"]]
+
+
+class _ChartData(CategoryChartData):
+    @property
+    def xlsx_blob(self):
+        blob = super().xlsx_blob
+        if source_date() is None:
+            return blob
+        # XlsxWriter dates its entries 1980-01-01 but stamps core.xml with the current time
+        out = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(blob)) as src, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename == "docProps/core.xml":
+                    dst.writestr(copy.copy(info), stamp_core(src.read(info).decode("utf-8")))
+                else:
+                    copy_entry(src, dst, info.filename)
+        return out.getvalue()
+
+
+def chart_data(spec):
+    data = _ChartData(number_format=spec.get("number_format") or "General")
+    data.categories = spec["categories"]
+    for name, values in spec["series"]:
+        data.add_series(name, values)
+    return data
+
+
+def style_chart(chart, spec):
+    """Apply the theme's dark chart style (``spec["style"]``) to a python-pptx Chart."""
+    style = spec["style"]
+    text = RGBColor.from_string(style["text_color"])
+    grid = RGBColor.from_string(style["grid_color"])
+    colors = [RGBColor.from_string(c) for c in style["colors"]]
+    pie = spec["type"] == "pie"
+
+    chart.font.size = Pt(style["font_size"])
+    chart.font.color.rgb = text
+    chart.has_legend = pie or len(spec["series"]) > 1
+    if chart.has_legend:
+        chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+        chart.legend.include_in_layout = False
+        chart.legend.font.color.rgb = text
+
+    plot = chart.plots[0]
+    plot.has_data_labels = True
+    labels = plot.data_labels
+    labels.font.size = Pt(style["label_size"])
+    labels.font.bold = True
+    labels.font.color.rgb = text
+    if spec.get("number_format"):
+        labels.number_format = spec["number_format"]
+        labels.number_format_is_linked = False
+    if hasattr(plot, "gap_width"):
+        plot.gap_width = style["gap_width"]
+    if pie:
+        for i, point in enumerate(plot.series[0].points):
+            point.format.fill.solid()
+            point.format.fill.fore_color.rgb = colors[i % len(colors)]
+        return
+
+    for i, series in enumerate(plot.series):
+        color = colors[i % len(colors)]
+        if spec["type"] == "line":
+            series.format.line.color.rgb = color
+            series.format.line.width = Pt(3)
+            series.smooth = False
+        else:
+            series.format.fill.solid()
+            series.format.fill.fore_color.rgb = color
+    value_axis, category_axis = chart.value_axis, chart.category_axis
+    value_axis.has_major_gridlines = True
+    value_axis.major_gridlines.format.line.color.rgb = grid
+    value_axis.format.line.fill.background()
+    value_axis.tick_labels.font.color.rgb = text
+    category_axis.format.line.color.rgb = grid
+    category_axis.tick_labels.font.color.rgb = text
+    category_axis.tick_labels.font.size = Pt(style["font_size"])
+
+
+def graphic_frame(shape_id, rid, x, y, cx, cy):
+    """The ``p:graphicFrame`` XML python-pptx's ``add_chart`` writes for a chart.
+
+    The frame is serialized inside a slide's ``p:spTree``, whose root declares
+    the ``a``/``p``/``r`` namespaces, so the fragment does not repeat them.
+    """
+    from lxml import etree
+
+    slide = parse_xml("<p:sld %s><p:cSld><p:spTree/></p:cSld></p:sld>" % _NSDECLS)
+    slide[0][0].append(
+        CT_GraphicalObjectFrame.new_chart_graphicFrame(shape_id, "Chart %d" % (shape_id - 1), rid, x, y, cx, cy))
+    xml = etree.tostring(slide, encoding="unicode")
+    return xml[xml.index("<p:spTree>") + len("<p:spTree>"):xml.rindex("</p:spTree>")]
+
+
+def chart_parts(spec, workbook_rid="rId1"):
+    """``(chart XML bytes, xlsx bytes)`` as ``ChartPart.new`` + ``style_chart`` produce them."""
+    data = chart_data(spec)
+    chart_space = parse_xml(data.xml_bytes(chart_type(spec)))
+    style_chart(Chart(chart_space, None), spec)
+    chart_space.get_or_add_externalData().rId = workbook_rid
+    return serialize_part_xml(chart_space), data.xlsx_blob
@@ -0,0 +1,566 @@
+"""
+Command line entry point: ``python -m deckgen <command> ...``.
+
+Commands:
+    build-deck SPEC [SPEC ...]   render deck specs (JSON/YAML) in one process
+    batch TARGET [TARGET ...]    render specs and generate_*.py scripts across cores
+    overflow SPEC [SPEC ...]     font-metrics overflow check of spec text boxes
+    lint PPTX [PPTX ...]         zone / image / signature checks of built decks
+    preview PPTX [PPTX ...]      PNG thumbnails and a contact sheet per deck (Pillow)
+    slides PPTX [PPTX ...]       list each slide's title, shapes and notes
+    validate SPEC [SPEC ...]     check deck specs without rendering them
+    notes-export SRC [SRC ...]   dump every slide's speaker notes as JSON lines
+    notes-index SRC [SRC ...]    add decks / specs to the speaker-notes search index
+    notes-patch PPTX NOTES       rewrite only the speaker notes of a built deck
+    notes-search QUERY           search the index (CJK bigrams + words)
+    bench [TARGET ...]           time isolated builds and gate on a stored baseline
+    merge PPTX [PPTX ...] -o OUT concatenate decks into one, storing shared media once
+    embed-fonts PPTX [PPTX ...]  embed the deck's fonts, subset to the glyphs it uses
+    personalize DECK PRESENTERS  one signed copy per presenter, without rebuilding
+    serve [--port N | --socket PATH]  render daemon: POST a spec, get the .pptx back
+    import-budget                check that inspection commands start without python-pptx
+
+Commands import only the modules they use; python-pptx is loaded by the build
+commands alone, so inspection stays well under 100ms.
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+
+
+def cmd_build_deck(args):
+    from .spec import DeckBuilder, SpecError
+
+    builder = DeckBuilder(out_dir=args.out_dir, stream=args.stream, incremental=args.incremental,
+                          autofit=args.autofit)
+    failed = 0
+    for path in args.specs:
+        start = time.perf_counter()
+        try:
+            out_path, count = builder.build(path)
+        except (OSError, SpecError) as e:
+            print("error: %s" % e, file=sys.stderr)
+            failed += 1
+            continue
+        print("%s -> %s (%d slides, %.2fs)" % (path, out_path, count, time.perf_counter() - start))
+    return 1 if failed else 0
+
+
+def cmd_overflow(args):
+    from .metrics import LayoutDeck, OverflowCheck, TextMeasurer
+    from .spec import SpecError, load_spec, render_spec, theme_for
+
+    measurer = TextMeasurer(latin=args.font, cjk=args.cjk_font)
+    failed = 0
+    for path in args.specs:
+        try:
+            spec = load_spec(path)
+        except (OSError, SpecError) as e:
+            print("error: %s" % e, file=sys.stderr)
+            failed += 1
+            continue
+        deck = render_spec(spec, LayoutDeck(theme_for(spec), OverflowCheck(measurer)))
+        found = deck.overflow.measure() if args.all else deck.overflow.run()
+        for o in found:
+            print('%s: slide %d (%s) %s: %d line(s), %.2f" x %.2f" in a %.2f" x %.2f" box' % (
+                path, o.slide, o.kind, o.shape, o.lines, o.width, o.height, o.max_width, o.max_height))
+        failed += bool(deck.overflow.run())
+    return 1 if failed else 0
+
+
+def cmd_lint(args):
+    from .lint import lint_deck
+
+    failed = 0
+    for path in args.decks:
+        try:
+            violations = lint_deck(path, signature=args.signature)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            print("error: %s: %s" % (path, e), file=sys.stderr)
+            failed += 1
+            continue
+        for v in violations:
+            print("%s: slide %d: %s: [%s] %s" % (v.path, v.slide, v.shape, v.rule, v.message))
+        failed += bool(violations)
+    return 1 if failed else 0
+
+
+def cmd_slides(args):
+    from .outline import outline
+
+    failed = 0
+    for path in args.decks:
+        try:
+            slides = outline(path)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            print("error: %s: %s" % (path, e), file=sys.stderr)
+            failed += 1
+            continue
+        for s in slides:
+            notes = s.notes.replace("\n", " ").strip()
+            if not args.notes and len(notes) > 40:
+                notes = notes[:40] + "..."
+            print("%s: %3d  %-40s %2d shapes %d pic  %s" % (path, s.number, s.title[:40], s.shapes, s.pictures, notes))
+    return 1 if failed else 0
+
+
+def cmd_preview(args):
+    from .preview import render_decks
+
+    def report(result):
+        path, count, written = result
+        print("%s: %d slides -> %s" % (path, count, written[-1] if written else "-"), flush=True)
+
+    start = time.perf_counter()
+    try:
+        results = render_decks(args.decks, args.out_dir, jobs=args.jobs, on_result=report,
+                               width=args.width, thumbs=not args.sheet_only)
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        print("error: %s" % e, file=sys.stderr)
+        return 1
+    print("%d slides from %d decks in %.2fs" % (sum(r[1] for r in results), len(results), time.perf_counter() - start))
+    return 0
+
+
+def cmd_validate(args):
+    from .spec import SpecError, _image, load_spec
+
+    failed = 0
+    for path in args.specs:
+        try:
+            spec = load_spec(path)
+        except (OSError, SpecError) as e:
+            print("error: %s" % e, file=sys.stderr)
+            failed += 1
+            continue
+        missing = sorted({
+            img for img in (_image(spec, slide.get("image")) for slide in spec["slides"])
+            if img and not os.path.exists(img)
+        })
+        for img in missing:
+            print("%s: warning: image not found (slide renders without it): %s" % (path, img))
+        print("%s: ok, %d slides" % (path, len(spec["slides"])))
+    return 1 if failed else 0
+
+
+def cmd_notes_export(args):
+    from .notesindex import export_notes
+
+    try:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                count = export_notes(args.sources, f)
+        else:
+            count = export_notes(args.sources, sys.stdout)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        print("error: %s" % e, file=sys.stderr)
+        return 1
+    print("%d slides exported" % count, file=sys.stderr)
+    return 0
+
+
+def cmd_notes_index(args):
+    from .notesindex import index_sources
+
+    start = time.perf_counter()
+    try:
+        index, added = index_sources(args.sources, args.index)
+    except (OSError, ValueError, KeyError) as e:
+        print("error: %s" % e, file=sys.stderr)
+        return 1
+    print("%s: %d slides from %d sources (%d re-indexed, %.2fs)" % (
+        args.index, len(index), len(index.sources), added, time.perf_counter() - start))
+    return 0
+
+
+def cmd_notes_patch(args):
+    from .lint import slide_names
+    from .notespatch import NotesPatchError, load_notes, patch_notes
+    from .spec import SpecError
+
+    start = time.perf_counter()
+    try:
+        with zipfile.ZipFile(args.deck) as zf:
+            count = len(slide_names(zf))
+        changed = patch_notes(args.deck, load_notes(args.notes, count), args.output)
+    except (OSError, KeyError, zipfile.BadZipFile, SpecError, NotesPatchError) as e:
+        print("error: %s" % e, file=sys.stderr)
+        return 1
+    print("%s: notes of %d of %d slides rewritten%s (%.0f ms)" % (
+        args.output or args.deck, len(changed), count,
+        " (%s)" % ", ".join(map(str, changed)) if changed else "", (time.perf_counter() - start) * 1000))
+    return 0
+
+
+def cmd_notes_search(args):
+    from .notesindex import NotesIndex, snippet
+
+    if not os.path.exists(args.index):
+        print("error: no index at %s (run notes-index first)" % args.index, file=sys.stderr)
+        return 1
+    index = NotesIndex.load(args.index)
+    start = time.perf_counter()
+    hits = index.search(args.query, limit=args.limit)
+    elapsed = time.perf_counter() - start
+    for h in hits:
+        print("%6.2f  %s: slide %d  %s\n        %s" % (
+            h.score, os.path.relpath(h.source), h.slide, h.title, snippet(h.notes, args.query)))
+    print("%d hit(s) in %.1f ms over %d slides" % (len(hits), elapsed * 1000, len(index)), file=sys.stderr)
+    return 0 if hits else 1
+
+
+def cmd_batch(args):
+    from .batch import BatchError, default_jobs, run_batch
+
+    jobs = args.jobs or default_jobs()
+    total = len(args.targets)
+    done = []
+
+    def report(result):
+        done.append(result)
+        slides = "?" if result["slides"] is None else result["slides"]
+        print("[%d/%d] %s -> %s (%s slides, %.2fs, pid %d)" % (
+            len(done), total, result["target"], result["output"], slides, result["seconds"], result["pid"]),
+            flush=True)
+
+    start = time.perf_counter()
+    try:
+        run_batch(args.targets, jobs=jobs, out_dir=args.out_dir, on_result=report,
+                  stream=args.stream, incremental=args.incremental, autofit=args.autofit)
+    except BatchError as e:
+        print("error: %s (%d/%d decks built, rest cancelled)" % (e, len(done), total), file=sys.stderr)
+        return 1
+    wall = time.perf_counter() - start
+    busy = sum(r["seconds"] for r in done)
+    print("%d decks in %.2fs on %d workers (%.2fs of deck time)" % (total, wall, min(jobs, total), busy))
+    return 0
+
+
+def cmd_bench(args):
+    import glob
+
+    from .bench import MEMORY_METRIC, THRESHOLDS, BenchError, compare, load_baseline, run_suite, save_baseline
+
+    targets = args.targets or sorted(glob.glob("generate_*.py"))
+    if not targets:
+        print("error: no targets (and no generate_*.py in the current directory)", file=sys.stderr)
+        return 1
+    thresholds = {}
+    for item in args.threshold or []:
+        metric, _, value = item.partition("=")
+        if metric not in THRESHOLDS or not value:
+            print("error: bad --threshold %r (metrics: %s)" % (item, ", ".join(THRESHOLDS)), file=sys.stderr)
+            return 1
+        thresholds[metric] = float(value)
+
+    def report(target, m, wall):
+        memory = "peak RSS" if MEMORY_METRIC == "peak_rss" else "traced peak"
+        print("%s: %.3fs median, %.1f MB %s, %.1f KB (%s) [%d runs, %.1fs]" % (
+            target, m["seconds"], m[MEMORY_METRIC] / 2 ** 20, memory, m["size"] / 1024,
+            ", ".join("%s %.1f KB" % (k, v / 1024) for k, v in sorted(m["parts"].items())), m["runs"], wall),
+            flush=True)
+
+    try:
+        results = run_suite(targets, runs=args.runs, on_result=report)
+    except BenchError as e:
+        print("error: %s" % e, file=sys.stderr)
+        return 1
+    baseline = load_baseline(args.baseline)
+    if args.update or baseline is None:
+        save_baseline(args.baseline, results, baseline)
+        print("baseline written to %s" % args.baseline)
+        return 0
+    regressions = compare(baseline, results, thresholds)
+    for r in regressions:
+        print("REGRESSION %s: %s %.4g -> %.4g (+%.1f%%, limit +%.0f%%)" % (
+            r.target, r.metric, r.baseline, r.current, (r.current / r.baseline - 1) * 100, r.limit * 100))
+    return 1 if regressions else 0
+
+
+def cmd_merge(args):
+    from .merge import MergeError, merge_decks
+
+    try:
+        stats = merge_decks(args.decks, args.output)
+    except (OSError, KeyError, zipfile.BadZipFile, MergeError) as e:
+        print("error: %s" % e, file=sys.stderr)
+        return 1
+    print("%s: %d slides from %d decks, %d media parts (%d shared copies dropped, %.1f KB saved)" % (
+        args.output, stats.slides, stats.decks, stats.media, stats.shared, stats.saved_bytes / 1024))
+    return 0
+
+
+def cmd_embed_fonts(args):
+    from .fonts import FontEmbedError, embed_fonts
+
+    fonts = {}
+    for key, path in (("latin", args.font), ("ea", args.cjk_font)):
+        if path:
+            fonts[key, False] = path
+    for key, path in (("latin", args.bold_font), ("ea", args.cjk_bold_font)):
+        if path:
+            fonts[key, True] = path
+    if args.output and len(args.decks) > 1:
+        print("error: -o takes a single deck", file=sys.stderr)
+        return 1
+    failed = 0
+    for path in args.decks:
+        try:
+            stats = embed_fonts(path, args.output, fonts)
+        except (OSError, KeyError, zipfile.BadZipFile, FontEmbedError) as e:
+            print("error: %s: %s" % (path, e), file=sys.stderr)
+            failed += 1
+            continue
+        for f in stats.faces:
+            print("%s: %s %s%s: %d glyphs, %.1f KB (%s)%s" % (
+                path, f.scripts, f.family, " bold" if f.bold else "", f.codepoints, f.size / 1024,
+                os.path.basename(f.path), ", %d not in the font" % f.missing if f.missing else ""))
+        print("%s: %d faces embedded, %.1f KB" % (args.output or path, len(stats.faces), stats.font_bytes / 1024))
+    return 1 if failed else 0
+
+
+def cmd_personalize(args):
+    from .personalize import PersonalizeError, load_presenters, personalize
+    from .spec import SpecError
+
+    start = time.perf_counter()
+    deck, signature = args.deck, None
+    try:
+        presenters = load_presenters(args.presenters)
+        if deck.endswith((".json", ".yaml", ".yml")):
+            from .spec import DeckBuilder, load_spec, theme_for
+
+            signature = theme_for(load_spec(deck))["signature"]
+            deck, count = DeckBuilder(out_dir=args.out_dir).build(deck)
+            print("%s -> %s (%d slides, %.2fs)" % (args.deck, deck, count, time.perf_counter() - start))
+        written = personalize(deck, presenters, args.out_dir, signature,
+                              on_result=None if args.quiet else print)
+    except (OSError, KeyError, zipfile.BadZipFile, SpecError, PersonalizeError) as e:
+        print("error: %s" % e, file=sys.stderr)
+        return 1
+    print("%d presenter copies of %s in %.2fs" % (len(written), deck, time.perf_counter() - start))
+    return 0
+
+
+def cmd_serve(args):
+    import signal
+
+    from .server import UNIX_SOCKETS, RenderService, make_server
+
+    if args.socket and not UNIX_SOCKETS:
+        print("error: --socket needs Unix sockets, which this platform lacks; use --port", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    service = RenderService(root=args.root, autofit=args.autofit)
+    server = make_server(service, args.host, args.port, args.socket, quiet=args.quiet)
+    where = args.socket or "http://%s:%d" % (args.host, server.server_address[1])
+    print("deckgen render daemon on %s (warm in %.2fs, root %s)" % (where, time.perf_counter() - start, service.root),
+          flush=True)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+# inspection module -> import budget in ms, measured in a fresh interpreter
+IMPORT_BUDGETS = {
+    "deckgen.cli": 40,
+    "deckgen.lint": 60,
+    "deckgen.outline": 60,
+    "deckgen.spec": 60,
+    "deckgen.metrics": 60,
+    "deckgen.merge": 60,
+}
+# never imported by the inspection commands
+HEAVY_MODULES = ("pptx", "lxml", "PIL")
+
+_IMPORT_PROBE = """
+import sys, time
+t = time.perf_counter()
+import %s
+print(time.perf_counter() - t, ",".join(m for m in %r if m in sys.modules))
+"""
+
+
+def cmd_import_budget(args):
+    import subprocess
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    failed = 0
+    for module, budget in IMPORT_BUDGETS.items():
+        samples, heavy = [], ""
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, "-c", _IMPORT_PROBE % (module, HEAVY_MODULES)],
+                                 capture_output=True, text=True, env=env, check=True).stdout.split()
+            samples.append(float(out[0]) * 1000)
+            heavy = out[1] if len(out) > 1 else ""
+        best = min(samples)
+        ok = best <= budget and not heavy
+        failed += not ok
+        print("%-18s %6.1f ms (budget %d ms)%s%s" % (
+            module, best, budget, "  loads " + heavy if heavy else "", "" if ok else "  OVER"))
+    return 1 if failed else 0
+
+
+def _add_build_args(p):
+    p.add_argument("--asset-cache", metavar="DIR", help="embed downscaled image renditions cached in DIR")
+    p.add_argument("--dpi", type=int, default=150, help="rendition resolution for --asset-cache (default: 150)")
+    p.add_argument("--stream", action="store_true",
+                   help="write specs slide by slide in bounded memory (large decks)")
+    p.add_argument("--incremental", action="store_true",
+                   help="re-render only slides changed since the last build (keeps <deck>.pptx.manifest.json)")
+    p.add_argument("--autofit", action="store_true",
+                   help="shrink text that overflows its box, down to the leijunskill §2.4 minimum font size")
+    p.add_argument("--profile", metavar="PATH",
+                   help="time each slide and build phase; print a table and write a Chrome trace to PATH "
+                        "(a directory gets one <deck>.trace.json per deck)")
+    p.add_argument("--reproducible", action="store_true",
+                   help="byte-identical output for identical input: fixed zip dates and core properties "
+                        "(SOURCE_DATE_EPOCH, default 1980-01-01)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="deckgen", description="leijunskill deck generator")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build-deck", help="render one or more deck spec files")
+    p.add_argument("specs", nargs="+", help="deck spec files (.json / .yaml)")
+    p.add_argument("-o", "--out-dir", help="output directory (default: next to each spec)")
+    _add_build_args(p)
+    p.set_defaults(func=cmd_build_deck)
+
+    p = sub.add_parser("overflow", help="measure spec text boxes with real font metrics (leijunskill §2.8.7)")
+    p.add_argument("specs", nargs="+", help="deck spec files (.json / .yaml)")
+    p.add_argument("--font", help="latin TTF/TTC (default: Calibri, Arial or DejaVu Sans if installed)")
+    p.add_argument("--cjk-font", help="CJK TTF/TTC (default: Microsoft YaHei etc.; else 1 em per glyph)")
+    p.add_argument("--all", action="store_true", help="list every text box, not only overflowing ones")
+    p.set_defaults(func=cmd_overflow)
+
+    p = sub.add_parser("lint", help="check built .pptx files against the leijunskill §2.8 zones")
+    p.add_argument("decks", nargs="+", help=".pptx files")
+    p.add_argument("--signature", help="text identifying the signature block (default: theme company)")
+    p.set_defaults(func=cmd_lint)
+
+    p = sub.add_parser("preview", help="render PNG thumbnails and a contact sheet per deck (headless)")
+    p.add_argument("decks", nargs="+", help=".pptx files")
+    p.add_argument("-o", "--out-dir", default="previews", help="output directory (default: previews)")
+    p.add_argument("--width", type=int, default=640, help="thumbnail width in pixels (default: 640)")
+    p.add_argument("--sheet-only", action="store_true", help="write only the contact sheet")
+    p.add_argument("-j", "--jobs", type=int, help="worker processes (default: CPU count)")
+    p.set_defaults(func=cmd_preview)
+
+    p = sub.add_parser("slides", help="list the slides of built .pptx files (no python-pptx)")
+    p.add_argument("decks", nargs="+", help=".pptx files")
+    p.add_argument("--notes", action="store_true", help="print full speaker notes instead of a preview")
+    p.set_defaults(func=cmd_slides)
+
+    p = sub.add_parser("validate", help="check deck specs (fields, theme, images) without rendering")
+    p.add_argument("specs", nargs="+", help="deck spec files (.json / .yaml)")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("batch", help="build specs and generator scripts in a process pool")
+    p.add_argument("targets", nargs="+", help="deck specs (.json / .yaml) or generate_*.py scripts")
+    p.add_argument("-j", "--jobs", type=int, help="worker processes (default: CPU count)")
+    p.add_argument("-o", "--out-dir", help="output directory (default: spec dir / cwd for scripts)")
+    _add_build_args(p)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("notes-export", help="export speaker notes of decks or specs as JSON lines")
+    p.add_argument("sources", nargs="+", help=".pptx files or deck specs (.json / .yaml)")
+    p.add_argument("-o", "--output", help="JSON lines file (default: stdout)")
+    p.set_defaults(func=cmd_notes_export)
+
+    p = sub.add_parser("notes-index", help="add decks / specs to the speaker-notes search index")
+    p.add_argument("sources", nargs="+", help=".pptx files or deck specs (.json / .yaml)")
+    p.add_argument("--index", default="notes-index.json", help="index file (default: notes-index.json)")
+    p.set_defaults(func=cmd_notes_index)
+
+    p = sub.add_parser("notes-patch", help="replace the speaker notes of a built deck, copying everything else")
+    p.add_argument("deck", help="built .pptx")
+    p.add_argument("notes", help="deck spec, notes-export JSON lines or JSON {slide: notes}")
+    p.add_argument("-o", "--output", help="write here instead of patching the deck in place")
+    p.set_defaults(func=cmd_notes_patch)
+
+    p = sub.add_parser("notes-search", help="full-text search over indexed speaker notes")
+    p.add_argument("query", help="words and/or CJK text; every token must match")
+    p.add_argument("--index", default="notes-index.json", help="index file (default: notes-index.json)")
+    p.add_argument("-n", "--limit", type=int, default=10, help="hits to show (default: 10)")
+    p.set_defaults(func=cmd_notes_search)
+
+    p = sub.add_parser("bench", help="benchmark builds in isolated processes against a stored baseline")
+    p.add_argument("targets", nargs="*", help="generate_*.py scripts or deck specs (default: ./generate_*.py)")
+    p.add_argument("-n", "--runs", type=int, default=3, help="isolated runs per target (default: 3)")
+    p.add_argument("--baseline", default="deckgen-bench.json",
+                   help="baseline file (default: deckgen-bench.json); written when missing")
+    p.add_argument("--update", action="store_true", help="record this run as the new baseline")
+    p.add_argument("--threshold", action="append", metavar="METRIC=FRACTION",
+                   help="allowed relative growth, e.g. seconds=0.5 (defaults: seconds 0.25, peak_rss 0.2, "
+                        "peak_traced 0.2, size 0.05, parts 0.05)")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("merge", help="concatenate built decks, deduplicating media by SHA-256")
+    p.add_argument("decks", nargs="+", help=".pptx files, in slide order")
+    p.add_argument("-o", "--output", required=True, help="merged .pptx to write")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("embed-fonts", help="embed subsetted fonts so decks render the same everywhere (fontTools)")
+    p.add_argument("decks", nargs="+", help=".pptx files, rewritten in place")
+    p.add_argument("-o", "--output", help="write the result here instead (one deck only)")
+    p.add_argument("--font", help="latin TTF/TTC (default: Calibri, Arial or DejaVu Sans if installed)")
+    p.add_argument("--bold-font", help="bold latin TTF/TTC (default: the matching bold file)")
+    p.add_argument("--cjk-font", help="CJK TTF/TTC (default: Microsoft YaHei, DengXian, Noto Sans CJK ...)")
+    p.add_argument("--cjk-bold-font", help="bold CJK TTF/TTC (default: the matching bold file)")
+    p.set_defaults(func=cmd_embed_fonts)
+
+    p = sub.add_parser("personalize", help="stamp a deck for many presenters by patching its signature slides")
+    p.add_argument("deck", help="built .pptx, or a deck spec to build once first")
+    p.add_argument("presenters", help="CSV (columns author, company, output) or JSON list of presenters")
+    p.add_argument("-o", "--out-dir", default="personalized", help="output directory (default: personalized)")
+    p.add_argument("-q", "--quiet", action="store_true", help="do not list every written file")
+    p.set_defaults(func=cmd_personalize)
+
+    p = sub.add_parser("serve", help="run a warm render daemon (POST /render with a spec, get .pptx bytes)")
+    p.add_argument("--host", default="127.0.0.1", help="address to bind (default: 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765; 0 picks a free one)")
+    p.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead of TCP (not on Windows)")
+    p.add_argument("--root", help="directory relative image paths resolve against (default: cwd)")
+    p.add_argument("--asset-cache", metavar="DIR", help="embed downscaled image renditions cached in DIR")
+    p.add_argument("--dpi", type=int, default=150, help="rendition resolution for --asset-cache (default: 150)")
+    p.add_argument("--autofit", action="store_true",
+                   help="shrink text that overflows its box, down to the leijunskill §2.4 minimum font size")
+    p.add_argument("-q", "--quiet", action="store_true", help="do not log requests")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("import-budget", help="time each inspection module's import in a fresh interpreter")
+    p.add_argument("-n", "--runs", type=int, default=3, help="fresh interpreters per module; the best counts")
+    p.set_defaults(func=cmd_import_budget)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Exported rather than passed down so batch workers and generate_*.py scripts pick them up too.
+    if getattr(args, "asset_cache", None):
+        os.environ["DECKGEN_ASSET_CACHE"] = args.asset_cache
+        os.environ["DECKGEN_ASSET_DPI"] = str(args.dpi)
+    if getattr(args, "profile", None):
+        os.environ["DECKGEN_PROFILE"] = args.profile
+    if getattr(args, "reproducible", False):
+        from .package import ZIP_EPOCH
+
+        os.environ.setdefault("SOURCE_DATE_EPOCH", str(ZIP_EPOCH))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,734 @@
+"""
+Shared slide-rendering engine for the leijunskill deck generators.
+
+Every page type from leijunskill §3 (Cover / Content / Data / Split / Closing)
+is compiled once per theme into XML string fragments. A slide is rendered by
+escaping its text into those fragments and parsing the whole shape tree in a
+single lxml call, instead of setting size/colour/bold one attribute at a time
+through python-pptx's object model. Sizes, colours, bold, spacing, the boxes
+of the §2.8 zones and the ``BG_COLOR`` background live on a generated slide
+master with one layout per page type (``deckgen.master``); a slide's shapes
+are placeholders of its layout that carry nothing but their text.
+
+python-pptx (and lxml) are only imported once a DeckEngine is created, so
+themes, layout measurement and the inspection commands start without them.
+"""
+
+import copy
+import io
+import json
+import os
+import re
+import zipfile
+
+from .assets import default_images
+from .imageinfo import fit_size, probe_file
+
+# --- CANVAS (leijunskill §2.8.1) ---
+SLIDE_W = 13.333
+SLIDE_H = 7.5
+
+# Colors (hex, as written into a:srgbClr)
+BG_COLOR = "0F0F19"
+WHITE = "FFFFFF"
+GOLD = "FFD700"
+LIGHT_GRAY = "DCDCDC"
+TIANYI_BLUE = "00BFFF"
+DEEPSEEK_GREEN = "2ECC71"
+
+_NSDECLS = (
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+)
+
+# Boxes are (left, top, width, height) in inches, sizes in pt.
+# Default theme reproduces generate_memory_ppt_v9.py.
+THEME = {
+    "slide_width": SLIDE_W,
+    "slide_height": SLIDE_H,
+    "background": BG_COLOR,
+    "signature": {
+        "company": "天翼云湖北分公司",
+        "author": "王理",
+        "cover_suffix": " 作者",
+        "top": SLIDE_H - 1.0,
+        "width": 5.0,
+        "height": 0.9,
+        "company_style": {"size": 16, "color": TIANYI_BLUE, "align": "ctr"},
+        "author_style": {"size": 24, "color": GOLD, "bold": True, "align": "ctr"},
+    },
+    "cover": {
+        "title": {"box": (0.5, 0.4, SLIDE_W - 1, 1.8), "size": 56, "bold": True, "color": WHITE, "align": "ctr"},
+        "tagline": {"size": 32, "color": GOLD, "align": "ctr"},
+        "image": {"left": 4.0, "top": 2.3, "height": 2.8},
+        "subtitle": {"box": (0, 5.4, SLIDE_W, 0.8), "size": 24, "color": LIGHT_GRAY, "align": "ctr"},
+    },
+    "content": {
+        "title": {"box": (0.5, 0.3, SLIDE_W - 1, 1.5), "size": 54, "bold": True, "color": WHITE},
+        "body": {"box": (1.0, 2.0, SLIDE_W - 2, 4.5), "wrap": True, "space_after": 14},
+        "emphasis": {"size": 96, "color": GOLD, "bold": True, "align": "ctr"},
+        "heading": {"size": 32, "color": WHITE, "bold": True},
+        "bullet": {"size": 26, "color": LIGHT_GRAY, "prefix": "• "},
+    },
+    "data": {
+        "title": {"box": (0.5, 0.3, SLIDE_W - 1, 1.2), "size": 54, "bold": True, "color": WHITE, "align": "ctr"},
+        "number": {"box": (0, 2.2, SLIDE_W, 2.0), "size": 120, "bold": True, "color": GOLD, "align": "ctr"},
+        "unit": {"box": (0, 4.2, SLIDE_W, 0.8), "size": 36, "color": WHITE, "align": "ctr"},
+        "explanation": {"box": (1.0, 5.2, SLIDE_W - 2, 1.0), "size": 24, "color": LIGHT_GRAY, "align": "ctr"},
+    },
+    "split": {
+        "title": {"box": (0.5, 0.3, SLIDE_W - 1, 1.5), "size": 54, "bold": True, "color": WHITE},
+        "body": {"box": (0.5, 2.0, 5.5, 4.5), "wrap": True, "space_after": 12},
+        "heading": {"size": 28, "color": WHITE, "bold": True},
+        "bullet": {"size": 22, "color": LIGHT_GRAY, "prefix": ""},
+        "image": {"left": 6.5, "top": 2.0, "width": 6.3},
+    },
+    "closing": {
+        "title": {"box": (0, 2.5, SLIDE_W, 1.5), "size": 80, "bold": True, "color": WHITE, "align": "ctr"},
+        "subtitle": {"box": (0, 4.2, SLIDE_W, 0.8), "size": 28, "color": LIGHT_GRAY, "align": "ctr"},
+    },
+    "chart": {
+        "title": {"box": (0.5, 0.3, SLIDE_W - 1, 1.2), "size": 54, "bold": True, "color": WHITE, "align": "ctr"},
+        "box": (0.8, 2.0, SLIDE_W - 1.6, 3.8),
+        "type": "column",
+        "colors": [DEEPSEEK_GREEN, GOLD, TIANYI_BLUE, LIGHT_GRAY],
+        "text_color": LIGHT_GRAY,
+        "grid_color": "2A2A3A",
+        "font_size": 16,
+        "label_size": 18,
+        "gap_width": 80,
+    },
+}
+
+
+def derive_theme(base, overrides):
+    """Return a deep copy of ``base`` with the nested ``overrides`` merged in."""
+    theme = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(theme.get(key), dict):
+            theme[key] = derive_theme(theme[key], value)
+        else:
+            theme[key] = value
+    return theme
+
+
+# §2.8-zoned theme used by generate_engram_ppt_v2.py / generate_engram_paper_ppt.py
+ZONED_THEME = derive_theme(THEME, {
+    "signature": {"top": 6.3, "height": 1.0, "author_style": {"size": 22}},
+    "cover": {
+        "title": {"box": (0.5, 0.3, 12.333, 1.2), "size": 48},
+        "image": {"left": None, "top": 2.0, "width": 5.0, "height": None, "max_height": 3.0},
+        "subtitle": {"box": (0, 5.1, SLIDE_W, 0.7), "size": 20},
+    },
+    "content": {
+        "title": {"box": (0.5, 0.3, 12.333, 1.2), "size": 48},
+        "body": {"box": (0.8, 1.8, 11.733, 4.0), "space_after": 12},
+        "emphasis": {"size": 54},
+        "heading": {"size": 28},
+        "bullet": {"size": 24},
+    },
+    "data": {
+        "title": {"box": (0.5, 0.3, 12.333, 1.2), "size": 44},
+        "number": {"box": (0, 1.8, SLIDE_W, 1.8), "size": 80, "color": DEEPSEEK_GREEN},
+        "unit": {"box": (0, 3.6, SLIDE_W, 0.9), "size": 32},
+        "explanation": {"box": (1.0, 4.6, SLIDE_W - 2, 0.8), "size": 22},
+    },
+    "split": {
+        "title": {"box": (0.5, 0.3, 12.333, 1.2), "size": 48},
+        "body": {"box": (0.5, 1.8, 5.5, 4.0), "space_after": 10},
+        "heading": {"size": 26},
+        "bullet": {"size": 20},
+        "image": {"left": 6.5, "top": 1.8, "width": 6.0, "max_width": 6.333, "max_height": 4.0},
+    },
+    "closing": {
+        "title": {"box": (0, 2.5, SLIDE_W, 1.6), "size": 72},
+        "subtitle": {"box": (0, 4.1, SLIDE_W, 0.8), "size": 26},
+    },
+    "chart": {
+        "title": {"box": (0.5, 0.3, 12.333, 1.2), "size": 44},
+    },
+})
+
+
+def _emu(inches):
+    return int(inches * 914400)
+
+
+def _escape(text):
+    """``xml.sax.saxutils.escape`` without importing it (it pulls in urllib)."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _runs(text):
+    """Runs for ``text`` the way python-pptx's ``p.text`` setter writes them."""
+    parts = []
+    for idx, line in enumerate(text.replace("\v", "\n").split("\n")):
+        if idx:
+            parts.append("<a:br/>")
+        if line:
+            parts.append("<a:r><a:t>%s</a:t></a:r>" % _escape(line))
+    return "".join(parts)
+
+
+def _paragraphs(text):
+    """Paragraphs the way python-pptx's ``text_frame.text`` setter writes them."""
+    return "".join("<a:p>%s</a:p>" % runs if runs else "<a:p/>" for runs in map(_runs, text.split("\n")))
+
+
+class _Para:
+    """One text style, defined once as level ``level`` of a layout placeholder.
+
+    Slides inherit size, colour, bold, alignment and spacing from the layout
+    and only carry the runs (plus ``lvl`` for levels above the first).
+    ``resized`` copies override the size in the paragraph itself.
+    """
+
+    def __init__(self, style, space_after=None, name=None, level=0, resized=False):
+        self.style = style
+        self.name = name
+        self.level = level
+        self._resized = {}
+        self.size = style["size"]
+        self.bold = bool(style.get("bold"))
+        self.space_after = space_after or 0
+        self.prefix = style.get("prefix", "")
+        lvl = ' lvl="%d"' % level if level else ""
+        if resized:
+            self.head = '<a:p><a:pPr%s><a:defRPr sz="%d"/></a:pPr>' % (lvl, self.size * 100)
+        else:
+            self.head = "<a:p><a:pPr%s/>" % lvl if lvl else "<a:p>"
+        self.tail = "</a:p>"
+
+    def render(self, text):
+        return self.head + _runs(self.prefix + text) + self.tail
+
+    def resized(self, size):
+        """This style at ``size`` pt (memoized)."""
+        if size == self.size:
+            return self
+        para = self._resized.get(size)
+        if para is None:
+            para = self._resized[size] = _Para(dict(self.style, size=size), self.space_after, self.name,
+                                               self.level, resized=True)
+        return para
+
+    def level_style(self):
+        """The layout's ``a:lvlNpPr`` for this style; master body bullets and spacing are reset."""
+        style = self.style
+        spacing = '<a:spcAft><a:spcPts val="%d"/></a:spcAft>' % (self.space_after * 100) if self.space_after else ""
+        return (
+            '<a:lvl%dpPr marL="0" indent="0" algn="%s"><a:lnSpc><a:spcPct val="100000"/></a:lnSpc>'
+            '<a:spcBef><a:spcPts val="0"/></a:spcBef>%s<a:buNone/><a:defRPr sz="%d"%s>'
+            '<a:solidFill><a:srgbClr val="%s"/></a:solidFill><a:latin typeface="+mn-lt"/>'
+            '<a:ea typeface="+mn-ea"/><a:cs typeface="+mn-cs"/></a:defRPr></a:lvl%dpPr>'
+            % (self.level + 1, style.get("align", "l"), spacing, self.size * 100,
+               ' b="1"' if self.bold else "", style["color"], self.level + 1)
+        )
+
+
+# How slide placeholders find theirs on the layout: titles by type, the rest by idx.
+TITLE_PH = 'type="title"'
+SIGNATURE_PH = 'type="body" idx="20"'
+
+
+def _body_ph(n):
+    return 'type="body" idx="%d"' % (12 + n)
+
+
+class _TextBox:
+    """A placeholder of a page layout: box, wrapping and the ``p:ph`` linking slide and layout.
+
+    ``render`` writes the slide's shape -- shape id and paragraphs only; the
+    geometry and text styles come from ``placeholder``, the layout's shape.
+    Like python-pptx textboxes, every box starts with an empty 18 pt paragraph.
+    """
+
+    def __init__(self, left, top, width, height, wrap=False, ph=TITLE_PH, label="Title", spaced=False):
+        self.box = (left, top, width, height)
+        self.wrap = wrap
+        self.ph = ph
+        self.label = label
+        # the first level's space-after must not apply to the empty paragraph
+        leading = '<a:pPr><a:spcAft><a:spcPts val="0"/></a:spcAft></a:pPr>' if spaced else ""
+        self.head = (
+            '"/><p:cNvSpPr/><p:nvPr><p:ph %s/></p:nvPr></p:nvSpPr><p:spPr/><p:txBody><a:bodyPr/>'
+            '<a:p>%s<a:endParaRPr sz="1800"/></a:p>' % (ph, leading)
+        )
+        self.tail = "</p:txBody></p:sp>"
+
+    def render(self, shape_id, paragraphs):
+        return (
+            '<p:sp><p:nvSpPr><p:cNvPr id="%d" name="%s %d' % (shape_id, self.label, shape_id - 1)
+            + self.head + "".join(paragraphs) + self.tail
+        )
+
+    def placeholder(self, shape_id, paras):
+        """The layout's ``p:sp`` for this box, its ``paras`` as levels 1, 2, ..."""
+        left, top, width, height = self.box
+        prompts = "".join(
+            '<a:p>%s<a:r><a:rPr lang="zh-CN"/><a:t>%s</a:t></a:r></a:p>'
+            % ('<a:pPr lvl="%d"/>' % p.level if p.level else "", p.name or self.label) for p in paras
+        )
+        return (
+            '<p:sp><p:nvSpPr><p:cNvPr id="%d" name="%s"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>'
+            '<p:nvPr><p:ph %s/></p:nvPr></p:nvSpPr><p:spPr><a:xfrm><a:off x="%d" y="%d"/>'
+            '<a:ext cx="%d" cy="%d"/></a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/>'
+            '</p:spPr><p:txBody><a:bodyPr vert="horz" wrap="%s" lIns="91440" tIns="45720" rIns="91440" '
+            'bIns="45720" rtlCol="0" anchor="t"><a:spAutoFit/></a:bodyPr><a:lstStyle>%s</a:lstStyle>%s'
+            "</p:txBody></p:sp>"
+            % (shape_id, self.label, self.ph, left, top, width, height, "square" if self.wrap else "none",
+               "".join(p.level_style() for p in paras), prompts)
+        )
+
+
+class _Element:
+    """A single-style placeholder (title, subtitle, big number ...)."""
+
+    def __init__(self, style, name, ph=TITLE_PH, wrap=False):
+        self.box = _TextBox(*(_emu(v) for v in style["box"]), wrap=wrap, ph=ph, label=name.capitalize())
+        self.para = _Para(style, name=name)
+        self.name = name
+
+    def render(self, shape_id, text):
+        return self.box.render(shape_id, [self.para.render(text)])
+
+    def layout(self, text):
+        """``(textbox, [(para, text), ...])`` for text measurement."""
+        return self.box, [(self.para, text)]
+
+    def styles(self):
+        """Paragraph styles by level, for the layout placeholder."""
+        return [self.para]
+
+
+class _CoverTitle(_Element):
+    """Cover title with an optional gold tagline paragraph (level 2) under it."""
+
+    def __init__(self, style, tagline):
+        super().__init__(style, "title")
+        self.tagline = _Para(tagline, name="tagline", level=1)
+
+    def render(self, shape_id, title, tagline=None):
+        return self.box.render(shape_id, [p.render(t) for p, t in self.layout(title, tagline)[1]])
+
+    def layout(self, title, tagline=None):
+        paras = [(self.para, title)]
+        if tagline:
+            paras.append((self.tagline, tagline))
+        return self.box, paras
+
+    def styles(self):
+        return [self.para, self.tagline]
+
+
+class _Bullets:
+    """Multi-style body: plain bullet (level 1), ``#`` heading (2), ``##`` emphasis (3)."""
+
+    def __init__(self, page, ph):
+        body = page["body"]
+        space_after = body.get("space_after")
+        self.box = _TextBox(*(_emu(v) for v in body["box"]), wrap=body.get("wrap", False), ph=ph,
+                            label="Body", spaced=bool(space_after))
+        self.bullet = _Para(page["bullet"], space_after, "bullet")
+        self.heading = _Para(page["heading"], space_after, "heading", level=1)
+        self.emphasis = _Para(page["emphasis"], space_after, "emphasis", level=2) if "emphasis" in page else None
+        self.name = "body"
+
+    def paragraph(self, line):
+        """``(para, text)`` for one body line."""
+        if self.emphasis is not None and line.startswith("##"):
+            return self.emphasis, line[2:].strip()
+        if line.startswith("#"):
+            return self.heading, line[1:].strip()
+        return self.bullet, line
+
+    def render(self, shape_id, lines):
+        return self.box.render(shape_id, [p.render(t) for p, t in map(self.paragraph, lines)])
+
+    def layout(self, lines):
+        return self.box, [self.paragraph(line) for line in lines]
+
+    def styles(self):
+        return [p for p in (self.bullet, self.heading, self.emphasis) if p is not None]
+
+
+class _Fitted:
+    """A text shape whose paragraphs were resized to fit its box (see metrics.AutoFit)."""
+
+    def __init__(self, box, paras, name):
+        self.box, self.paras, self.name = box, paras, name
+
+    def render(self, shape_id):
+        return self.box.render(shape_id, [p.render(t) for p, t in self.paras])
+
+    def layout(self):
+        return self.box, self.paras
+
+
+class _Signature:
+    """Two-line signature block, cover/closing only (leijunskill §5)."""
+
+    def __init__(self, sig, slide_width):
+        width = _emu(sig["width"])
+        self.box = _TextBox((slide_width - width) // 2, _emu(sig["top"]), width, _emu(sig["height"]),
+                            ph=SIGNATURE_PH, label="Signature")
+        self.company_para = _Para(sig["company_style"], name="company")
+        self.author_para = _Para(sig["author_style"], name="author", level=1)
+        self.texts = (sig["company"], sig["company"] + sig["cover_suffix"], sig["author"])
+        self.company = self.company_para.render(self.texts[0])
+        self.cover_company = self.company_para.render(self.texts[1])
+        self.author = self.author_para.render(self.texts[2])
+        self.name = "signature"
+
+    def render(self, shape_id, is_cover):
+        return self.box.render(shape_id, [self.cover_company if is_cover else self.company, self.author])
+
+    def layout(self, is_cover):
+        company, cover_company, author = self.texts
+        return self.box, [(self.company_para, cover_company if is_cover else company), (self.author_para, author)]
+
+    def styles(self):
+        return [self.company_para, self.author_para]
+
+
+def compile_theme(theme):
+    """Compile every page type of ``theme`` into reusable XML fragments.
+
+    ``tpl[page]`` maps element names to the page's placeholders in slide
+    order; ``deckgen.master`` builds the page's layout from the same objects.
+    """
+    slide_width = _emu(theme["slide_width"])
+    cover, content, data, split, closing, chart = (
+        theme[k] for k in ("cover", "content", "data", "split", "closing", "chart")
+    )
+    tpl = {
+        "background": (
+            "<p:bg><p:bgPr><a:solidFill><a:srgbClr val=\"%s\"/></a:solidFill>"
+            "<a:effectLst/></p:bgPr></p:bg>" % theme["background"]
+        ),
+        "signature": _Signature(theme["signature"], slide_width),
+        "cover": {
+            "title": _CoverTitle(cover["title"], cover["tagline"]),
+            "subtitle": _Element(cover["subtitle"], "subtitle", _body_ph(1)),
+        },
+        "content": {"title": _Element(content["title"], "title"), "body": _Bullets(content, _body_ph(1))},
+        "data": {
+            "title": _Element(data["title"], "title"),
+            **{k: _Element(data[k], k, _body_ph(n)) for n, k in enumerate(("number", "unit", "explanation"), 1)},
+        },
+        "split": {"title": _Element(split["title"], "title"), "body": _Bullets(split, _body_ph(1))},
+        "closing": {
+            "title": _Element(closing["title"], "title"),
+            "subtitle": _Element(closing["subtitle"], "subtitle", _body_ph(1)),
+        },
+        "chart": {"title": _Element(chart["title"], "title")},
+    }
+    return tpl
+
+
+_compiled = {}
+
+
+def _compiled_theme(theme):
+    """``compile_theme`` memoized on the theme's content, for batch builds."""
+    key = json.dumps(theme, sort_keys=True)
+    tpl = _compiled.get(key)
+    if tpl is None:
+        tpl = _compiled[key] = compile_theme(theme)
+    return tpl
+
+
+# Marks a picture in a page's shape list: (PICTURE, img_path, image spec).
+PICTURE = "picture"
+# Marks a native chart: (CHART, chart spec); see deckgen.charts.
+CHART = "chart"
+
+
+class BaseDeck:
+    """Page types of leijunskill §3 on top of a pluggable slide backend.
+
+    Each page method describes its slide as an ordered shape list --
+    ``(render, *args)`` entries whose render callable takes the shape id first,
+    ``(PICTURE, img_path, spec)`` and ``(CHART, spec)`` entries -- plus the
+    speaker notes.
+    Backends implement ``_add_slide(kind, shapes, notes)`` -- ``kind`` names
+    the page's layout (see ``deckgen.master``) -- and number shapes the
+    way python-pptx does (2, 3, ... in document order, skipping missing
+    pictures), so every backend emits the same slide XML.
+
+    Set ``overflow`` to a ``deckgen.metrics.OverflowCheck`` to collect every
+    text box for measurement as slides are added, and ``autofit`` to a
+    ``deckgen.metrics.AutoFit`` to size each box's text to fit it. With
+    ``DECKGEN_PROFILE`` set, the deck is instrumented by
+    ``deckgen.profile.BuildProfiler`` when it is created.
+    """
+
+    def __init__(self, theme=THEME, images=None):
+        self.theme = theme
+        self.images = images if images is not None else default_images()
+        self.overflow = None
+        self.autofit = None
+        self.profiler = None
+        self._tpl = _compiled_theme(theme)
+        if os.environ.get("DECKGEN_PROFILE"):
+            from .profile import BuildProfiler
+            BuildProfiler.from_env().instrument(self)
+
+    def _image(self, img_path, spec):
+        """Stream (or path) for ``img_path`` at ``spec``'s display size; None if missing."""
+        if self.images is not None:
+            return self.images.open(img_path, spec.get("width"), spec.get("height"))
+        return img_path if img_path and os.path.exists(img_path) else None
+
+    @staticmethod
+    def _fit(img_path, spec):
+        """``spec`` shrunk to its ``max_width`` / ``max_height`` box, sized from the image header."""
+        if not (spec.get("max_width") or spec.get("max_height")):
+            return spec
+        info = probe_file(img_path) if img_path else None
+        if info is None:
+            return spec
+        size = fit_size(info, spec.get("width"), spec.get("height"))
+        fitted = fit_size(info, spec.get("width"), spec.get("height"), spec.get("max_width"), spec.get("max_height"))
+        if fitted == size:
+            return spec
+        return dict(spec, width=round(fitted[0], 4), height=round(fitted[1], 4))
+
+    def _slide(self, kind, shapes, notes):
+        if self.autofit is not None:
+            shapes = self.autofit.fit_shapes(shapes)
+        if self.overflow is not None:
+            self.overflow.add_slide(self.slide_count + 1, kind, shapes)
+        return self._add_slide(kind, shapes, notes)
+
+    def _add_slide(self, kind, shapes, notes):
+        raise NotImplementedError
+
+    @property
+    def slide_count(self):
+        raise NotImplementedError
+
+    # --- page types (leijunskill §3) ---
+
+    def cover_slide(self, title, subtitle, img_path, notes, tagline=None):
+        """Cover: title (+ optional gold tagline), hero image, subtitle, signature."""
+        t = self._tpl["cover"]
+        return self._slide("cover", [
+            (t["title"].render, title, tagline),
+            (PICTURE, img_path, self._fit(img_path, self.theme["cover"]["image"])),
+            (t["subtitle"].render, subtitle),
+            (self._tpl["signature"].render, True),
+        ], notes)
+
+    def content_slide(self, title, bullets, notes):
+        """Text page; ``##`` lines are gold emphasis, ``#`` lines are headings."""
+        t = self._tpl["content"]
+        return self._slide("content", [(t["title"].render, title), (t["body"].render, bullets)], notes)
+
+    def data_slide(self, title, number, unit, explanation, notes):
+        """Big-number page (leijunskill §2.4 font size contrast)."""
+        t = self._tpl["data"]
+        return self._slide("data", [
+            (t["title"].render, title),
+            (t["number"].render, number),
+            (t["unit"].render, unit),
+            (t["explanation"].render, explanation),
+        ], notes)
+
+    def split_slide(self, title, bullets, img_path, notes):
+        """Left text, right image (leijunskill §2.8.6 / §6.3)."""
+        t = self._tpl["split"]
+        return self._slide("split", [
+            (t["title"].render, title),
+            (t["body"].render, bullets),
+            (PICTURE, img_path, self._fit(img_path, self.theme["split"]["image"])),
+        ], notes)
+
+    def chart_slide(self, title, categories, series, notes, chart_type=None, number_format=None):
+        """Native chart page: ``series`` maps names to one value per category.
+
+        ``chart_type`` is column (theme default), stacked, bar, line or pie;
+        ``number_format`` is an Excel format for the value labels, e.g. '0.0"TB/s"'.
+        """
+        style = self.theme["chart"]
+        items = series.items() if hasattr(series, "items") else series
+        spec = {
+            "box": style["box"],
+            "type": chart_type or style["type"],
+            "categories": list(categories),
+            "series": [(name, list(values)) for name, values in items],
+            "number_format": number_format,
+            "style": {k: v for k, v in style.items() if k not in ("title", "box", "type")},
+        }
+        return self._slide("chart", [(self._tpl["chart"]["title"].render, title), (CHART, spec)], notes)
+
+    def closing_slide(self, title, subtitle, notes):
+        """Closing page with signature."""
+        t = self._tpl["closing"]
+        return self._slide("closing", [
+            (t["title"].render, title),
+            (t["subtitle"].render, subtitle),
+            (self._tpl["signature"].render, False),
+        ], notes)
+
+
+class _Entries(list):
+    """Stands in for python-pptx's zip writer: collects ``(member name, bytes)`` in write order."""
+
+    def write(self, pack_uri, blob):
+        self.append((pack_uri.membername, blob))
+
+
+_SLIDE_PART = re.compile(r"ppt/(?:slides|notesSlides)/(?:_rels/)?(?:slide|notesSlide)(\d+)\.xml")
+_INDEX_PARTS = ("ppt/presentation.xml", "ppt/_rels/presentation.xml.rels", "[Content_Types].xml")
+
+
+def _stream_order(entries):
+    """``entries`` in the order StreamingDeckWriter writes the same parts.
+
+    python-pptx walks the package graph; the writer has to put the fixed
+    parts first, then slide by slide the media and charts it first uses
+    followed by its slide and notes parts, and the package index last.
+    """
+    keyed, slide = [], 0
+    for i, (name, blob) in enumerate(entries):
+        m = _SLIDE_PART.match(name)
+        if m:
+            slide = int(m.group(1))
+            key = (1, slide, 1, i)
+        elif name.startswith(("ppt/media/", "ppt/charts/", "ppt/embeddings/")):
+            # reached through the rels of the slide just written
+            key = (1, slide, 0, i)
+        elif name in _INDEX_PARTS:
+            key = (2, _INDEX_PARTS.index(name))
+        else:
+            key = (0, i)
+        keyed.append((key, name, blob))
+    return [(name, blob) for key, name, blob in sorted(keyed, key=lambda entry: entry[0])]
+
+
+class DeckEngine(BaseDeck):
+    """Builds one deck in memory through python-pptx.
+
+    ``prs`` lets batch callers pass a presentation opened from
+    ``deckgen.master.template(theme)``, which holds the page layouts;
+    ``images`` is an optional ``deckgen.assets.ImageCache`` shared across decks
+    (default: the ``DECKGEN_ASSET_CACHE`` rendition cache, if configured).
+    For very large decks see ``deckgen.writer.StreamingDeckWriter``.
+    """
+
+    def __init__(self, theme=THEME, prs=None, images=None):
+        from pptx import Presentation
+        from pptx.util import Inches
+
+        from .master import LAYOUTS, template
+
+        super().__init__(theme, images)
+        self.prs = prs if prs is not None else Presentation(io.BytesIO(template(theme)))
+        self.prs.slide_width = Inches(theme["slide_width"])
+        self.prs.slide_height = Inches(theme["slide_height"])
+        layouts = {layout.name: layout for layout in self.prs.slide_layouts}
+        missing = [name for name in LAYOUTS.values() if name not in layouts]
+        if missing:
+            raise ValueError("presentation has no %s layout; open it from deckgen.master.template(theme)"
+                             % ", ".join(missing))
+        self._layouts = {kind: layouts[name] for kind, name in LAYOUTS.items()}
+
+    @property
+    def slide_count(self):
+        return len(self.prs.slides)
+
+    # --- stamping ---
+
+    def _new_slide(self, kind):
+        # Slides.add_slide without cloning the layout's placeholders: the
+        # stamped shapes are the slide's placeholders
+        slides = self.prs.slides
+        rid, slide = slides.part.add_slide(self._layouts[kind])
+        slides._sldIdLst.add_sldId(rid)
+        return slide
+
+    @staticmethod
+    def _stamp(slide, fragments):
+        from pptx.oxml import parse_xml
+
+        if fragments:
+            tree = parse_xml("<p:spTree %s>%s</p:spTree>" % (_NSDECLS, "".join(fragments)))
+            slide.shapes._spTree.extend(list(tree))
+
+    def _picture(self, slide, img_path, spec):
+        """Add ``img_path`` per an image spec; ``left=None`` centres it horizontally."""
+        from pptx.util import Emu, Inches
+
+        image = self._image(img_path, spec)
+        if image is None:
+            return None
+        width = Inches(spec["width"]) if spec.get("width") else None
+        height = Inches(spec["height"]) if spec.get("height") else None
+        if spec.get("left") is None:
+            left = Emu((self.prs.slide_width - (width or 0)) // 2)
+        else:
+            left = Inches(spec["left"])
+        return slide.shapes.add_picture(image, left, Inches(spec["top"]), width=width, height=height)
+
+    @staticmethod
+    def _chart(slide, spec):
+        """Add a native chart per a chart spec (see ``BaseDeck.chart_slide``)."""
+        from pptx.util import Inches
+
+        from .charts import chart_data, chart_type, style_chart
+
+        x, y, cx, cy = (Inches(v) for v in spec["box"])
+        frame = slide.shapes.add_chart(chart_type(spec), x, y, cx, cy, chart_data(spec))
+        style_chart(frame.chart, spec)
+        return frame
+
+    @staticmethod
+    def _notes(slide, text):
+        slide.notes_slide.notes_text_frame.text = text
+
+    def _add_slide(self, kind, shapes, notes):
+        slide = self._new_slide(kind)
+        fragments, shape_id = [], 2
+        for render, *args in shapes:
+            if render == PICTURE:
+                # add_picture takes max(id) + 1, so stamp what precedes it first
+                self._stamp(slide, fragments)
+                fragments = []
+                if self._picture(slide, *args) is not None:
+                    shape_id += 1
+            elif render == CHART:
+                self._stamp(slide, fragments)
+                fragments = []
+                self._chart(slide, *args)
+                shape_id += 1
+            else:
+                fragments.append(render(shape_id, *args))
+                shape_id += 1
+        self._stamp(slide, fragments)
+        self._notes(slide, notes)
+        return slide
+
+    def save(self, out_path):
+        """Write the deck like ``prs.save``, with media stored and XML deflated in parallel.
+
+        Byte-identical across runs when ``SOURCE_DATE_EPOCH`` is set (``deckgen.package``),
+        and to StreamingDeckWriter's package of the same pages, whose entry order it follows.
+        """
+        from pptx.opc.serialized import PackageWriter
+
+        from .package import stamp_core, write_parts
+
+        package = self.prs.part.package
+        entries = _Entries()
+        writer = PackageWriter(out_path, package._rels, tuple(package.iter_parts()))
+        writer._write_content_types_stream(entries)
+        writer._write_pkg_rels(entries)
+        writer._write_parts(entries)
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            write_parts(zf, [
+                (name, stamp_core(blob.decode("utf-8")) if name == "docProps/core.xml" else blob)
+                for name, blob in _stream_order(entries)
+            ])
+        return out_path
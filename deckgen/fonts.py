@@ -0,0 +1,329 @@
+"""
+Embed subsetted fonts in built decks so they look the same on every laptop.
+
+The decks' runs name no typeface, so their text uses the theme's minor/major
+font: the latin face for latin text and the east-asian ("ea") face for CJK.
+python-pptx's theme leaves ``ea`` empty, which is what makes CJK text depend
+on whatever the presenting machine falls back to.
+
+``embed_fonts(path)`` collects the code points used by slides, notes and
+charts per face and style (regular / bold), subsets the local font files to
+exactly those glyphs with fontTools, stores them as ``ppt/fonts/fontN.fntdata``
+parts listed in presentation.xml's ``p:embeddedFontLst`` and points the themes'
+latin and ea typefaces at the embedded families. All other parts are copied as
+compressed bytes.
+
+A .fntdata part is an Embedded OpenType (EOT) file, as PowerPoint writes it:
+``eot_data`` puts the EOT header in front of the subset TrueType data, without
+MicroType Express compression or XOR obfuscation. LibreOffice reads such
+parts only when built with libeot. Font files come from ``deckgen.metrics.find_font``
+(Calibri / Microsoft YaHei ..., ``DECKGEN_FONT_DIRS``) unless given.
+
+Fonts whose OS/2 ``fsType`` forbids embedding are refused, as are CFF-outline
+fonts: PowerPoint embeds TrueType outlines only. Needs fontTools
+(``pip install fonttools``).
+"""
+
+import collections
+import io
+import os
+import re
+import struct
+import zipfile
+import xml.etree.ElementTree as ET
+
+from .lint import Layouts, level_styles, placeholder_key
+from .metrics import CJK_FONTS, CJK_RANGES, LATIN_FONTS, find_font
+from .package import _RELS_NS, _RT, _XML_DECL, copy_entry, write_str
+
+FONT_TYPE = "application/x-fontdata"
+# OS/2 fsType bits
+_RESTRICTED, _NO_SUBSET, _BITMAP_ONLY = 0x0002, 0x0100, 0x0200
+# always embedded with the latin face: printable ASCII, so numbers and edits keep the face
+_ASCII = frozenset(range(0x20, 0x7F))
+# PowerPoint may draw these with either face depending on the run language
+_SHARED = frozenset(range(0x2000, 0x2070))
+
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_C = "{http://schemas.openxmlformats.org/drawingml/2006/chart}"
+_TEXT_PARTS = re.compile(r"^ppt/(slides/slide|notesSlides/notesSlide|charts/chart)\d+\.xml$")
+_THEME_PARTS = re.compile(r"^ppt/theme/theme\d+\.xml$")
+_FONT_PARTS = re.compile(r"^ppt/fonts/")
+_REL = re.compile(r"<Relationship [^>]*/>")
+# EOT header up to the name strings, version 0x00020001 (little-endian)
+_EOT_HEADER = struct.Struct("<4L10s2BL2H4L2LL4L")
+_EOT_VERSION = 0x00020001
+_EOT_MAGIC = 0x504C
+_EOT_SUBSET = 0x1  # TTEMBED_SUBSET
+_DEFAULT_CHARSET = 1
+
+EmbedStats = collections.namedtuple("EmbedStats", "faces glyphs missing font_bytes")
+Face = collections.namedtuple("Face", "scripts bold family path codepoints missing size")
+
+
+class FontEmbedError(ValueError):
+    """A font that cannot be embedded (missing, licence-restricted, CFF outlines)."""
+
+
+def _is_cjk(cp):
+    return any(lo <= cp <= hi for lo, hi in CJK_RANGES)
+
+
+def _para_bold(p, levels=None):
+    """Whether ``p``'s runs are bold by default: its own ``defRPr``, else its list level's."""
+    ppr = p.find(_A + "pPr")
+    rpr = ppr.find(_A + "defRPr") if ppr is not None else None
+    if rpr is None or rpr.get("b") is None:
+        level = (levels or {}).get(int(ppr.get("lvl", 0)) if ppr is not None else 0)
+        rpr = level.find(_A + "defRPr") if level is not None else None
+    return rpr is not None and rpr.get("b") == "1"
+
+
+def _slide_levels(layouts, part, root):
+    """``{a:p: level styles}`` for the paragraphs of slide ``part``'s placeholders."""
+    placeholders = layouts.placeholders(part)
+    levels = {}
+    for sp in root.iter(_P + "sp"):
+        styles = level_styles(placeholders.get(placeholder_key(sp)))
+        if styles:
+            for p in sp.iter(_A + "p"):
+                levels[p] = styles
+    return levels
+
+
+def used_codepoints(zf):
+    """``{(script, bold): set of code points}`` over slides, notes and charts of ``zf``.
+
+    ``script`` is ``"latin"`` or ``"ea"``; runs that name their own typeface are
+    skipped, they do not use the theme faces. Slide placeholders take their
+    bold default from the layout.
+    """
+    used = collections.defaultdict(set)
+    layouts = Layouts(zf)
+
+    def add(text, bold):
+        for ch in text:
+            cp = ord(ch)
+            if cp < 0x20:
+                continue
+            if cp in _SHARED:
+                used["ea", bold].add(cp)
+                used["latin", bold].add(cp)
+            else:
+                used["ea" if _is_cjk(cp) else "latin", bold].add(cp)
+
+    for name in zf.namelist():
+        if not _TEXT_PARTS.match(name):
+            continue
+        root = ET.fromstring(zf.read(name))
+        if name.startswith("ppt/charts/"):
+            for el in root.iter():
+                if el.tag in (_C + "v", _A + "t") and el.text:
+                    add(el.text, False)
+            continue
+        levels = _slide_levels(layouts, name, root) if name.startswith("ppt/slides/") else {}
+        for p in root.iter(_A + "p"):
+            default = _para_bold(p, levels.get(p))
+            for run in p:
+                if run.tag not in (_A + "r", _A + "fld"):
+                    continue
+                rpr = run.find(_A + "rPr")
+                if rpr is not None and (rpr.find(_A + "latin") is not None or rpr.find(_A + "ea") is not None):
+                    continue
+                bold = rpr.get("b") == "1" if rpr is not None and rpr.get("b") else default
+                add("".join(t.text or "" for t in run.iter(_A + "t")), bold)
+    return used
+
+
+def _family(font):
+    name = font["name"]
+    record = name.getName(1, 3, 1, 0x409) or name.getName(1, 1, 0, 0)
+    return str(record) if record else name.getDebugName(1)
+
+
+def subset_font(path, codepoints):
+    """``(family, TrueType bytes, code points the font lacks)`` for ``codepoints`` of ``path``.
+
+    Fonts flagged "no subsetting" are embedded whole.
+    """
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+    except ImportError:
+        raise FontEmbedError("font embedding needs fontTools (pip install fonttools)") from None
+
+    # recalcTimestamp=False keeps head.modified, so the same deck subsets to the same bytes
+    font = TTFont(path, fontNumber=0, recalcTimestamp=False, lazy=False)
+    if "glyf" not in font:
+        raise FontEmbedError("%s: CFF outlines; PowerPoint embeds TrueType fonts only" % path)
+    fs_type = font["OS/2"].fsType if "OS/2" in font else 0
+    if fs_type & (_RESTRICTED | _BITMAP_ONLY):
+        raise FontEmbedError("%s: the font licence does not allow embedding (fsType 0x%04x)" % (path, fs_type))
+    cmap = font.getBestCmap()
+    missing = {cp for cp in codepoints if cp not in cmap}
+    if not fs_type & _NO_SUBSET:
+        options = subset.Options()
+        options.name_IDs = ["*"]
+        options.notdef_outline = True
+        options.recalc_timestamp = False
+        options.drop_tables += ["FFTM"]  # FontForge build timestamps
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=sorted(set(codepoints) - missing))
+        subsetter.subset(font)
+    buf = io.BytesIO()
+    font.save(buf)
+    return _family(font), buf.getvalue(), missing
+
+
+def eot_data(ttf):
+    """TrueType bytes ``ttf`` wrapped in an uncompressed EOT header (the .fntdata format)."""
+    from fontTools.ttLib import TTFont
+
+    font = TTFont(io.BytesIO(ttf), lazy=True)
+    os2, head = font["OS/2"], font["head"]
+    names = []
+    for name_id in (1, 2, 5, 4):  # family, style, version, full name
+        record = font["name"].getName(name_id, 3, 1, 0x409) or font["name"].getName(name_id, 1, 0, 0)
+        names.append(str(record).encode("utf-16-le") if record else b"")
+    panose = os2.panose
+    fields = (panose.bFamilyType, panose.bSerifStyle, panose.bWeight, panose.bProportion, panose.bContrast,
+              panose.bStrokeVariation, panose.bArmStyle, panose.bLetterForm, panose.bMidline, panose.bXHeight)
+    strings = b"".join(struct.pack("<2H", 0, len(n)) + n for n in names) + struct.pack("<2H", 0, 0)  # + root string
+    size = _EOT_HEADER.size + len(strings) + len(ttf)
+    header = _EOT_HEADER.pack(
+        size, len(ttf), _EOT_VERSION, 0 if os2.fsType & _NO_SUBSET else _EOT_SUBSET, bytes(fields), _DEFAULT_CHARSET,
+        os2.fsSelection & 1, os2.usWeightClass, os2.fsType, _EOT_MAGIC,
+        os2.ulUnicodeRange1, os2.ulUnicodeRange2, os2.ulUnicodeRange3, os2.ulUnicodeRange4,
+        getattr(os2, "ulCodePageRange1", 0), getattr(os2, "ulCodePageRange2", 0),
+        head.checkSumAdjustment, 0, 0, 0, 0,
+    )
+    return header + strings + ttf
+
+
+def default_font_paths():
+    """``{(script, bold): path}`` of the local faces metrics measures with."""
+    paths = {}
+    for script, names in (("latin", LATIN_FONTS), ("ea", CJK_FONTS)):
+        for bold in (False, True):
+            path = find_font(names[bold])
+            if path:
+                paths[script, bold] = path
+    return paths
+
+
+def _set_theme_fonts(xml, families):
+    """Theme XML with the major and minor latin / ea typefaces set to ``families``."""
+    def font_scheme(m):
+        scheme = m.group(0)
+        if "latin" in families:
+            scheme = re.sub(r'(<a:latin typeface=")[^"]*"', r'\g<1>%s"' % families["latin"], scheme)
+        if "ea" in families:
+            scheme = re.sub(r'(<a:ea typeface=")[^"]*"', r'\g<1>%s"' % families["ea"], scheme)
+            # script-specific faces win over ea for Chinese text; point them at the embedded family too
+            scheme = re.sub(r'(<a:font script="(?:Hans|Hant)" typeface=")[^"]*"', r'\g<1>%s"' % families["ea"], scheme)
+        return scheme
+
+    return re.sub(r"<a:fontScheme .*?</a:fontScheme>", font_scheme, xml, flags=re.S)
+
+
+def _embed_presentation(pres, embedded):
+    """presentation.xml with ``p:embeddedFontLst`` for ``[(family, {style: rId})]``."""
+    pres = re.sub(r"<p:embeddedFontLst>.*?</p:embeddedFontLst>", "", pres, flags=re.S)
+    fonts = "".join(
+        '<p:embeddedFont><p:font typeface="%s"/>%s</p:embeddedFont>'
+        % (family, "".join('<p:%s r:id="%s"/>' % (style, rids[style])
+                           for style in ("regular", "bold") if style in rids))
+        for family, rids in embedded
+    )
+    if not embedded:
+        return pres
+    # the list follows p:notesSz in the schema
+    pres = re.sub(r"(<p:notesSz [^>]*/>)", r"\1<p:embeddedFontLst>%s</p:embeddedFontLst>" % fonts, pres, count=1)
+    if "embedTrueTypeFonts=" not in pres:
+        pres = pres.replace("<p:presentation ", '<p:presentation embedTrueTypeFonts="1" ', 1)
+    return pres
+
+
+def embed_fonts(path, out_path=None, fonts=None):
+    """Embed subsets of the deck's faces into ``out_path`` (default: in place); returns EmbedStats.
+
+    ``fonts`` maps ``(script, bold)`` -- script ``"latin"`` or ``"ea"`` -- to font
+    files; missing entries fall back to ``default_font_paths()``. A bold face
+    without its own file is left to PowerPoint's synthetic bold.
+    """
+    paths = dict(default_font_paths())
+    paths.update(fonts or {})
+    out_path = out_path or path
+    tmp = out_path + ".tmp"
+    with zipfile.ZipFile(path) as src:
+        used = used_codepoints(src)
+        wanted = collections.OrderedDict()  # (font path, bold) -> (scripts, code points)
+        for script in ("latin", "ea"):
+            bold_cps = used.get((script, True), set())
+            # the regular face covers bold text too, for PowerPoint's synthetic bold
+            cps = used.get((script, False), set()) | bold_cps
+            if not cps:
+                continue
+            if script == "latin":
+                cps |= _ASCII
+            if paths.get((script, False)) is None:
+                raise FontEmbedError("no %s font found (set DECKGEN_FONT_DIRS or pass one)"
+                                     % ("CJK" if script == "ea" else "latin"))
+            for bold, want in ((False, cps), (True, bold_cps)):
+                font_path = paths.get((script, bold))
+                if want and font_path is not None:
+                    scripts, codepoints = wanted.setdefault((font_path, bold), ([], set()))
+                    scripts.append(script)
+                    codepoints |= want
+        faces, regular = [], {}  # regular: script -> embedded family
+        for (font_path, bold), (scripts, cps) in sorted(wanted.items(), key=lambda item: item[0][1]):
+            family, blob, missing = subset_font(font_path, cps)
+            blob = eot_data(blob)
+            if bold and any(regular.get(script) != family for script in scripts):
+                continue  # a bold file of another family cannot be this face's bold style
+            if not bold:
+                regular.update(dict.fromkeys(scripts, family))
+            faces.append((Face("+".join(scripts), bold, family, font_path, len(cps), len(missing), len(blob)), blob))
+
+        pres = src.read("ppt/presentation.xml").decode("utf-8")
+        rels = [r for r in _REL.findall(src.read("ppt/_rels/presentation.xml.rels").decode("utf-8"))
+                if 'Type="%sfont"' % _RT not in r]
+        next_rid = max(int(n) for n in re.findall(r'Id="rId(\d+)"', "".join(rels))) + 1
+        embedded = collections.OrderedDict()  # family -> {style: rId}
+        parts = []
+        for n, (face, blob) in enumerate(faces, 1):
+            rid = "rId%d" % (next_rid + n - 1)
+            partname = "ppt/fonts/font%d.fntdata" % n
+            rels.append('<Relationship Id="%s" Type="%sfont" Target="fonts/font%d.fntdata"/>' % (rid, _RT, n))
+            embedded.setdefault(face.family, {})["bold" if face.bold else "regular"] = rid
+            parts.append((partname, blob))
+        types = src.read("[Content_Types].xml").decode("utf-8")
+        if 'Extension="fntdata"' not in types:
+            default = '<Default Extension="fntdata" ContentType="%s"/>' % FONT_TYPE
+            types = types.replace("<Default ", default + "<Default ", 1)
+
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as out:
+                for name in src.namelist():
+                    if name == "ppt/presentation.xml":
+                        write_str(out, name, _embed_presentation(pres, list(embedded.items())))
+                    elif name == "ppt/_rels/presentation.xml.rels":
+                        write_str(out, name, _XML_DECL + '<Relationships xmlns="%s">%s</Relationships>'
+                                  % (_RELS_NS, "".join(rels)))
+                    elif name == "[Content_Types].xml":
+                        write_str(out, name, types)
+                    elif _THEME_PARTS.match(name):
+                        write_str(out, name, _set_theme_fonts(src.read(name).decode("utf-8"), regular))
+                    elif not _FONT_PARTS.match(name):
+                        copy_entry(src, out, name)
+                for partname, blob in parts:
+                    write_str(out, partname, blob)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    os.replace(tmp, out_path)
+    faces = [f for f, _ in faces]
+    return EmbedStats(faces, sum(f.codepoints for f in faces), sum(f.missing for f in faces),
+                      sum(f.size for f in faces))
@@ -0,0 +1,214 @@
+"""
+Pixel size and DPI of PNG / JPEG / WebP / GIF files from their headers alone.
+
+Layout code needs an image's aspect ratio to fit it into a box (leijunskill
+§2.8.6: at most 6.333" x 4.0") before python-pptx is handed the picture.
+``probe`` reads chunk and marker headers only -- usually the first few hundred
+bytes, seeking past anything larger -- and never decodes pixel data.
+``probe_file`` memoizes results per (path, size, mtime) in this process, for
+the ``PROBE_CACHE_SIZE`` most recently probed files.
+
+DPI follows Pillow, which python-pptx sizes pictures with: PNG ``pHYs`` in
+pixels per metre, JPEG JFIF density (or EXIF resolution), 72 when absent.
+"""
+
+import collections
+import os
+import struct
+
+ImageInfo = collections.namedtuple("ImageInfo", "format width height dpi")
+
+DEFAULT_DPI = 72
+PROBE_CACHE_SIZE = 4096
+# SOFn markers carrying the frame size (not DHT, JPG and DAC, which share the range)
+_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+_probed = collections.OrderedDict()
+
+
+class ImageError(ValueError):
+    """An image that cannot be laid out, such as one without pixels."""
+
+
+def _dpi(value):
+    """python-pptx's DPI normalization: a whole number in 1..2048, else 72."""
+    try:
+        dpi = int(round(float(value)))
+    except (TypeError, ValueError):
+        return DEFAULT_DPI
+    return dpi if 1 <= dpi <= 2048 else DEFAULT_DPI
+
+
+def _png(f):
+    f.seek(8)
+    length, kind = struct.unpack(">I4s", f.read(8))
+    if kind != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", f.read(8))
+    f.seek(length - 8 + 4, 1)  # rest of IHDR, CRC
+    dpi = (DEFAULT_DPI, DEFAULT_DPI)
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, kind = struct.unpack(">I4s", header)
+        if kind == b"pHYs":
+            px, py, unit = struct.unpack(">IIB", f.read(9))
+            if unit == 1:
+                dpi = (_dpi(px * 0.0254), _dpi(py * 0.0254))
+            break
+        if kind in (b"IDAT", b"IEND"):
+            break
+        f.seek(length + 4, 1)
+    return ImageInfo("PNG", width, height, dpi)
+
+
+def _exif_dpi(data):
+    """Resolution from an EXIF (TIFF) block, as Pillow reads it; None when absent."""
+    if data[:6] != b"Exif\0\0":
+        return None
+    tiff = data[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return None
+    try:
+        (ifd,) = struct.unpack(order + "I", tiff[4:8])
+        (count,) = struct.unpack(order + "H", tiff[ifd:ifd + 2])
+        tags = {}
+        for i in range(count):
+            tag, kind, _, value = struct.unpack(order + "HHI4s", tiff[ifd + 2 + 12 * i:ifd + 14 + 12 * i])
+            if tag == 0x0128:  # ResolutionUnit, SHORT
+                tags[tag] = struct.unpack(order + "H", value[:2])[0]
+            elif tag == 0x011A and kind == 5:  # XResolution, RATIONAL at an offset
+                (offset,) = struct.unpack(order + "I", value)
+                num, den = struct.unpack(order + "II", tiff[offset:offset + 8])
+                tags[tag] = num / den if den else None
+    except struct.error:
+        return None
+    if 0x0128 not in tags or tags.get(0x011A) is None:
+        return (DEFAULT_DPI, DEFAULT_DPI)  # Pillow falls back to 72 once EXIF is present
+    dpi = tags[0x011A] * (2.54 if tags[0x0128] == 3 else 1)
+    return (_dpi(dpi), _dpi(dpi))
+
+
+def _jpeg(f):
+    f.seek(2)
+    dpi = exif = None
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        kind = marker[1]
+        if kind == 0xFF:  # fill byte
+            f.seek(-1, 1)
+            continue
+        if kind in (0xD8, 0x01) or 0xD0 <= kind <= 0xD7:  # no length
+            continue
+        (length,) = struct.unpack(">H", f.read(2))
+        if kind in _SOF:
+            height, width = struct.unpack(">xHH", f.read(5))
+            if dpi is None:
+                dpi = exif or (DEFAULT_DPI, DEFAULT_DPI)
+            return ImageInfo("JPEG", width, height, dpi)
+        if kind == 0xE0 and dpi is None:
+            segment = f.read(length - 2)
+            if segment[:5] == b"JFIF\0" and len(segment) >= 12:
+                unit, dx, dy = struct.unpack(">BHH", segment[7:12])
+                if unit == 1:
+                    dpi = (_dpi(dx), _dpi(dy))
+                elif unit == 2:
+                    dpi = (_dpi(dx * 2.54), _dpi(dy * 2.54))
+        elif kind == 0xE1 and exif is None:
+            exif = _exif_dpi(f.read(length - 2))
+        else:
+            f.seek(length - 2, 1)
+        if kind == 0xDA:  # start of scan without a frame header
+            return None
+
+
+def _webp(f):
+    f.seek(12)
+    kind, _ = struct.unpack("<4sI", f.read(8))
+    data = f.read(10)
+    if kind == b"VP8 ":
+        width, height = struct.unpack("<HH", data[6:10])
+        width, height = width & 0x3FFF, height & 0x3FFF
+    elif kind == b"VP8L":
+        bits = int.from_bytes(data[1:5], "little")
+        width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    elif kind == b"VP8X":
+        width = int.from_bytes(data[4:7], "little") + 1
+        height = int.from_bytes(data[7:10], "little") + 1
+    else:
+        return None
+    return ImageInfo("WEBP", width, height, (DEFAULT_DPI, DEFAULT_DPI))
+
+
+def _gif(f):
+    f.seek(6)
+    width, height = struct.unpack("<HH", f.read(4))
+    return ImageInfo("GIF", width, height, (DEFAULT_DPI, DEFAULT_DPI))
+
+
+def _probe(f):
+    f.seek(0)
+    head = f.read(16)
+    try:
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _png(f)
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg(f)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _webp(f)
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return _gif(f)
+    except struct.error:  # truncated file
+        return None
+    return None
+
+
+def probe(f):
+    """``ImageInfo`` of the seekable binary stream ``f``; None for other formats or a 0-pixel size."""
+    info = _probe(f)
+    if info is None or not (info.width and info.height):
+        return None
+    return info
+
+
+def probe_file(path):
+    """``probe`` of the file at ``path``, memoized; None if it is missing or not a known format."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return None
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key in _probed:
+        _probed.move_to_end(key)
+        return _probed[key]
+    with open(path, "rb") as f:
+        info = _probed[key] = probe(f)
+    if len(_probed) > PROBE_CACHE_SIZE:
+        _probed.popitem(last=False)
+    return info
+
+
+def fit_size(info, width=None, height=None, max_width=None, max_height=None):
+    """Display ``(width, height)`` in inches for an image, shrunk to fit the max box.
+
+    ``width`` / ``height`` are the requested size (either may be None, as for
+    ``add_picture``); the missing one follows the native aspect ratio.
+    Raises ImageError for an image 0 pixels wide or high.
+    """
+    if not (info.width and info.height):
+        raise ImageError("%s image is %d x %d pixels" % (info.format, info.width, info.height))
+    native_w, native_h = info.width / info.dpi[0], info.height / info.dpi[1]
+    if width and height:
+        w, h = width, height
+    elif width:
+        w, h = width, native_h * width / native_w
+    elif height:
+        w, h = native_w * height / native_h, height
+    else:
+        w, h = native_w, native_h
+    scale = min([1.0] + [limit / size for limit, size in ((max_width, w), (max_height, h)) if limit])
+    return w * scale, h * scale
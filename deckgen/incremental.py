@@ -0,0 +1,183 @@
+"""
+Incremental rebuilds: re-render only the slides whose inputs changed.
+
+``IncrementalDeckWriter`` is a StreamingDeckWriter that keeps a manifest next
+to the output (``<deck>.pptx.manifest.json``) holding one content hash per
+slide, taken over its rendered text shapes (page type, title, bullets ...),
+image digests and speaker notes. On the next build every slide whose hash is
+unchanged is copied out of the existing .pptx as compressed bytes, together
+with the media it references; only changed slides are rendered again.
+
+Anything that affects every slide -- theme, image cache settings, python-pptx
+version -- is folded into a deck key; when it differs, or the .pptx was
+modified since the manifest was written, the deck is rebuilt from scratch.
+"""
+
+import hashlib
+import json
+import os
+
+import pptx
+
+from .assets import _write_atomic
+from .engine import CHART, PICTURE, THEME
+from .package import copy_entry, open_zip, source_date
+from .writer import StreamingDeckWriter, _Media, slide_parts
+
+MANIFEST_VERSION = 2
+
+_digests = {}
+
+
+def manifest_path(out_path):
+    return out_path + ".manifest.json"
+
+
+def file_digest(path):
+    """sha256 of ``path``'s content, memoized per (path, size, mtime) in this process."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = _digests[key] = h.hexdigest()
+    return digest
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class IncrementalDeckWriter(StreamingDeckWriter):
+    """StreamingDeckWriter that reuses unchanged slides from the previous build.
+
+    The new package is written next to ``out_path`` and moved over it by
+    ``save()``; ``rebuilt`` lists the slide numbers that were rendered.
+    """
+
+    def __init__(self, out_path, theme=THEME, images=None):
+        self.final_path = out_path
+        self.rebuilt = []
+        self._old = None
+        self._old_slides = []
+        self._old_media = {}  # sha1 -> _Media of the previous build
+        self._slides = []
+        super().__init__(out_path + ".tmp", theme, images)
+
+    def _deck_key(self):
+        key = {
+            "version": MANIFEST_VERSION,
+            "pptx": pptx.__version__,
+            "theme": self.theme,
+            "images": type(self.images).__name__,
+            "dpi": getattr(self.images, "dpi", None),
+            "source_date": source_date(),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _load_previous(self):
+        try:
+            with open(manifest_path(self.final_path), encoding="utf-8") as f:
+                manifest = json.load(f)
+            current = manifest.get("deck") == self._deck_key() and manifest.get("output") == _stat_key(self.final_path)
+        except (OSError, ValueError):
+            return
+        if not current:
+            return
+        self._old = open_zip(self.final_path)
+        if self._old is None:
+            return
+        self._old_slides = manifest["slides"]
+        self._old_media = {sha1: _Media(*entry) for sha1, entry in manifest["media"].items()}
+        self._old_parts = {m.partname: sha1 for sha1, m in self._old_media.items()}
+        # new media must not reuse a name a copied slide still points at
+        self._images = max((int(p.rsplit("image", 1)[1].split(".")[0]) for p in self._old_parts), default=0)
+
+    def _write_fixed_parts(self):
+        self._load_previous()
+        if self._old is None:
+            super()._write_fixed_parts()
+            return
+        for name, _ in self._skel.parts:
+            copy_entry(self._old, self._zip, name)
+
+    def _image_digest(self, img_path):
+        if not img_path or not os.path.exists(img_path):
+            return None
+        if hasattr(self.images, "digest"):
+            return self.images.digest(img_path)
+        return file_digest(img_path)
+
+    def _slide_digest(self, kind, shapes, notes):
+        h = hashlib.sha256(kind.encode("utf-8"))  # the slide's layout
+        for render, *args in shapes:
+            if render == PICTURE:
+                img_path, spec = args
+                h.update(json.dumps([self._image_digest(img_path), spec], sort_keys=True).encode("utf-8"))
+            elif render == CHART:
+                h.update(json.dumps(args, sort_keys=True).encode("utf-8"))
+            else:
+                # shape ids only depend on which pictures exist, hashed above
+                h.update(render(0, *args).encode("utf-8"))
+        h.update(notes.encode("utf-8"))
+        return h.hexdigest()
+
+    def _add_media(self, img, blob):
+        old = self._old_media.get(img.sha1)
+        if old is None:
+            return super()._add_media(img, blob)
+        copy_entry(self._old, self._zip, old.partname)
+        return old
+
+    def _reuse_media(self, partname):
+        sha1 = self._old_parts[partname]
+        if sha1 not in self._media:
+            copy_entry(self._old, self._zip, partname)
+            self._media[sha1] = self._old_media[sha1]
+
+    def _add_slide(self, kind, shapes, notes):
+        n = self._count = self._count + 1
+        digest = self._slide_digest(kind, shapes, notes)
+        old = self._old_slides[n - 1] if n <= len(self._old_slides) else None
+        # chart parts are numbered per build, so slides with charts are always rendered
+        charts = any(render == CHART for render, *_ in shapes)
+        if old is not None and old["hash"] == digest and not charts:
+            # media first, as a fresh build writes it, so the entry order does not depend on reuse
+            for partname in old["media"]:
+                self._reuse_media(partname)
+            for name in slide_parts(n):
+                copy_entry(self._old, self._zip, name)
+            media = old["media"]
+        else:
+            media = self._write_slide(n, kind, shapes, notes)
+            self.rebuilt.append(n)
+        self._slides.append({"hash": digest, "media": media})
+        return n
+
+    def save(self, out_path=None):
+        """Finish the package, move it over the previous build and update the manifest."""
+        if out_path is not None and os.path.abspath(out_path) != os.path.abspath(self.final_path):
+            raise ValueError("IncrementalDeckWriter writes to %s, not %s" % (self.final_path, out_path))
+        if self._zip is None:
+            return self.final_path
+        super().save()
+        if self._old is not None:
+            self._old.close()
+        os.replace(self.out_path, self.final_path)
+        manifest = {
+            "deck": self._deck_key(),
+            "output": _stat_key(self.final_path),
+            "slides": self._slides,
+            "media": {sha1: list(m) for sha1, m in self._media.items()},
+        }
+        _write_atomic(manifest_path(self.final_path), json.dumps(manifest, indent=1).encode("utf-8"))
+        return self.final_path
+
+    def close(self):
+        super().close()
+        if self._old is not None:
+            self._old.close()
@@ -0,0 +1,240 @@
+"""
+Layout-safety linter for generated decks (leijunskill §2.8 / §5).
+
+Only the slide XML parts of each .pptx (and the layouts their placeholders
+inherit a box from) are read, with a streaming parser; media and every other
+part stay compressed in the zip. Each top-level shape's offset/extent is
+checked with interval tests against the §2.8.2 zone table:
+
+* a shape must lie inside a single zone (title 0.3-1.5", subtitle 1.5-2.0",
+  content 2.0-5.8", footer 6.0-7.5") -- crossing a boundary is an error,
+  except that content may start at 1.8", where the §2.8.4-§2.8.6 templates
+  put body text, big numbers and split images;
+* pictures on non-cover slides start at left >= 6.5" (§2.8.6) and are at most
+  4.0" tall (3.0" on the cover, §2.8.3);
+* no two shapes on a slide overlap;
+* the signature (§5) appears on the cover and closing slides, and only there;
+* nothing leaves the 13.333" x 7.5" canvas.
+"""
+
+import collections
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+from .engine import SLIDE_H, SLIDE_W, THEME
+
+EMU_PER_INCH = 914400
+EPSILON = 0.01  # inches; absorbs EMU rounding
+
+# leijunskill §2.8.2, (name, top, bottom) in inches
+ZONES = (
+    ("title", 0.3, 1.5),
+    ("subtitle", 1.5, 2.0),
+    ("content", 2.0, 5.8),
+    ("footer", 6.0, 7.5),
+)
+# the §2.8.4-§2.8.6 templates start content boxes here, inside the subtitle zone
+TEMPLATE_CONTENT_TOP = 1.8
+SPLIT_IMAGE_LEFT = 6.5
+MAX_IMAGE_HEIGHT = 4.0
+MAX_COVER_IMAGE_HEIGHT = 3.0
+
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_SHAPES = {_P + "sp", _P + "pic", _P + "graphicFrame", _P + "grpSp", _P + "cxnSp"}
+
+Shape = collections.namedtuple("Shape", "id name kind left top width height text")
+Violation = collections.namedtuple("Violation", "path slide shape rule message")
+
+
+def _overlap(a0, a1, b0, b1):
+    return min(a1, b1) - max(a0, b0) > EPSILON
+
+
+def slide_names(zf):
+    """Slide part names of an open .pptx in presentation order."""
+    pres = ET.fromstring(zf.read("ppt/presentation.xml"))
+    rels = ET.fromstring(zf.read("ppt/_rels/presentation.xml.rels"))
+    targets = {r.get("Id"): r.get("Target") for r in rels}
+    return [
+        posixpath.normpath(posixpath.join("ppt", targets[s.get(_R + "id")]))
+        for s in pres.iter(_P + "sldId")
+    ]
+
+
+def related_part(zf, part, rel_type):
+    """Partname ``part``'s first relationship of type ``rel_type`` points at; None if none."""
+    folder, name = posixpath.split(part)
+    try:
+        rels = ET.fromstring(zf.read(posixpath.join(folder, "_rels", name + ".rels")))
+    except KeyError:
+        return None
+    for rel in rels:
+        if rel.get("Type", "").endswith("/" + rel_type):
+            return posixpath.normpath(posixpath.join(folder, rel.get("Target")))
+    return None
+
+
+def placeholder_key(sp):
+    """What links a placeholder to its layout's: the type for titles, else the idx."""
+    ph = next(sp.iter(_P + "ph"), None)
+    if ph is None:
+        return None
+    return ph.get("idx") or ph.get("type", "obj")
+
+
+def level_styles(sp):
+    """Placeholder ``sp``'s list styles, ``{level: a:lvlNpPr}`` with level 0 for ``lvl1pPr``."""
+    lst = sp.find(_P + "txBody/" + _A + "lstStyle") if sp is not None else None
+    if lst is None:
+        return {}
+    return {int(el.tag[len(_A) + 3:-3]) - 1: el for el in lst if re.match(r"lvl\d+pPr$", el.tag[len(_A):])}
+
+
+class Layouts:
+    """What the slides of one open .pptx inherit from their layouts and master, parsed once each.
+
+    ``placeholders(part)`` maps ``placeholder_key`` to the layout's ``p:sp``,
+    which holds the box and text styles of a slide placeholder without its
+    own; ``background(part, root)`` is the ``p:bgPr`` the slide shows.
+    """
+
+    def __init__(self, zf):
+        self.zf = zf
+        self._roots = {}
+        self._placeholders = {}
+
+    def _root(self, part):
+        root = self._roots.get(part)
+        if root is None:
+            root = self._roots[part] = ET.fromstring(self.zf.read(part))
+        return root
+
+    def placeholders(self, part):
+        layout = related_part(self.zf, part, "slideLayout")
+        if layout is None:
+            return {}
+        found = self._placeholders.get(layout)
+        if found is None:
+            found = self._placeholders[layout] = {
+                placeholder_key(sp): sp for sp in self._root(layout).iter(_P + "sp") if placeholder_key(sp) is not None
+            }
+        return found
+
+    def background(self, part, root):
+        """The ``p:bgPr`` of slide ``part`` (parsed as ``root``), its layout or its master; None if none."""
+        chain = [root]
+        layout = related_part(self.zf, part, "slideLayout")
+        if layout is not None:
+            chain.append(self._root(layout))
+            master = related_part(self.zf, layout, "slideMaster")
+            if master is not None:
+                chain.append(self._root(master))
+        for el in chain:
+            bg = el.find(_P + "cSld/" + _P + "bg/" + _P + "bgPr")
+            if bg is not None:
+                return bg
+        return None
+
+
+def _xfrm(el):
+    xfrm = next(el.iter(_A + "xfrm"), None)
+    if xfrm is None:
+        xfrm = next(el.iter(_P + "xfrm"), None)  # graphicFrame
+    return xfrm
+
+
+def read_shapes(stream, placeholders=None):
+    """Top-level shapes of one slide XML stream, parsed incrementally.
+
+    Placeholders without a box of their own take it from ``placeholders``
+    (``Layouts.placeholders``); without it they are skipped.
+    """
+    shapes = []
+    depth = 0  # nesting inside shapes; only depth-1 shapes are reported
+    for event, el in ET.iterparse(stream, events=("start", "end")):
+        if el.tag not in _SHAPES:
+            continue
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 0:
+            c_nv = next(el.iter(_P + "cNvPr"), None)
+            xfrm = _xfrm(el)
+            if xfrm is None and placeholders:
+                inherited = placeholders.get(placeholder_key(el))
+                xfrm = _xfrm(inherited) if inherited is not None else None
+            off = xfrm.find(_A + "off") if xfrm is not None else None
+            ext = xfrm.find(_A + "ext") if xfrm is not None else None
+            if off is not None and ext is not None:
+                shapes.append(Shape(
+                    int(c_nv.get("id", 0)) if c_nv is not None else 0,
+                    c_nv.get("name", "") if c_nv is not None else "",
+                    el.tag[len(_P):],
+                    int(off.get("x")) / EMU_PER_INCH, int(off.get("y")) / EMU_PER_INCH,
+                    int(ext.get("cx")) / EMU_PER_INCH, int(ext.get("cy")) / EMU_PER_INCH,
+                    # one line per paragraph, like python-pptx's text_frame.text
+                    "\n".join("".join(t.text or "" for t in p.iter(_A + "t")) for p in el.iter(_A + "p")),
+                ))
+            el.clear()
+    return shapes
+
+
+def zones_of(shape):
+    """Names of the §2.8.2 zones ``shape``'s vertical extent overlaps ("gap" for none)."""
+    top, bottom = shape.top, shape.top + shape.height
+    hits = [name for name, z0, z1 in ZONES if _overlap(top, bottom, z0, z1)]
+    covered = sum(min(bottom, z1) - max(top, z0) for name, z0, z1 in ZONES if name in hits)
+    if covered < (bottom - top) - EPSILON:
+        hits.append("gap")
+    return hits
+
+
+def lint_slide(shapes, is_cover, is_closing, signature):
+    """Yield ``(shape, rule, message)`` for one slide's shapes."""
+    is_sig = [bool(s.text) and signature in s.text for s in shapes]
+    if any(is_sig) and not (is_cover or is_closing):
+        yield shapes[is_sig.index(True)], "signature", "signature on a slide that is neither cover nor closing"
+    if (is_cover or is_closing) and not any(is_sig):
+        yield None, "signature", "%s slide without signature" % ("cover" if is_cover else "closing")
+    for s in shapes:
+        if s.left < -EPSILON or s.top < -EPSILON or s.left + s.width > SLIDE_W + EPSILON \
+                or s.top + s.height > SLIDE_H + EPSILON:
+            yield s, "canvas", "extends past the %.3g\" x %.3g\" slide" % (SLIDE_W, SLIDE_H)
+        zones = zones_of(s)
+        if zones == ["subtitle", "content"] and s.top >= TEMPLATE_CONTENT_TOP - EPSILON:
+            zones = ["content"]
+        if len(zones) > 1:
+            yield s, "zone", "%.2f-%.2f\" spans %s" % (s.top, s.top + s.height, " + ".join(zones))
+        if s.kind == "pic":
+            limit = MAX_COVER_IMAGE_HEIGHT if is_cover else MAX_IMAGE_HEIGHT
+            if s.height > limit + EPSILON:
+                yield s, "image-height", "image %.2f\" tall (max %.1f\")" % (s.height, limit)
+            if not is_cover and s.left < SPLIT_IMAGE_LEFT - EPSILON:
+                yield s, "image-left", "image at left %.2f\" (split images start at %.1f\")" % (
+                    s.left, SPLIT_IMAGE_LEFT)
+    for i, a in enumerate(shapes):
+        for b in shapes[i + 1:]:
+            if _overlap(a.left, a.left + a.width, b.left, b.left + b.width) \
+                    and _overlap(a.top, a.top + a.height, b.top, b.top + b.height):
+                yield a, "overlap", "overlaps %s (id %d)" % (b.name, b.id)
+
+
+def lint_deck(path, signature=None):
+    """All violations in the .pptx at ``path``, as ``Violation`` records."""
+    signature = signature or THEME["signature"]["company"]
+    violations = []
+    with zipfile.ZipFile(path) as zf:
+        names = slide_names(zf)
+        layouts = Layouts(zf)
+        for number, name in enumerate(names, 1):
+            with zf.open(name) as stream:
+                shapes = read_shapes(stream, layouts.placeholders(name))
+            for shape, rule, message in lint_slide(shapes, number == 1, number == len(names), signature):
+                label = "%s (id %d)" % (shape.name, shape.id) if shape else "-"
+                violations.append(Violation(path, number, label, rule, message))
+    return violations
@@ -0,0 +1,125 @@
+"""
+Slide master and page layouts generated from a theme.
+
+``template(theme)`` is python-pptx's default template with its eleven stock
+layouts replaced by one layout per page type (``LAYOUTS``) and the master's
+background set to the theme's ``BG_COLOR``. Each layout holds the page's
+placeholders -- the §2.8 zone boxes of the theme, with every paragraph style
+of the box as one list level (size, colour, bold, alignment, spacing) -- built
+from the same compiled elements that render the slides, so a slide only
+carries its placeholders' text and picks up the rest by inheritance.
+
+The bytes are memoized per theme; DeckEngine opens its presentation from them
+and StreamingDeckWriter copies their masters, layouts and theme parts.
+"""
+
+import importlib.util
+import io
+import json
+import os
+import re
+import zipfile
+
+from .engine import _NSDECLS, _compiled_theme
+from .package import _CT, _RELS_NS, _RT, _XML_DECL, write_str
+
+# page type -> layout name, in the master's layout order
+LAYOUTS = {
+    "cover": "Cover",
+    "content": "Content",
+    "data": "Data",
+    "split": "Split",
+    "chart": "Chart",
+    "closing": "Closing",
+}
+
+_MASTER = "ppt/slideMasters/slideMaster1.xml"
+_LAYOUT = re.compile(r"^ppt/slideLayouts/(?:_rels/)?slideLayout(\d+)\.xml(?:\.rels)?$")
+_FIRST_LAYOUT_ID = 2147483649
+
+_templates = {}
+
+
+def default_template_path():
+    """python-pptx's default.pptx, located without importing python-pptx."""
+    package = importlib.util.find_spec("pptx").submodule_search_locations[0]
+    return os.path.join(package, "templates", "default.pptx")
+
+
+def page_elements(tpl, kind):
+    """The compiled elements of page ``kind`` that are placeholders, in slide order."""
+    elements = list(tpl[kind].values())
+    if kind in ("cover", "closing"):
+        elements.append(tpl["signature"])
+    return elements
+
+
+def layout_xml(tpl, kind):
+    """The ``p:sldLayout`` part of page ``kind`` for the compiled theme ``tpl``."""
+    shapes = "".join(
+        element.box.placeholder(shape_id, element.styles())
+        for shape_id, element in enumerate(page_elements(tpl, kind), 2)
+    )
+    return (
+        _XML_DECL + '<p:sldLayout %s preserve="1" userDrawn="1"><p:cSld name="%s"><p:spTree>'
+        '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+        "%s</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sldLayout>"
+        % (_NSDECLS, LAYOUTS[kind], shapes)
+    )
+
+
+def _master_xml(xml, background):
+    xml = re.sub(r"<p:bg>.*?</p:bg>", background, xml, count=1, flags=re.S)
+    ids = "".join('<p:sldLayoutId id="%d" r:id="rId%d"/>' % (_FIRST_LAYOUT_ID + n, n + 1) for n in range(len(LAYOUTS)))
+    return re.sub(r"<p:sldLayoutIdLst>.*?</p:sldLayoutIdLst>", "<p:sldLayoutIdLst>%s</p:sldLayoutIdLst>" % ids,
+                  xml, count=1, flags=re.S)
+
+
+def _master_rels():
+    rels = [("rId%d" % n, "slideLayout", "../slideLayouts/slideLayout%d.xml" % n) for n in range(1, len(LAYOUTS) + 1)]
+    rels.append(("rId%d" % (len(LAYOUTS) + 1), "theme", "../theme/theme1.xml"))
+    return _XML_DECL + '<Relationships xmlns="%s">%s</Relationships>' % (_RELS_NS, "".join(
+        '<Relationship Id="%s" Type="%s%s" Target="%s"/>' % (rid, _RT, kind, target) for rid, kind, target in rels
+    ))
+
+
+def _content_types(xml):
+    def keep(m):
+        n = int(m.group(1))
+        return m.group(0) if n <= len(LAYOUTS) else ""
+
+    layout = re.escape(_CT + "slideLayout+xml")
+    return re.sub(r'<Override PartName="/ppt/slideLayouts/slideLayout(\d+)\.xml" ContentType="%s"/>' % layout,
+                  keep, xml)
+
+
+def _build(theme):
+    tpl = _compiled_theme(theme)
+    layouts = list(LAYOUTS)
+    out = io.BytesIO()
+    with zipfile.ZipFile(default_template_path()) as src, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as dst:
+        for name in src.namelist():
+            m = _LAYOUT.match(name)
+            if m and int(m.group(1)) > len(layouts):
+                continue
+            if m and not name.endswith(".rels"):
+                data = layout_xml(tpl, layouts[int(m.group(1)) - 1])
+            elif name == _MASTER:
+                data = _master_xml(src.read(name).decode("utf-8"), tpl["background"])
+            elif name == "ppt/slideMasters/_rels/slideMaster1.xml.rels":
+                data = _master_rels()
+            elif name == "[Content_Types].xml":
+                data = _content_types(src.read(name).decode("utf-8"))
+            else:
+                data = src.read(name)
+            write_str(dst, name, data)
+    return out.getvalue()
+
+
+def template(theme):
+    """The .pptx bytes of an empty deck with ``theme``'s master and page layouts (memoized)."""
+    key = json.dumps(theme, sort_keys=True)
+    data = _templates.get(key)
+    if data is None:
+        data = _templates[key] = _build(theme)
+    return data
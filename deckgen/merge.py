@@ -0,0 +1,419 @@
+"""
+Merge generated decks into one package, sharing identical media.
+
+``merge_decks(paths, out_path)`` concatenates the slides of several .pptx
+files (in order) into a new package built on the first deck's package parts.
+Slide and notes XML is copied as compressed bytes: the relationship ids they
+use are kept and only the relationship targets are rewritten. Media parts are
+keyed by the SHA-256 of their bytes, so an image embedded by several decks is
+stored once and every slide that used any copy of it points at that one part.
+Images are never decoded. Chart parts and their embedded workbooks are copied
+per slide under fresh names.
+
+Slide masters are shared the same way: each master is keyed by the SHA-256 of
+its XML, theme and layouts, so decks built with one theme use one master and
+a deck with another theme (deckgen generates a master per theme) brings its
+master, layouts and theme along under new part names. Notes slides all use
+the first deck's notes master. The decks must have the same slide size.
+
+``docProps/app.xml`` reports the merged slide and notes counts; the first
+deck's word and paragraph counts and its list of slide titles are dropped
+rather than left describing that deck alone.
+"""
+
+import collections
+import hashlib
+import os
+import posixpath
+import re
+import zipfile
+
+from .package import _CT, _RELS_NS, _RT, _XML_DECL, copy_entry, raw_entry, write_raw, write_str
+
+MergeStats = collections.namedtuple("MergeStats", "decks slides media shared saved_bytes")
+
+_REL = re.compile(r"<Relationship [^>]*/>")
+_ATTR = re.compile(r'(\w+)="([^"]*)"')
+_SLD_SZ = re.compile(r"<p:sldSz [^>]*/>")
+_MASTER_IDS = re.compile(r'<p:sld(?:Master|Layout)Id id="(\d+)"')
+_THEME_CT = "application/vnd.openxmlformats-officedocument.theme+xml"
+_CHART_CT = "application/vnd.openxmlformats-officedocument.drawingml.chart+xml"
+# Parts rebuilt for the merged deck; everything else comes from the first deck.
+_PER_DECK = re.compile(
+    r"^(\[Content_Types\]\.xml|docProps/app\.xml|ppt/presentation\.xml|ppt/_rels/presentation\.xml\.rels"
+    r"|ppt/(slides|notesSlides|media|charts|embeddings)/.*)$"
+)
+# app.xml statistics of the first deck only
+_APP_STATS = re.compile(
+    r"<(Words|Paragraphs|HiddenSlides|MMClips)>[^<]*</\1>|<(HeadingPairs|TitlesOfParts)>.*?</\2>", re.S)
+
+
+class MergeError(ValueError):
+    """The decks cannot be merged (different templates, unsupported parts)."""
+
+
+def _read_rels(zf, name):
+    """``[{Id, Type, Target, ...}]`` of a .rels part (empty when absent)."""
+    try:
+        data = zf.read(name).decode("utf-8")
+    except KeyError:
+        return []
+    return [dict(_ATTR.findall(r)) for r in _REL.findall(data)]
+
+
+def _write_rels(rels):
+    return (
+        _XML_DECL + '<Relationships xmlns="%s">' % _RELS_NS
+        + "".join("<Relationship %s/>" % " ".join('%s="%s"' % kv for kv in r.items()) for r in rels)
+        + "</Relationships>"
+    )
+
+
+def _rels_name(partname):
+    folder, name = posixpath.split(partname)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def _resolve(partname, target):
+    return posixpath.normpath(posixpath.join(posixpath.dirname(partname), target))
+
+
+def _relative(partname, target_part):
+    return posixpath.relpath(target_part, posixpath.dirname(partname))
+
+
+def _slides(zf):
+    """Slide part names of an open .pptx in presentation order."""
+    pres = zf.read("ppt/presentation.xml").decode("utf-8")
+    targets = {r["Id"]: r["Target"] for r in _read_rels(zf, "ppt/_rels/presentation.xml.rels")}
+    return [_resolve("ppt/presentation.xml", targets[rid]) for rid in re.findall(r'<p:sldId [^>]*r:id="([^"]+)"', pres)]
+
+
+def _content_types(zf):
+    types = zf.read("[Content_Types].xml").decode("utf-8")
+    defaults = dict(re.findall(r'<Default Extension="([^"]+)" ContentType="([^"]+)"/>', types))
+    overrides = dict(re.findall(r'<Override PartName="([^"]+)" ContentType="([^"]+)"/>', types))
+    return defaults, overrides
+
+
+def _part_number(names, folder, stem):
+    """Highest N of ``<folder>/<stem>N.xml`` among ``names`` (0 if none)."""
+    pattern = re.compile(r"^%s/%s(\d+)\.xml$" % (re.escape(folder), stem))
+    return max((int(m.group(1)) for m in map(pattern.match, names) if m), default=0)
+
+
+def _master_parts(zf, master):
+    """``(layouts, theme)`` of slide master ``master``: its layouts in rels order and its theme."""
+    layouts, theme = [], None
+    for rel in _read_rels(zf, _rels_name(master)):
+        if rel["Type"] == _RT + "slideLayout":
+            layouts.append(_resolve(master, rel["Target"]))
+        elif rel["Type"] == _RT + "theme":
+            theme = _resolve(master, rel["Target"])
+    return layouts, theme
+
+
+def _master_digest(zf, master):
+    """SHA-256 over a master's XML, its theme and its layouts, in order."""
+    layouts, theme = _master_parts(zf, master)
+    h = hashlib.sha256()
+    for part in [master, theme, *layouts]:
+        data = zf.read(part) if part else b""
+        h.update(b"%d:" % len(data) + data)
+    return h.hexdigest()
+
+
+class _Merger:
+    def __init__(self, base, out):
+        self.base = base
+        self.out = out
+        self.count = 0
+        self.notes = 0
+        self.media = {}  # sha256 -> merged partname
+        self.sources = {}  # (deck number, media part) -> merged partname
+        self.templates = {}  # master digest -> (merged master, merged layouts in master order)
+        self.masters = {}  # (deck number, master part) -> merged master partname
+        self.layouts = {}  # (deck number, layout part) -> merged layout partname
+        self.new_masters = []  # (merged master, sldMasterId id) added to presentation.xml
+        self.charts = 0
+        self.embeddings = 0
+        self.deck = 0
+        self.saved = 0
+        self.defaults, overrides = _content_types(base)
+        self.overrides = {
+            k: v for k, v in overrides.items() if not k.startswith(
+                ("/ppt/slides/", "/ppt/notesSlides/", "/ppt/media/", "/ppt/charts/", "/ppt/embeddings/"))
+        }
+        pres = base.read("ppt/presentation.xml").decode("utf-8")
+        self.size = _SLD_SZ.search(pres).group(0)
+        self.notes_master = next(
+            (_resolve("ppt/presentation.xml", r["Target"]) for r in _read_rels(base, "ppt/_rels/presentation.xml.rels")
+             if r["Type"] == _RT + "notesMaster"), None)
+        names = base.namelist()
+        self.numbers = {
+            "master": _part_number(names, "ppt/slideMasters", "slideMaster"),
+            "layout": _part_number(names, "ppt/slideLayouts", "slideLayout"),
+            "theme": _part_number(names, "ppt/theme", "theme"),
+        }
+        # sldMasterId and sldLayoutId values share one id space across the presentation
+        ids = [int(i) for i in _MASTER_IDS.findall(pres)]
+        for rel in _read_rels(base, "ppt/_rels/presentation.xml.rels"):
+            if rel["Type"] == _RT + "slideMaster":
+                master = _resolve("ppt/presentation.xml", rel["Target"])
+                ids += [int(i) for i in _MASTER_IDS.findall(base.read(master).decode("utf-8"))]
+                self.templates.setdefault(_master_digest(base, master), (master, _master_parts(base, master)[0]))
+        self.next_id = max(ids, default=2147483647) + 1
+
+    def _number(self, kind):
+        self.numbers[kind] += 1
+        return self.numbers[kind]
+
+    def _layout(self, src, part, defaults):
+        """Merged partname of layout ``part`` of ``src``, bringing its master along if new."""
+        key = (self.deck, part)
+        if key not in self.layouts:
+            master = next((_resolve(part, r["Target"]) for r in _read_rels(src, _rels_name(part))
+                           if r["Type"] == _RT + "slideMaster"), None)
+            if master is None:
+                raise MergeError("%s: %s has no slide master" % (src.filename, part))
+            self._master(src, master, defaults)
+            if key not in self.layouts:
+                raise MergeError("%s: %s is not listed by %s" % (src.filename, part, master))
+        return self.layouts[key]
+
+    def _master(self, src, master, defaults):
+        """Merged partname of slide master ``master`` of ``src``; maps its layouts in ``self.layouts``."""
+        key = (self.deck, master)
+        if key in self.masters:
+            return self.masters[key]
+        layouts, theme = _master_parts(src, master)
+        digest = _master_digest(src, master)
+        if digest not in self.templates:
+            self.templates[digest] = self._add_master(src, master, layouts, theme, defaults)
+        merged, merged_layouts = self.templates[digest]
+        for layout, merged_layout in zip(layouts, merged_layouts):
+            self.layouts[self.deck, layout] = merged_layout
+        self.masters[key] = merged
+        return merged
+
+    def _add_master(self, src, master, layouts, theme, defaults):
+        """Copy a master, its layouts and theme under new part names; returns ``(master, layouts)``."""
+        new_master = "ppt/slideMasters/slideMaster%d.xml" % self._number("master")
+        new_layouts = ["ppt/slideLayouts/slideLayout%d.xml" % self._number("layout") for _ in layouts]
+        new_theme = "ppt/theme/theme%d.xml" % self._number("theme")
+        targets = dict(zip(layouts, new_layouts))
+        targets[theme] = new_theme
+
+        def retarget(part, new_part, rels):
+            for rel in rels:
+                target = _resolve(part, rel["Target"])
+                kind = rel["Type"][len(_RT):]
+                if kind in ("slideLayout", "theme", "slideMaster") and target in targets:
+                    rel["Target"] = _relative(new_part, targets[target])
+                elif kind == "image":
+                    rel["Target"] = _relative(new_part, self._media_part(src, target, defaults))
+                else:
+                    raise MergeError("%s: %s has an unsupported %s part" % (src.filename, part, kind))
+            return _write_rels(rels)
+
+        targets[master] = new_master
+        master_id = self.next_id
+        self.next_id += 1
+
+        def renumber(m):
+            self.next_id += 1
+            return '<p:sldLayoutId id="%d"' % (self.next_id - 1)
+
+        xml = re.sub(r'<p:sldLayoutId id="\d+"', renumber, src.read(master).decode("utf-8"))
+        write_str(self.out, new_master, xml)
+        write_str(self.out, _rels_name(new_master), retarget(master, new_master, _read_rels(src, _rels_name(master))))
+        self.overrides["/" + new_master] = _CT + "slideMaster+xml"
+        for layout, new_layout in zip(layouts, new_layouts):
+            self._copy(src, layout, new_layout)
+            write_str(self.out, _rels_name(new_layout),
+                      retarget(layout, new_layout, _read_rels(src, _rels_name(layout))))
+            self.overrides["/" + new_layout] = _CT + "slideLayout+xml"
+        if _read_rels(src, _rels_name(theme)):
+            raise MergeError("%s: %s has relationships, which merge does not copy" % (src.filename, theme))
+        self._copy(src, theme, new_theme)
+        self.overrides["/" + new_theme] = _THEME_CT
+        self.new_masters.append((new_master, master_id))
+        return new_master, new_layouts
+
+    def _media_part(self, src, part, defaults):
+        merged = self.sources.get((self.deck, part))
+        if merged is not None:
+            return merged
+        merged = self.sources[self.deck, part] = self._store_media(src, part, defaults)
+        return merged
+
+    def _store_media(self, src, part, defaults):
+        h = hashlib.sha256()
+        with src.open(part) as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        merged = self.media.get(digest)
+        if merged is not None:
+            self.saved += src.getinfo(part).compress_size
+            return merged
+        ext = part.rsplit(".", 1)[-1]
+        merged = self.media[digest] = "ppt/media/image%d.%s" % (len(self.media) + 1, ext)
+        info, data = raw_entry(src, part)
+        info.filename = merged
+        write_raw(self.out, info, data)
+        self._default(src, part, defaults)
+        return merged
+
+    def _default(self, src, part, defaults):
+        """Carry over the Default content type of ``part``'s extension from ``src`` if missing."""
+        ext = part.rsplit(".", 1)[-1]
+        if ext.lower() not in {k.lower() for k in self.defaults}:
+            if ext not in defaults:
+                raise MergeError("%s: no content type for %s" % (src.filename, part))
+            self.defaults[ext] = defaults[ext]
+
+    def _chart(self, src, part, defaults):
+        """Copy chart ``part`` and its embedded workbook under fresh names; returns the merged partname."""
+        self.charts += 1
+        new_chart = "ppt/charts/chart%d.xml" % self.charts
+        rels = _read_rels(src, _rels_name(part))
+        for rel in rels:
+            if rel["Type"] != _RT + "package":
+                raise MergeError("%s: %s has an unsupported %s part" % (src.filename, part, rel["Type"][len(_RT):]))
+            workbook = _resolve(part, rel["Target"])
+            ext = workbook.rsplit(".", 1)[-1]
+            self.embeddings += 1
+            new_workbook = "ppt/embeddings/Microsoft_Excel_Sheet%d.%s" % (self.embeddings, ext)
+            self._copy(src, workbook, new_workbook)
+            rel["Target"] = _relative(new_chart, new_workbook)
+            self._default(src, workbook, defaults)
+        self._copy(src, part, new_chart)
+        if rels:
+            write_str(self.out, _rels_name(new_chart), _write_rels(rels))
+        self.overrides["/" + new_chart] = _CHART_CT
+        return new_chart
+
+    def add_deck(self, src):
+        size = _SLD_SZ.search(src.read("ppt/presentation.xml").decode("utf-8")).group(0)
+        if size != self.size:
+            raise MergeError("%s: slide size %s differs from the first deck's %s" % (src.filename, size, self.size))
+        defaults, _ = _content_types(src)
+        self.deck += 1
+        for slide in _slides(src):
+            self.count += 1
+            n = self.count
+            new_slide = "ppt/slides/slide%d.xml" % n
+            new_notes = "ppt/notesSlides/notesSlide%d.xml" % n
+            rels, notes_rels = [], []
+            for rel in _read_rels(src, _rels_name(slide)):
+                kind = rel["Type"][len(_RT):] if rel["Type"].startswith(_RT) else rel["Type"]
+                if rel.get("TargetMode") == "External":
+                    pass
+                elif kind == "slideLayout":
+                    rel["Target"] = _relative(new_slide, self._layout(src, _resolve(slide, rel["Target"]), defaults))
+                elif kind == "image":
+                    media = self._media_part(src, _resolve(slide, rel["Target"]), defaults)
+                    rel["Target"] = _relative(new_slide, media)
+                elif kind == "notesSlide":
+                    notes = _resolve(slide, rel["Target"])
+                    rel["Target"] = _relative(new_slide, new_notes)
+                    notes_rels = self._notes_rels(src, notes, new_notes, new_slide)
+                elif kind == "chart":
+                    rel["Target"] = _relative(new_slide, self._chart(src, _resolve(slide, rel["Target"]), defaults))
+                else:
+                    raise MergeError("%s: %s has an unsupported %s part" % (src.filename, slide, kind))
+                rels.append(rel)
+            self._copy(src, slide, new_slide)
+            write_str(self.out, _rels_name(new_slide), _write_rels(rels))
+            self.overrides["/" + new_slide] = _CT + "slide+xml"
+            if notes_rels:
+                self.notes += 1
+                self._copy(src, notes, new_notes)
+                write_str(self.out, _rels_name(new_notes), _write_rels(notes_rels))
+                self.overrides["/" + new_notes] = _CT + "notesSlide+xml"
+
+    def _notes_rels(self, src, notes, new_notes, new_slide):
+        rels = _read_rels(src, _rels_name(notes))
+        for rel in rels:
+            kind = rel["Type"][len(_RT):]
+            if kind == "notesMaster":
+                # a presentation has one notes master; every deck's notes use the first deck's
+                if self.notes_master is None:
+                    raise MergeError("%s: the first deck has no notes master" % src.filename)
+                rel["Target"] = _relative(new_notes, self.notes_master)
+            elif kind == "slide":
+                rel["Target"] = _relative(new_notes, new_slide)
+            else:
+                raise MergeError("%s: %s has an unsupported %s part" % (src.filename, notes, kind))
+        return rels
+
+    def _copy(self, src, part, new_part):
+        info, data = raw_entry(src, part)
+        info.filename = new_part
+        write_raw(self.out, info, data)
+
+    def finish(self):
+        pres_rels = [r for r in _read_rels(self.base, "ppt/_rels/presentation.xml.rels") if r["Type"] != _RT + "slide"]
+        next_rid = max(int(r["Id"][3:]) for r in pres_rels) + 1
+        masters = []
+        for master, master_id in self.new_masters:
+            rid = "rId%d" % next_rid
+            next_rid += 1
+            target = _relative("ppt/presentation.xml", master)
+            pres_rels.append({"Id": rid, "Type": _RT + "slideMaster", "Target": target})
+            masters.append('<p:sldMasterId id="%d" r:id="%s"/>' % (master_id, rid))
+        ids = []
+        for n in range(1, self.count + 1):
+            rid = "rId%d" % (next_rid + n - 1)
+            pres_rels.append({"Id": rid, "Type": _RT + "slide", "Target": "slides/slide%d.xml" % n})
+            ids.append('<p:sldId id="%d" r:id="%s"/>' % (255 + n, rid))
+        pres = self.base.read("ppt/presentation.xml").decode("utf-8")
+        pres = pres.replace("</p:sldMasterIdLst>", "".join(masters) + "</p:sldMasterIdLst>", 1)
+        pres = re.sub(r"<p:sldIdLst>.*?</p:sldIdLst>|<p:sldIdLst/>", "", pres, flags=re.S)
+        # the slide id list sits right before the slide size
+        pres = pres.replace("<p:sldSz ", "<p:sldIdLst>%s</p:sldIdLst><p:sldSz " % "".join(ids), 1)
+        write_str(self.out, "ppt/presentation.xml", pres)
+        write_str(self.out, "ppt/_rels/presentation.xml.rels", _write_rels(pres_rels))
+        write_str(self.out, "[Content_Types].xml", "".join([
+            _XML_DECL, '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">',
+            *('<Default Extension="%s" ContentType="%s"/>' % kv for kv in sorted(self.defaults.items())),
+            *('<Override PartName="%s" ContentType="%s"/>' % kv for kv in sorted(self.overrides.items())),
+            "</Types>",
+        ]))
+        if "docProps/app.xml" in self.base.namelist():
+            write_str(self.out, "docProps/app.xml", _app_properties(
+                self.base.read("docProps/app.xml").decode("utf-8"), self.count, self.notes))
+
+
+def _app_properties(xml, slides, notes):
+    """The first deck's ``docProps/app.xml`` with the merged deck's counts."""
+    xml = _APP_STATS.sub("", xml)
+    xml = re.sub(r"<Slides>[^<]*</Slides>", "<Slides>%d</Slides>" % slides, xml)
+    return re.sub(r"<Notes>[^<]*</Notes>", "<Notes>%d</Notes>" % notes, xml)
+
+
+def merge_decks(paths, out_path):
+    """Concatenate the slides of ``paths`` into ``out_path``; returns MergeStats."""
+    if not paths:
+        raise MergeError("nothing to merge")
+    decks = []
+    try:
+        decks.extend(zipfile.ZipFile(p) for p in paths)
+        with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as out:
+            merger = _Merger(decks[0], out)
+            for name in decks[0].namelist():
+                if not _PER_DECK.match(name):
+                    copy_entry(decks[0], out, name)
+            for deck in decks:
+                merger.add_deck(deck)
+            merger.finish()
+    except Exception:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        raise
+    finally:
+        for deck in decks:
+            deck.close()
+    return MergeStats(len(paths), merger.count, len(merger.media), len(merger.sources) - len(merger.media),
+                      merger.saved)
@@ -0,0 +1,505 @@
+"""
+Font-metrics text measurement for the leijunskill §2.8.7 overflow check.
+
+leijunskill's ``check_overflow`` estimates a box as ``len(lines) * line_height``
+and so misses wrapping, full-width CJK glyphs and the different sizes of
+``##`` / ``#`` lines. Here text is measured with the real advance widths of
+the deck fonts instead:
+
+* each TTF/TTC is parsed once per process (``hhea``/``hmtx``/``cmap``) into a
+  65536-entry ``array('H')`` of advances in 1/1000 em, indexed by code point,
+  with latin and CJK fonts merged into one table per weight;
+* ``OverflowCheck`` collects a whole deck's text boxes while it is generated
+  and measures them in one pass -- each line's advances are looked up in one
+  pass over the arrays and accumulated, so a token's width is a subtraction
+  and a line that fits is never tokenized;
+* ``AutoFit`` picks per box the largest §2.4-allowed size that fits.
+
+Fonts are looked up by file name in ``DECKGEN_FONT_DIRS`` (os.pathsep-separated)
+and the usual Windows / macOS / Linux font directories. Without a CJK font,
+CJK glyphs count as exactly 1 em, which holds for all common CJK faces.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from .assets import _write_atomic
+from .engine import BaseDeck, _Fitted
+
+# PowerPoint defaults for a:bodyPr insets (0.1" left/right, 0.05" top/bottom)
+# and the 18pt master size of the empty paragraph python-pptx starts each box with.
+INSET_X_PT = 7.2
+INSET_Y_PT = 3.6
+EMPTY_PARA_PT = 18
+EMU_PER_PT = 12700
+
+# Calibri is the default template's theme font; the rest are fallbacks.
+LATIN_FONTS = {
+    False: ("calibri.ttf", "Calibri.ttf", "arial.ttf", "Arial.ttf", "DejaVuSans.ttf"),
+    True: ("calibrib.ttf", "Calibri Bold.ttf", "arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf"),
+}
+CJK_FONTS = {
+    False: ("msyh.ttc", "msyh.ttf", "Deng.ttf", "simhei.ttf", "PingFang.ttc",
+            "NotoSansCJK-Regular.ttc", "NotoSansSC-Regular.otf", "wqy-microhei.ttc"),
+    True: ("msyhbd.ttc", "msyhbd.ttf", "Dengb.ttf", "NotoSansCJK-Bold.ttc", "NotoSansSC-Bold.otf"),
+}
+
+# Hangul Jamo, CJK symbols/kana/ideographs, Hangul, compatibility and full-width forms
+CJK_RANGES = (
+    (0x1100, 0x11FF), (0x2E80, 0x303F), (0x3040, 0x30FF), (0x3100, 0x31FF), (0x3200, 0x4DBF),
+    (0x4E00, 0x9FFF), (0xA960, 0xA97F), (0xAC00, 0xD7AF), (0xF900, 0xFAFF), (0xFE30, 0xFE4F),
+    (0xFF00, 0xFFEF),
+)
+_CJK = "".join("%s-%s" % (chr(lo), chr(hi)) for lo, hi in CJK_RANGES)
+# break opportunities: any CJK char, a run of other non-space chars, a run of spaces
+_TOKENS = re.compile(r"[%s]|[^\s%s]+|\s+" % (_CJK, _CJK))
+
+FALLBACK_ADVANCE = 500  # per mille em, for glyphs no loaded font has
+CJK_ADVANCE = 1000
+DEFAULT_LINE_HEIGHT = 1.2  # em, PowerPoint single spacing for fonts without metrics
+
+
+class FontError(ValueError):
+    """A font file that is not a TrueType/OpenType font with hmtx and cmap tables."""
+
+
+class FontMetrics:
+    """Advance widths and line metrics of one font face, in 1/1000 em."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        self.path = path
+        try:
+            self._parse(data)
+        except (struct.error, KeyError, IndexError) as e:
+            raise FontError("%s: %s" % (path, e)) from None
+
+    def _parse(self, data):
+        base = struct.unpack_from(">I", data, 12)[0] if data[:4] == b"ttcf" else 0
+        num_tables = struct.unpack_from(">H", data, base + 4)[0]
+        tables = {}
+        for i in range(num_tables):
+            tag, _, offset, _ = struct.unpack_from(">4sIII", data, base + 12 + 16 * i)
+            tables[tag] = offset
+        upem = struct.unpack_from(">H", data, tables[b"head"] + 18)[0]
+        hhea = tables[b"hhea"]
+        ascender, descender, line_gap = struct.unpack_from(">hhh", data, hhea + 4)
+        num_metrics = struct.unpack_from(">H", data, hhea + 34)[0]
+        self.line_height = (ascender - descender + line_gap) / upem
+
+        hmtx = array("H", data[tables[b"hmtx"]:tables[b"hmtx"] + 4 * num_metrics])
+        if sys.byteorder == "little":
+            hmtx.byteswap()
+        advances = hmtx[::2]  # (advance, lsb) pairs
+        scale = 1000 / upem
+        glyph_advance = [round(a * scale) for a in advances]
+        last = glyph_advance[-1]
+
+        self.advances = array("H", bytes(2 * 65536))
+        for code, glyph in self._cmap(data, tables[b"cmap"]):
+            if code < 65536 and glyph:
+                self.advances[code] = glyph_advance[glyph] if glyph < num_metrics else last
+
+    @staticmethod
+    def _cmap(data, cmap):
+        """(code point, glyph id) pairs from the best Unicode subtable."""
+        subtables = {}
+        for i in range(struct.unpack_from(">H", data, cmap + 2)[0]):
+            platform, encoding, offset = struct.unpack_from(">HHI", data, cmap + 4 + 8 * i)
+            subtables[(platform, encoding)] = cmap + offset
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3), (0, 1), (0, 0)):
+            offset = subtables.get(key)
+            if offset is None:
+                continue
+            fmt = struct.unpack_from(">H", data, offset)[0]
+            if fmt == 12:
+                groups = struct.unpack_from(">I", data, offset + 12)[0]
+                for g in range(groups):
+                    start, end, glyph = struct.unpack_from(">III", data, offset + 16 + 12 * g)
+                    for code in range(start, min(end, 65535) + 1):
+                        yield code, glyph + code - start
+                return
+            if fmt == 4:
+                seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+                ends = struct.unpack_from(">%dH" % seg_count, data, offset + 14)
+                starts_at = offset + 16 + 2 * seg_count
+                starts = struct.unpack_from(">%dH" % seg_count, data, starts_at)
+                deltas = struct.unpack_from(">%dh" % seg_count, data, starts_at + 2 * seg_count)
+                ranges_at = starts_at + 4 * seg_count
+                ranges = struct.unpack_from(">%dH" % seg_count, data, ranges_at)
+                for i in range(seg_count):
+                    for code in range(starts[i], ends[i] + 1):
+                        if code == 0xFFFF:
+                            break
+                        if ranges[i] == 0:
+                            yield code, (code + deltas[i]) & 0xFFFF
+                        else:
+                            at = ranges_at + 2 * i + ranges[i] + 2 * (code - starts[i])
+                            glyph = struct.unpack_from(">H", data, at)[0]
+                            yield code, (glyph + deltas[i]) & 0xFFFF if glyph else 0
+                return
+        raise FontError("no Unicode cmap subtable")
+
+
+_fonts = {}
+
+
+def load_font(path):
+    """FontMetrics for ``path``, parsed once per process."""
+    font = _fonts.get(path)
+    if font is None:
+        font = _fonts[path] = FontMetrics(path)
+    return font
+
+
+def font_dirs():
+    dirs = [d for d in os.environ.get("DECKGEN_FONT_DIRS", "").split(os.pathsep) if d]
+    windir = os.environ.get("WINDIR", "C:/Windows")
+    dirs += [
+        os.path.join(windir, "Fonts"),
+        os.path.expanduser("~/AppData/Local/Microsoft/Windows/Fonts"),
+        "/Library/Fonts", "/System/Library/Fonts", os.path.expanduser("~/Library/Fonts"),
+        "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+    ]
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def find_font(names):
+    """Path of the first of ``names`` found in ``font_dirs()``, or None."""
+    wanted = {n.lower(): i for i, n in enumerate(names)}
+    best = None
+    for top in font_dirs():
+        for root, _, files in os.walk(top):
+            for f in files:
+                rank = wanted.get(f.lower())
+                if rank is not None and (best is None or rank < best[0]):
+                    best = (rank, os.path.join(root, f))
+                    if rank == 0:
+                        return best[1]
+    return best[1] if best else None
+
+
+class TextMeasurer:
+    """Merged latin + CJK advance tables for regular and bold text.
+
+    Font paths default to the first installed of ``LATIN_FONTS`` / ``CJK_FONTS``.
+    The files are only parsed on the first measurement; ``key`` identifies the
+    font set (paths, sizes, mtimes) for persistent caches.
+    """
+
+    def __init__(self, latin=None, latin_bold=None, cjk=None, cjk_bold=None):
+        paths = {
+            (False, False): latin or find_font(LATIN_FONTS[False]),
+            (True, False): latin_bold or find_font(LATIN_FONTS[True]),
+            (False, True): cjk or find_font(CJK_FONTS[False]),
+            (True, True): cjk_bold or find_font(CJK_FONTS[True]),
+        }
+        # bold falls back to the regular face
+        for bold_key, regular_key in (((True, False), (False, False)), ((True, True), (False, True))):
+            paths[bold_key] = paths[bold_key] or paths[regular_key]
+        self.paths = {k: p for k, p in paths.items() if p}
+        self.key = "|".join(
+            "%s:%d:%d" % (p, os.stat(p).st_size, os.stat(p).st_mtime_ns) for _, p in sorted(self.paths.items())
+        )
+        self.fonts = None
+        self._lines = {}
+
+    def _load(self):
+        self.fonts = {k: load_font(p) for k, p in self.paths.items()}
+        self._tables = {bold: self._merge(bold) for bold in (False, True)}
+        self._line_height = max([f.line_height for f in self.fonts.values()], default=DEFAULT_LINE_HEIGHT)
+
+    @property
+    def line_height(self):
+        """Single line spacing in em: the tallest loaded face's ascent + descent + gap."""
+        if self.fonts is None:
+            self._load()
+        return self._line_height
+
+    def _merge(self, bold):
+        table = array("H", [FALLBACK_ADVANCE]) * 65536
+        for lo, hi in CJK_RANGES:
+            table[lo:hi + 1] = array("H", [CJK_ADVANCE]) * (hi + 1 - lo)
+        for is_cjk in (True, False):
+            font = self.fonts.get((bold, is_cjk))
+            if font is None:
+                continue
+            for code, advance in enumerate(font.advances):
+                # CJK faces only contribute CJK code points, so latin text keeps the latin face
+                if advance and (not is_cjk or table[code] == CJK_ADVANCE):
+                    table[code] = advance
+        return table
+
+    def advances(self, text, bold=False):
+        """Advance of each character of ``text`` in 1/1000 em, looked up in one pass."""
+        if self.fonts is None:
+            self._load()
+        table = self._tables[bold]
+        try:
+            return list(map(table.__getitem__, map(ord, text)))
+        except IndexError:  # astral plane: full width
+            return [table[o] if o < 65536 else CJK_ADVANCE for o in map(ord, text)]
+
+    def width(self, text, bold=False):
+        """Advance width of ``text`` in 1/1000 em."""
+        return sum(self.advances(text, bold))
+
+    def line_count(self, text, size, width_pt, bold=False, wrap=True):
+        """Lines ``text`` occupies at ``size`` pt in a ``width_pt`` wide box.
+
+        Breaks between CJK characters and at spaces, splits words longer than a
+        line, and counts explicit line breaks. Returns ``(lines, widest_pt)``,
+        memoized per (text, size, weight, box width).
+        """
+        key = (text, size, bold, width_pt if wrap else None)
+        result = self._lines.get(key)
+        if result is None:
+            result = self._lines[key] = self._line_count(text, size, width_pt, bold, wrap)
+        return result
+
+    def _line_count(self, text, size, width_pt, bold, wrap):
+        limit = width_pt * 1000 / size if wrap else float("inf")
+        lines, widest = 0, 0
+        for segment in text.replace("\v", "\n").split("\n"):
+            lines += 1
+            # running sum of the segment's advances: any span's width is one subtraction
+            edge = [0, *accumulate(self.advances(segment, bold))]
+            if edge[-1] <= limit:
+                widest = max(widest, edge[-1])
+                continue
+            x = end = 0
+            for token in _TOKENS.findall(segment):
+                start, end = end, end + len(token)
+                w = edge[end] - edge[start]
+                if x + w <= limit or token.isspace():
+                    x += w
+                    continue
+                if x:
+                    widest, lines, x = max(widest, x), lines + 1, 0
+                if w > limit:  # a word wider than the box breaks anywhere
+                    for i in range(start, end):
+                        cw = edge[i + 1] - edge[i]
+                        if x + cw > limit and x:
+                            widest, lines, x = max(widest, x), lines + 1, 0
+                        x += cw
+                else:
+                    x = w
+            widest = max(widest, x)
+        return lines, widest * size / 1000
+
+
+_measurer = None
+
+
+def default_measurer():
+    """TextMeasurer over the auto-discovered fonts, built once per process."""
+    global _measurer
+    if _measurer is None:
+        _measurer = TextMeasurer()
+    return _measurer
+
+
+def box_extent(measurer, box, paras):
+    """``(lines, width_pt, height_pt)`` a textbox grows to with ``paras`` in it.
+
+    ``paras`` are ``(para, text)`` pairs. The height runs from the box's top
+    edge to the bottom of the last line, counting the empty 18pt paragraph
+    every box starts with: PowerPoint starts text below the top inset and only
+    text past the bottom edge shows as overflow, so the bottom inset is not
+    counted.
+    """
+    inner = box.box[2] / EMU_PER_PT - 2 * INSET_X_PT
+    total_lines, widest = 0, 0
+    height = INSET_Y_PT + EMPTY_PARA_PT * measurer.line_height
+    for idx, (para, text) in enumerate(paras):
+        lines, w = measurer.line_count(para.prefix + text, para.size, inner, para.bold, box.wrap)
+        total_lines += lines
+        widest = max(widest, w)
+        height += lines * para.size * measurer.line_height
+        if idx < len(paras) - 1:
+            height += para.space_after
+    return total_lines, widest + 2 * INSET_X_PT, height
+
+
+# One measured text box; heights/widths in inches.
+Overflow = collections.namedtuple("Overflow", "slide kind shape lines height max_height width max_width")
+
+
+class OverflowCheck:
+    """Collects text boxes while a deck is generated, then measures them all.
+
+    Attach to a deck with ``deck.overflow = OverflowCheck()``; ``run()`` returns
+    one ``Overflow`` per box that grows past its height or, for unwrapped boxes,
+    its width.
+    """
+
+    def __init__(self, measurer=None):
+        self.measurer = measurer
+        self.boxes = []  # (slide, kind, shape name, textbox, [(para, text)])
+
+    def add_slide(self, number, kind, shapes):
+        for render, *args in shapes:
+            element = getattr(render, "__self__", None)
+            if hasattr(element, "layout"):
+                box, paras = element.layout(*args)
+                self.boxes.append((number, kind, getattr(element, "name", "?"), box, paras))
+
+    def measure(self):
+        """``Overflow`` records for every collected box, overflowing or not."""
+        m = self.measurer = self.measurer or default_measurer()
+        results = []
+        for number, kind, name, box, paras in self.boxes:
+            lines, width, height = box_extent(m, box, paras)
+            _, _, max_width, max_height = (v / EMU_PER_PT / 72 for v in box.box)
+            results.append(Overflow(number, kind, name, lines, height / 72, max_height, width / 72, max_width))
+        return results
+
+    def run(self):
+        """Only the boxes that overflow."""
+        return [o for o in self.measure()
+                if o.height > o.max_height + 1e-6 or o.width > o.max_width + 1e-6]
+
+
+# leijunskill §2.4 (min, max) pt per text role. Auto-fit only shrinks: a style
+# ranges from its role's minimum (or its own size, if smaller) up to the size
+# its theme chose, so a zoned 48pt title never grows to 60pt.
+FONT_LIMITS = {
+    "title": (48, 60),
+    "number": (72, 96),
+    "emphasis": (48, 72),
+    "heading": (28, 36),
+    "body": (22, 28),
+    "note": (14, 18),
+}
+# paragraph style name -> §2.4 role; styles not listed (the signature) keep their size
+ROLES = {
+    "title": "title",
+    "number": "number",
+    "emphasis": "emphasis",
+    "tagline": "emphasis",
+    "heading": "heading",
+    "unit": "heading",
+    "bullet": "body",
+    "subtitle": "body",
+    "explanation": "body",
+}
+
+
+class AutoFit:
+    """Shrinks every text box to the largest size that fits it, down to the §2.4 minimum.
+
+    Text is never made larger than its theme's size. Per box one paragraph
+    style is binary-searched over its range -- the plain bullet style in
+    bullet bodies, else the first resizable one -- and the box's other styles
+    keep their size ratio to it, clamped to their own ranges. When nothing
+    fits, the minimum is used (and OverflowCheck will report the box).
+    Chosen sizes are memoized per box content and, with ``cache_path``,
+    persisted across runs, so re-running a deck only measures boxes whose
+    text changed.
+    """
+
+    def __init__(self, measurer=None, cache_path=None):
+        self.measurer = measurer or default_measurer()
+        self.cache_path = cache_path
+        self._fits = {}
+        self._dirty = False
+        if cache_path:
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                cached = {}
+            if cached.get("fonts") == self.measurer.key:
+                self._fits = cached.get("fits", {})
+
+    @staticmethod
+    def _limits(para):
+        role = ROLES.get(para.name)
+        if role is None:
+            return None
+        return min(FONT_LIMITS[role][0], para.size), para.size
+
+    def fit(self, box, paras):
+        """``paras`` (``(para, text)`` pairs) resized to fit ``box``; None if none is resizable."""
+        limits = [self._limits(p) for p, _ in paras]
+        base = next((i for i, (p, _) in enumerate(paras) if p.name == "bullet"), None)
+        if base is None:
+            base = next((i for i, lim in enumerate(limits) if lim), None)
+        if base is None:
+            return None
+        key = hashlib.sha1(json.dumps([
+            box.box, box.wrap, [(p.name, p.size, p.bold, p.space_after, p.prefix, t) for p, t in paras]
+        ], ensure_ascii=False).encode("utf-8")).hexdigest()
+        size = self._fits.get(key)
+        if size is None:
+            size = self._fits[key] = self._search(box, paras, limits, base)
+            self._dirty = True
+        return self._sized(paras, limits, base, size)
+
+    @staticmethod
+    def _sized(paras, limits, base, size):
+        ratio = size / paras[base][0].size
+        sized = []
+        for (para, text), lim in zip(paras, limits):
+            if lim:
+                para = para.resized(min(max(round(para.size * ratio), lim[0]), lim[1]))
+            sized.append((para, text))
+        return sized
+
+    def _search(self, box, paras, limits, base):
+        max_width, max_height = box.box[2] / EMU_PER_PT, box.box[3] / EMU_PER_PT
+        lo, hi = limits[base]
+        best = lo
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            _, width, height = box_extent(self.measurer, box, self._sized(paras, limits, base, mid))
+            if height <= max_height and width <= max_width:
+                best, lo = mid, mid + 1
+            else:
+                hi = mid - 1
+        return best
+
+    def fit_shapes(self, shapes):
+        """A page's shape list with every resizable text shape replaced by its fitted version."""
+        fitted = []
+        for entry in shapes:
+            element = getattr(entry[0], "__self__", None)
+            if hasattr(element, "layout"):
+                box, paras = element.layout(*entry[1:])
+                sized = self.fit(box, paras)
+                if sized is not None:
+                    entry = (_Fitted(box, sized, element.name).render,)
+            fitted.append(entry)
+        return fitted
+
+    def save(self):
+        """Persist newly chosen sizes to ``cache_path``."""
+        if self.cache_path and self._dirty:
+            data = {"fonts": self.measurer.key, "fits": self._fits}
+            _write_atomic(self.cache_path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+            self._dirty = False
+
+
+class LayoutDeck(BaseDeck):
+    """A backend that writes nothing, for measuring a deck without building it."""
+
+    def __init__(self, theme, overflow=None):
+        super().__init__(theme, images=None)
+        self.overflow = overflow if overflow is not None else OverflowCheck()
+        self._count = 0
+
+    @property
+    def slide_count(self):
+        return self._count
+
+    def _add_slide(self, kind, shapes, notes):
+        self._count += 1
+        return self._count
@@ -0,0 +1,202 @@
+"""
+Speaker-notes export and full-text search across decks.
+
+Notes are read slide by slide from built .pptx files (notes slide XML only,
+no python-pptx) or straight from deck specs, and either exported as JSON lines
+or added to an inverted index. Text is NFKC-normalized and case-folded;
+latin/digit runs become word tokens and CJK runs become overlapping bigrams,
+so "条件记忆" matches "条件记忆模块" without a dictionary. Indexed text also
+keeps each CJK character as a token, so a one-character query such as "图"
+finds "图表" as well as "图 & 表".
+
+The index is one JSON file: a list of slides plus ``token -> {slide: count}``
+postings, and a stat key per source so re-indexing skips unchanged files.
+Searches AND the query's tokens, rank by tf-idf and confirm the literal query
+when it is a single phrase::
+
+    python -m deckgen notes-index build/*.pptx decks/*.yaml
+    python -m deckgen notes-search "内存墙"
+"""
+
+import collections
+import json
+import math
+import os
+import re
+import unicodedata
+import zipfile
+
+from .assets import _write_atomic
+
+INDEX_VERSION = 2
+DEFAULT_INDEX = "notes-index.json"
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"  # kana, CJK, hangul
+_TOKEN = re.compile(r"[0-9a-z]+|[%s]+" % _CJK)
+
+Note = collections.namedtuple("Note", "source slide title notes")
+Hit = collections.namedtuple("Hit", "score source slide title notes")
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def tokenize(text, unigrams=False):
+    """Word tokens for latin/digit runs, bigrams for CJK runs.
+
+    A lone CJK character is its own token; ``unigrams`` adds every character
+    of longer runs too, for indexing.
+    """
+    tokens = []
+    for run in _TOKEN.findall(normalize(text)):
+        if run[0] in "0123456789abcdefghijklmnopqrstuvwxyz" or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            if unigrams:
+                tokens.extend(run)
+    return tokens
+
+
+def iter_notes(source):
+    """``Note`` per slide of a built .pptx or a deck spec (.json / .yaml)."""
+    if source.endswith((".json", ".yaml", ".yml")):
+        from .spec import load_spec
+
+        for number, slide in enumerate(load_spec(source)["slides"], 1):
+            yield Note(source, number, slide.get("title", ""), slide.get("notes", ""))
+        return
+    from .outline import outline
+
+    for s in outline(source):
+        yield Note(source, s.number, s.title, s.notes)
+
+
+def export_notes(sources, stream):
+    """Write every slide's notes to ``stream`` as JSON lines; returns the count."""
+    count = 0
+    for source in sources:
+        for note in iter_notes(source):
+            stream.write(json.dumps(note._asdict(), ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class NotesIndex:
+    """Inverted index over speaker notes; see the module docstring."""
+
+    def __init__(self):
+        self.notes = []  # slot -> Note, None once its source is dropped
+        self.postings = collections.defaultdict(dict)  # token -> {slot: count}
+        self.sources = {}  # path -> stat key
+
+    @classmethod
+    def load(cls, path):
+        """The index at ``path``; an empty one when it is missing or outdated."""
+        index = cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+        index.notes = [Note(*n) if n else None for n in data["notes"]]
+        for token, posting in data["postings"].items():
+            index.postings[token] = {int(slot): count for slot, count in posting.items()}
+        index.sources = data["sources"]
+        return index
+
+    def save(self, path):
+        data = {
+            "version": INDEX_VERSION,
+            "sources": self.sources,
+            "notes": [list(n) if n else None for n in self.notes],
+            "postings": self.postings,
+        }
+        _write_atomic(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def _drop(self, source):
+        slots = {i for i, n in enumerate(self.notes) if n is not None and n.source == source}
+        if not slots:
+            return
+        for i in slots:
+            self.notes[i] = None
+        for token in list(self.postings):
+            posting = self.postings[token]
+            for i in slots.intersection(posting):
+                del posting[i]
+            if not posting:
+                del self.postings[token]
+
+    def add_source(self, source):
+        """(Re-)index ``source`` unless it is unchanged; returns the slides added."""
+        path = os.path.abspath(source)
+        key = _stat_key(path)
+        if self.sources.get(path) == key:
+            return 0
+        self._drop(path)
+        added = 0
+        for note in iter_notes(path):
+            slot = len(self.notes)
+            self.notes.append(note)
+            for token, count in collections.Counter(tokenize(note.title + "\n" + note.notes, unigrams=True)).items():
+                self.postings[token][slot] = count
+            added += 1
+        self.sources[path] = key
+        return added
+
+    def __len__(self):
+        return sum(n is not None for n in self.notes)
+
+    def search(self, query, limit=10):
+        """Best ``Hit`` records for ``query``, highest tf-idf first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        postings = [self.postings.get(t, {}) for t in set(tokens)]
+        postings.sort(key=len)
+        slots = set(postings[0])
+        for posting in postings[1:]:
+            slots.intersection_update(posting)
+        phrase = normalize(query).strip()
+        if " " not in phrase:
+            slots = {s for s in slots if phrase in normalize(self.notes[s].title + "\n" + self.notes[s].notes)}
+        total = len(self)
+        idf = [math.log(1 + total / len(p)) if p else 0 for p in postings]
+        hits = []
+        for slot in slots:
+            note = self.notes[slot]
+            score = sum(w * (1 + math.log(p[slot])) for w, p in zip(idf, postings))
+            hits.append(Hit(round(score, 3), note.source, note.slide, note.title, note.notes))
+        hits.sort(key=lambda h: (-h.score, h.source, h.slide))
+        return hits[:limit]
+
+
+def snippet(text, query, width=60):
+    """``text`` around the first occurrence of ``query`` (or its first token)."""
+    flat = " ".join(text.split())
+    folded = normalize(flat)
+    needles = [normalize(query).strip()] + tokenize(query)
+    at = next((folded.find(n) for n in needles if n and folded.find(n) >= 0), 0)
+    start = max(0, at - width // 3)
+    return ("..." if start else "") + flat[start:start + width] + ("..." if start + width < len(flat) else "")
+
+
+def index_sources(sources, index_path=DEFAULT_INDEX):
+    """Update the index at ``index_path`` with ``sources``; returns ``(index, slides added)``."""
+    index = NotesIndex.load(index_path)
+    added = 0
+    for source in sources:
+        try:
+            added += index.add_source(source)
+        except zipfile.BadZipFile as e:
+            raise ValueError("%s: %s" % (source, e)) from None
+    index.save(index_path)
+    return index, added
@@ -0,0 +1,140 @@
+"""
+Rewrite the speaker notes of a built deck without rebuilding it.
+
+Most iterations on a finished deck only touch the storytelling notes passed to
+``add_notes``. ``patch_notes(path, notes)`` takes ``{slide number: text}``,
+replaces the paragraphs of each named slide's notes body placeholder -- the
+same XML python-pptx's ``text_frame.text`` setter writes -- and copies every
+other zip entry (slides, media, masters) as compressed bytes. Nothing is
+parsed beyond the package index and the notes parts concerned, and no image is
+re-embedded, so a whole deck is updated in milliseconds::
+
+    python -m deckgen notes-patch build/v9.pptx decks/v9.yaml
+    python -m deckgen notes-export build/v9.pptx > notes.jsonl   # edit, then
+    python -m deckgen notes-patch build/v9.pptx notes.jsonl
+
+Notes come from a deck spec (every slide's ``notes``; the slide count must
+match the deck), notes-export JSON lines (``slide`` / ``notes``) or a JSON
+object mapping slide numbers to text.
+"""
+
+import copy
+import json
+import os
+import re
+import zipfile
+
+from .engine import _paragraphs
+from .lint import slide_names
+from .outline import _notes_part
+from .package import copy_entry
+
+# body placeholder's text: txBody head (bodyPr, lstStyle), paragraphs, end tag
+_TX_BODY = re.compile(
+    r"(<p:txBody>\s*(?:<a:bodyPr[^>]*/>|<a:bodyPr[^>]*>.*?</a:bodyPr>)\s*"
+    r"(?:<a:lstStyle/>|<a:lstStyle>.*?</a:lstStyle>)?)(.*?)(</p:txBody>)",
+    re.S,
+)
+_SP = re.compile(r"<p:sp>.*?</p:sp>", re.S)
+
+
+class NotesPatchError(ValueError):
+    """The notes do not fit the deck (unknown slide, no notes body)."""
+
+
+def _patch(xml, text):
+    """``xml`` with the notes body replaced by ``text``; None when it already holds it."""
+    for sp in _SP.finditer(xml):
+        if '<p:ph type="body"' not in sp.group(0):
+            continue
+        m = _TX_BODY.search(sp.group(0))
+        if m is None:
+            break
+        paragraphs = _paragraphs(text)
+        if m.group(2) == paragraphs:
+            return None
+        start, end = sp.start() + m.start(2), sp.start() + m.end(2)
+        return xml[:start] + paragraphs + xml[end:]
+    raise NotesPatchError("notes slide without a body placeholder")
+
+
+def patch_notes(path, notes, out_path=None):
+    """Replace the notes of the slides in ``notes`` (``{number: text}``, 1-based).
+
+    Writes to ``out_path`` (default: in place); returns the numbers of the
+    slides whose notes changed. When none changed and the deck is patched in
+    place, the file is left untouched.
+    """
+    out_path = out_path or path
+    with zipfile.ZipFile(path) as src:
+        slides = slide_names(src)
+        patched = {}
+        for number, text in sorted(notes.items()):
+            if not 1 <= number <= len(slides):
+                raise NotesPatchError("%s: no slide %d (deck has %d)" % (path, number, len(slides)))
+            part = _notes_part(src, slides[number - 1])
+            if part is None:
+                raise NotesPatchError("%s: slide %d has no notes slide" % (path, number))
+            try:
+                xml = _patch(src.read(part).decode("utf-8"), text)
+            except NotesPatchError as e:
+                raise NotesPatchError("%s: slide %d: %s" % (path, number, e)) from None
+            if xml is not None:
+                patched[part] = (number, xml)
+        if not patched and out_path == path:
+            return []
+
+        tmp = out_path + ".tmp"
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as out:
+                for info in src.infolist():
+                    if info.filename in patched:
+                        # same name, date and attributes as the original entry
+                        out.writestr(copy.copy(info), patched[info.filename][1])
+                    else:
+                        copy_entry(src, out, info.filename)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    os.replace(tmp, out_path)
+    return sorted(number for number, _ in patched.values())
+
+
+def load_notes(path, slide_count=None):
+    """``{slide number: notes}`` from a deck spec, notes-export JSON lines or a JSON object.
+
+    ``slide_count`` is the deck's; a spec with a different number of slides
+    is refused, since its notes would land on the wrong slides.
+    """
+    with open(path, encoding="utf-8-sig") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None  # YAML spec or JSON lines
+    if path.endswith((".yaml", ".yml")) or isinstance(data, dict) and "slides" in data:
+        from .spec import load_spec
+
+        slides = load_spec(path)["slides"]
+        if slide_count is not None and len(slides) != slide_count:
+            raise NotesPatchError("%s: %d slides, the deck has %d; rebuild instead"
+                                  % (path, len(slides), slide_count))
+        return {n: slide.get("notes", "") for n, slide in enumerate(slides, 1)}
+
+    try:
+        if isinstance(data, dict) and "slide" not in data:
+            pairs = list(data.items())
+        else:
+            rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+            pairs = [(row["slide"], row["notes"]) for row in rows]
+        notes = {}
+        for number, value in pairs:
+            number = int(number)
+            if number in notes or not isinstance(value, str):
+                raise ValueError("slide %d given twice or not as text" % number)
+            notes[number] = value
+    except (ValueError, KeyError, TypeError) as e:
+        raise NotesPatchError("%s: expected a spec, notes-export JSON lines or "
+                              "{slide: notes}: %s" % (path, e)) from None
+    return notes
@@ -0,0 +1,57 @@
+"""
+Slide listing for built decks, read straight from the zip.
+
+``outline(path)`` returns one ``SlideInfo`` per slide -- its title (the first
+line of the first text shape), shape and picture counts and the speaker notes
+-- parsing only slide and notes XML, without python-pptx.
+"""
+
+import collections
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+from .lint import Layouts, read_shapes, slide_names
+
+SlideInfo = collections.namedtuple("SlideInfo", "number part title shapes pictures notes")
+
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+
+def _notes_part(zf, slide):
+    folder, name = posixpath.split(slide)
+    try:
+        rels = zf.read(posixpath.join(folder, "_rels", name + ".rels")).decode("utf-8")
+    except KeyError:
+        return None
+    m = re.search(r'Target="([^"]*notesSlide[^"]*)"', rels)
+    return posixpath.normpath(posixpath.join(folder, m.group(1))) if m else None
+
+
+def notes_text(zf, part):
+    """Text of a notes slide's body placeholder, one line per paragraph."""
+    root = ET.fromstring(zf.read(part))
+    for sp in root.iter("{http://schemas.openxmlformats.org/presentationml/2006/main}sp"):
+        ph = next(sp.iter("{http://schemas.openxmlformats.org/presentationml/2006/main}ph"), None)
+        if ph is not None and ph.get("type") == "body":
+            return "\n".join("".join(t.text or "" for t in p.iter(_A + "t")) for p in sp.iter(_A + "p"))
+    return ""
+
+
+def outline(path):
+    """``SlideInfo`` for every slide of the .pptx at ``path``, in order."""
+    slides = []
+    with zipfile.ZipFile(path) as zf:
+        layouts = Layouts(zf)
+        for number, part in enumerate(slide_names(zf), 1):
+            with zf.open(part) as stream:
+                shapes = read_shapes(stream, layouts.placeholders(part))
+            texts = [s.text.strip() for s in shapes if s.text.strip()]
+            notes = _notes_part(zf, part)
+            slides.append(SlideInfo(
+                number, part, texts[0].splitlines()[0] if texts else "",
+                len(shapes), sum(s.kind == "pic" for s in shapes),
+                notes_text(zf, notes) if notes else "",
+            ))
+    return slides
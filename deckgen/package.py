@@ -0,0 +1,202 @@
+"""
+Low-level zip helpers for writing and patching .pptx packages.
+
+``zipfile`` can only add entries by compressing their data again. The helpers
+here copy an entry's already-compressed bytes from one archive to another, so
+untouched parts (layouts, themes, other slides, media) move between packages
+at disk speed.
+
+``write_parts`` packages many new parts at once: PNG / JPEG / WebP / GIF
+media is stored as is (deflate gains nothing on it) and the XML parts are
+deflated in worker threads -- zlib releases the GIL -- then appended in the
+order given, so the archive does not depend on which thread finished first.
+Only a bounded window of parts is compressed ahead of the writer.
+
+Reproducible builds: with ``SOURCE_DATE_EPOCH`` set (reproducible-builds.org;
+``build-deck --reproducible`` sets it to ``ZIP_EPOCH``) every entry written or
+copied here carries that date and Unix attributes instead of the current time,
+and ``stamp_core`` pins the core properties, so identical inputs give
+byte-identical decks.
+"""
+
+import collections
+import copy
+import os
+import re
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+_XML_DECL = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_RT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+_CT = "application/vnd.openxmlformats-officedocument.presentationml."
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_NAME_LEN, _EXTRA_LEN = 10, 11
+_DATA_DESCRIPTOR = 0x08
+# already-compressed media, stored rather than deflated again
+_COMPRESSED = (".png", ".jpg", ".jpeg", ".jpe", ".webp", ".gif")
+_UNIX = 3
+# 1980-01-01T00:00:00Z, the earliest date a zip entry can carry
+ZIP_EPOCH = 315532800
+# write_raw appends through ZipFile's private bookkeeping (start_dir, _writecheck,
+# _didModify), checked on CPython 3.6-3.13; elsewhere it inflates the data and
+# lets writestr deflate it again
+_RAW_WRITES = (3, 6) <= sys.version_info[:2] <= (3, 13) and hasattr(zipfile.ZipFile, "_writecheck")
+
+
+def source_date():
+    """The fixed build time of a reproducible build (``SOURCE_DATE_EPOCH``), or None."""
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    return max(int(value), ZIP_EPOCH) if value else None
+
+
+def _date_time():
+    epoch = source_date()
+    return time.localtime(time.time())[:6] if epoch is None else time.gmtime(epoch)[:6]
+
+
+def stamp_core(xml):
+    """``docProps/core.xml`` text with created / modified / revision pinned in reproducible builds.
+
+    Unchanged in normal builds; elements that are missing are not added.
+    """
+    epoch = source_date()
+    if epoch is None:
+        return xml
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+    for tag in ("dcterms:created", "dcterms:modified"):
+        xml = re.sub(r"(<%s\b[^>]*>)[^<]*(</%s>)" % (tag, tag), r"\g<1>%s\2" % stamp, xml)
+    return re.sub(r"<cp:revision>[^<]*</cp:revision>", "<cp:revision>1</cp:revision>", xml)
+
+
+def raw_entry(src, name):
+    """``(zinfo, compressed bytes)`` of ``name`` in the open ZipFile ``src``."""
+    info = src.getinfo(name)
+    fp = src.fp
+    fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+    fp.seek(header[_NAME_LEN] + header[_EXTRA_LEN], 1)
+    return info, fp.read(info.compress_size)
+
+
+def write_raw(dst, info, data):
+    """Append an entry to ``dst`` (opened for writing) from already-compressed ``data``."""
+    info = copy.copy(info)
+    info.flag_bits &= ~_DATA_DESCRIPTOR
+    info.extra = b""
+    if source_date() is not None:
+        info.date_time, info.create_system = _date_time(), _UNIX
+    if not _RAW_WRITES:
+        _write_inflated(dst, info, data)
+        return
+    fp = dst.fp
+    fp.seek(dst.start_dir)
+    info.header_offset = fp.tell()
+    dst._writecheck(info)
+    dst._didModify = True
+    fp.write(info.FileHeader(zip64=False))
+    fp.write(data)
+    dst.start_dir = fp.tell()
+    dst.filelist.append(info)
+    dst.NameToInfo[info.filename] = info
+
+
+def _write_inflated(dst, info, data):
+    """``write_raw`` through the public API: inflate ``data`` and ``writestr`` it."""
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -15)
+    elif info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError("%s: cannot copy an entry with compression method %d" % (info.filename, info.compress_type))
+    dst.writestr(info, data)
+
+
+def compress_type(name, default=zipfile.ZIP_DEFLATED):
+    """``ZIP_STORED`` for already-compressed media, else ``default``."""
+    return zipfile.ZIP_STORED if name.lower().endswith(_COMPRESSED) else default
+
+
+def entry_info(name, compression=zipfile.ZIP_DEFLATED):
+    """A ``ZipInfo`` for a new entry: build date, ``compress_type(name, compression)``, rw-------."""
+    info = zipfile.ZipInfo(name, date_time=_date_time())
+    info.compress_type = compress_type(name, compression)
+    info.external_attr = 0o600 << 16
+    if source_date() is not None:
+        info.create_system = _UNIX
+    return info
+
+
+def write_str(dst, name, data):
+    """``dst.writestr(name, data)``, dated by ``entry_info`` and storing compressed media."""
+    dst.writestr(entry_info(name, dst.compression), data)
+
+
+def compress_entry(name, data):
+    """``(zinfo, compressed bytes)`` for a new entry ``name``, ready for ``write_raw``.
+
+    Deflates like ``ZipFile.writestr`` (default level, raw stream) unless
+    ``compress_type`` says to store; safe to call from worker threads.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    info = entry_info(name)
+    info.file_size = len(data)
+    info.CRC = zlib.crc32(data)
+    if info.compress_type == zipfile.ZIP_STORED:
+        packed = bytes(data)
+    else:
+        deflate = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        packed = deflate.compress(data) + deflate.flush()
+    info.compress_size = len(packed)
+    return info, packed
+
+
+def write_parts(dst, parts, jobs=None):
+    """Append ``(name, data)`` pairs to ``dst`` in order, compressed across ``jobs`` threads.
+
+    ``parts`` may be a generator: entries are compressed while later ones are
+    still being produced. At most two entries per thread are in flight, so
+    only that many compressed parts are held in memory at once. Defaults to
+    one thread per core.
+    """
+    workers = jobs or os.cpu_count() or 1
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, data in parts:
+            if len(pending) >= 2 * workers:
+                write_raw(dst, *pending.popleft().result())
+            pending.append(pool.submit(compress_entry, name, data))
+        while pending:
+            write_raw(dst, *pending.popleft().result())
+
+
+def write_buffer(dst, name, data, chunk=1 << 20):
+    """``dst.writestr(name, data)`` for a large bytes-like ``data`` such as an mmap.
+
+    ``writestr`` compresses the whole buffer in one call and so holds all of
+    the compressed output at once; this feeds it in ``chunk``-sized slices.
+    Already-compressed media is stored.
+    """
+    info = entry_info(name, dst.compression)
+    info._compresslevel = dst.compresslevel
+    info.file_size = len(data)
+    with memoryview(data) as view, dst.open(info, "w") as dest:
+        for start in range(0, len(view), chunk):
+            dest.write(view[start:start + chunk])
+
+
+def copy_entry(src, dst, name):
+    """Copy entry ``name`` from ZipFile ``src`` to ``dst`` without recompressing."""
+    write_raw(dst, *raw_entry(src, name))
+
+
+def open_zip(path):
+    """``zipfile.ZipFile(path)``, or None when ``path`` is missing or not a zip."""
+    try:
+        return zipfile.ZipFile(path)
+    except (OSError, zipfile.BadZipFile):
+        return None
@@ -0,0 +1,176 @@
+"""
+Per-presenter copies of one built deck, stamped without rebuilding it.
+
+Roadshow decks are identical except for the §5 signature on the cover and
+closing slides. ``Personalizer`` opens a built deck once, finds the slide
+parts whose signature block names the theme's company and author, and for
+each presenter writes a copy in which every zip entry is copied as compressed
+bytes except those slides (signature text replaced) and ``docProps/core.xml``
+/ ``docProps/app.xml`` (author and company)::
+
+    python -m deckgen personalize build/v10.pptx presenters.csv -o roadshow/
+
+A stamp costs about as much as copying the file, so hundreds of presenters
+take seconds rather than hundreds of python-pptx builds.
+"""
+
+import copy
+import csv
+import json
+import os
+import re
+import zipfile
+
+from .engine import THEME, _escape
+from .package import copy_entry
+
+_SP = re.compile(r"<p:sp>.*?</p:sp>", re.S)
+_UNSAFE = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+class PersonalizeError(ValueError):
+    """The deck has no signature to replace, or a presenter entry is invalid."""
+
+
+def _text(text):
+    return "<a:t>%s</a:t>" % _escape(text)
+
+
+def _set_element(xml, tag, value):
+    """``xml`` with element ``tag`` holding ``value``, added before the root's end tag if missing."""
+    element = "<%s>%s</%s>" % (tag, _escape(value), tag)
+    pattern = re.compile(r"<%s/>|<%s(?: [^>]*)?>.*?</%s>" % (tag, tag, tag), re.S)
+    if pattern.search(xml):
+        return pattern.sub(lambda m: element, xml, count=1)
+    end = xml.rindex("</")
+    return xml[:end] + element + xml[end:]
+
+
+class Personalizer:
+    """Writes copies of the deck at ``path`` signed by other presenters.
+
+    ``signature`` is the theme's signature block the deck was built with
+    (default: ``THEME["signature"]``).
+    """
+
+    def __init__(self, path, signature=None):
+        sig = signature or THEME["signature"]
+        self.path = path
+        self.company, self.author, self.suffix = sig["company"], sig["author"], sig["cover_suffix"]
+        # longest first, so the cover's "company + suffix" wins over the bare company
+        olds = sorted({self.company + self.suffix, self.company, self.author}, key=len, reverse=True)
+        self._signature_text = re.compile("|".join(re.escape(_text(old)) for old in olds))
+        self._zip = zipfile.ZipFile(path)
+        try:
+            self.parts = {}  # signature slide part -> XML
+            for name in self._zip.namelist():
+                if re.match(r"ppt/slides/slide\d+\.xml$", name):
+                    xml = self._zip.read(name).decode("utf-8")
+                    if self._signature_shapes(xml):
+                        self.parts[name] = xml
+            if not self.parts:
+                raise PersonalizeError("%s: no signature block naming %s / %s" % (path, self.company, self.author))
+            self.core = self._zip.read("docProps/core.xml").decode("utf-8")
+            self.app = self._zip.read("docProps/app.xml").decode("utf-8")
+        except Exception:
+            self._zip.close()
+            raise
+
+    def _signature_shapes(self, xml):
+        author = _text(self.author)
+        companies = (_text(self.company), _text(self.company + self.suffix))
+        return [m.span() for m in _SP.finditer(xml)
+                if author in m.group(0) and any(c in m.group(0) for c in companies)]
+
+    def _patch_slide(self, xml, author, company):
+        # one pass, so a replacement is never matched again (a company named like the old author)
+        replacements = {
+            _text(self.company + self.suffix): _text(company + self.suffix),
+            _text(self.company): _text(company),
+            _text(self.author): _text(author),
+        }
+        out, pos = [], 0
+        for start, end in self._signature_shapes(xml):
+            shape = self._signature_text.sub(lambda m: replacements[m.group(0)], xml[start:end])
+            out += [xml[pos:start], shape]
+            pos = end
+        out.append(xml[pos:])
+        return "".join(out)
+
+    def stamp(self, out_path, author, company=None):
+        """Write the deck signed by ``author`` (and ``company``) to ``out_path``."""
+        if not author:
+            raise PersonalizeError("presenter without a name")
+        company = company or self.company
+        core = _set_element(_set_element(self.core, "dc:creator", author), "cp:lastModifiedBy", author)
+        app = _set_element(self.app, "Company", company)
+        try:
+            with zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as out:
+                for info in self._zip.infolist():
+                    name = info.filename
+                    if name in self.parts:
+                        data = self._patch_slide(self.parts[name], author, company)
+                    elif name == "docProps/core.xml":
+                        data = core
+                    elif name == "docProps/app.xml":
+                        data = app
+                    else:
+                        copy_entry(self._zip, out, name)
+                        continue
+                    # same name, date and attributes as the original entry
+                    out.writestr(copy.copy(info), data)
+        except Exception:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+            raise
+        return out_path
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_presenters(path):
+    """Presenters from a CSV (header: author, company, output) or a JSON list of objects.
+
+    Only ``author`` is required; ``company`` defaults to the deck's and
+    ``output`` to ``<deck>-<author>.pptx``.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.endswith(".json"):
+            try:
+                rows = json.load(f)
+            except ValueError as e:
+                raise PersonalizeError("%s: %s" % (path, e)) from None
+        else:
+            rows = list(csv.DictReader(f))
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        raise PersonalizeError("%s: expected a list of presenters" % path)
+    for n, row in enumerate(rows, 1):
+        if not (row.get("author") or "").strip():
+            raise PersonalizeError("%s: presenter %d has no author" % (path, n))
+    return rows
+
+
+def output_name(deck_path, author):
+    stem = os.path.splitext(os.path.basename(deck_path))[0]
+    return "%s-%s.pptx" % (stem, _UNSAFE.sub("_", author.strip()))
+
+
+def personalize(deck_path, presenters, out_dir, signature=None, on_result=None):
+    """Stamp ``deck_path`` once per presenter into ``out_dir``; returns the written paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    with Personalizer(deck_path, signature) as p:
+        for row in presenters:
+            author = row["author"].strip()
+            out = os.path.join(out_dir, row.get("output") or output_name(deck_path, author))
+            written.append(p.stamp(out, author, (row.get("company") or "").strip() or None))
+            if on_result is not None:
+                on_result(written[-1])
+    return written
@@ -0,0 +1,324 @@
+"""
+Headless slide previews: PNG thumbnails and a contact sheet per deck.
+
+Slides are drawn with Pillow straight from the slide XML of a built .pptx --
+the solid background (``BG_COLOR``), filled rectangles, text boxes (size,
+bold, colour, alignment, wrapping, space-after, the leading empty paragraph)
+and pictures -- using local fonts found the same way as ``deckgen.metrics``.
+Placeholders take the box, wrapping and paragraph styles they leave out from
+their layout, and the background comes from the layout or master when the
+slide has none.
+That is enough to eyeball the §2.8 zone layout without PowerPoint; it is not
+a full renderer (no theme fonts, autofit, effects or charts).
+
+CJK text needs a CJK font (``DECKGEN_FONT_DIRS``); without one each CJK
+character is drawn as an outlined em box, which still shows the text extent.
+``render_decks`` spreads decks over worker processes.
+"""
+
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .lint import Layouts, _xfrm, level_styles, placeholder_key, slide_names
+from .metrics import CJK_FONTS, EMPTY_PARA_PT, INSET_X_PT, INSET_Y_PT, LATIN_FONTS, find_font
+
+THUMB_WIDTH = 640
+SHEET_COLUMNS = 5
+SHEET_THUMB_WIDTH = 320
+DEFAULT_SIZE_PT = 18
+LINE_SPACING = 1.2
+EMU_PER_PT = 12700
+
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_R = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_CJK_CHARS = "\u2e80-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef"  # CJK, hangul, full width
+_CJK = re.compile("[%s]" % _CJK_CHARS)
+# wrap units: single CJK characters, words with their trailing space, runs of space
+_UNITS = re.compile("[{0}]|[^\\s{0}]+\\s*|\\s+".format(_CJK_CHARS))
+
+
+def _rgb(value, default=(255, 255, 255)):
+    if not value or len(value) != 6:
+        return default
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _fill(el):
+    """Colour of ``el``'s direct ``a:solidFill/a:srgbClr``, or None."""
+    clr = el.find(_A + "solidFill/" + _A + "srgbClr") if el is not None else None
+    return _rgb(clr.get("val")) if clr is not None else None
+
+
+class _Fonts:
+    """Pillow fonts per (cjk, bold, pixel size), from the metrics font search."""
+
+    def __init__(self):
+        self.paths = {
+            (cjk, bold): find_font((CJK_FONTS if cjk else LATIN_FONTS)[bold])
+            or find_font((CJK_FONTS if cjk else LATIN_FONTS)[False])
+            for cjk in (False, True) for bold in (False, True)
+        }
+        self._cache = {}
+
+    def get(self, cjk, bold, px):
+        key = (cjk, bold, px)
+        font = self._cache.get(key)
+        if font is None:
+            path = self.paths[cjk, bold]
+            if path is None and cjk:
+                return None  # caller draws em boxes
+            try:
+                font = ImageFont.truetype(path, px) if path else ImageFont.load_default(px)
+            except OSError:
+                font = ImageFont.load_default(px)
+            self._cache[key] = font
+        return font
+
+
+def _first(attr, *elements):
+    """``attr`` of the first of ``elements`` that has it, or None."""
+    for el in elements:
+        if el is not None and el.get(attr) is not None:
+            return el.get(attr)
+    return None
+
+
+class _ParaStyle:
+    def __init__(self, p, levels=None):
+        ppr = p.find(_A + "pPr")
+        rpr = ppr.find(_A + "defRPr") if ppr is not None else None
+        run = p.find(_A + "r/" + _A + "rPr")
+        style = rpr if rpr is not None else run
+        level = (levels or {}).get(int(_first("lvl", ppr) or 0))
+        base = level.find(_A + "defRPr") if level is not None else None
+        size = _first("sz", style, base)
+        self.text = "".join(t.text or "" for t in p.iter(_A + "t"))
+        self.size = int(size) / 100 if size else DEFAULT_SIZE_PT
+        self.bold = _first("b", style, base) == "1"
+        self.color = _fill(style) or _fill(base) or (255, 255, 255)
+        self.align = _first("algn", ppr, level) or "l"
+        spc = None
+        for el in (ppr, level):
+            spc = el.find(_A + "spcAft/" + _A + "spcPts") if el is not None else None
+            if spc is not None:
+                break
+        self.space_after = int(spc.get("val")) / 100 if spc is not None else 0
+        if not self.text:
+            self.size = EMPTY_PARA_PT
+
+
+class SlideRenderer:
+    """Draws slides of one size at ``width`` pixels."""
+
+    def __init__(self, width=THUMB_WIDTH):
+        self.width = width
+        self.fonts = _Fonts()
+
+    def _text_width(self, text, bold, px):
+        width = 0
+        for seg_cjk, seg in self._segments(text):
+            font = self.fonts.get(seg_cjk, bold, px)
+            width += px * len(seg) if font is None else font.getlength(seg)
+        return width
+
+    @staticmethod
+    def _segments(text):
+        """Split ``text`` into (is_cjk, run) pieces so each gets the right font."""
+        out = []
+        for ch in text:
+            cjk = bool(_CJK.match(ch))
+            if out and out[-1][0] == cjk:
+                out[-1][1] += ch
+            else:
+                out.append([cjk, ch])
+        return out
+
+    def _wrap(self, text, bold, px, max_width):
+        lines, line = [], ""
+        for unit in _UNITS.findall(text):
+            if line and self._text_width(line + unit.rstrip(), bold, px) > max_width:
+                lines.append(line.rstrip())
+                line = unit.lstrip()
+            else:
+                line += unit
+        lines.append(line.rstrip())
+        return lines
+
+    def _draw_text(self, draw, x, y, text, bold, px, color):
+        for cjk, seg in self._segments(text):
+            font = self.fonts.get(cjk, bold, px)
+            if font is None:
+                for _ in seg:
+                    pad = max(1, px // 10)
+                    draw.rectangle([x + pad, y + pad, x + px - pad, y + px - pad], outline=color)
+                    x += px
+                continue
+            draw.text((x, y), seg, font=font, fill=color)
+            x += font.getlength(seg)
+
+    def _textbox(self, draw, sp, box, scale, inherited=None):
+        body = sp.find(_P + "txBody")
+        if body is None:
+            return
+        left, top, width, _ = box
+        base_pr = inherited.find(_P + "txBody/" + _A + "bodyPr") if inherited is not None else None
+        wrap = _first("wrap", body.find(_A + "bodyPr"), base_pr) != "none"
+        levels = level_styles(inherited)
+        inset_x, inset_y = INSET_X_PT * scale, INSET_Y_PT * scale
+        inner = width - 2 * inset_x
+        y = top + inset_y
+        for p in body.iter(_A + "p"):
+            para = _ParaStyle(p, levels)
+            px = max(1, round(para.size * scale))
+            line_height = para.size * LINE_SPACING * scale
+            lines = self._wrap(para.text, para.bold, px, inner) if (wrap and para.text) else [para.text]
+            for line in lines:
+                if line:
+                    w = self._text_width(line, para.bold, px)
+                    if para.align == "ctr":
+                        x = left + inset_x + (inner - w) / 2
+                    elif para.align == "r":
+                        x = left + inset_x + inner - w
+                    else:
+                        x = left + inset_x
+                    self._draw_text(draw, x, y + (line_height - px) / 2, line, para.bold, px, para.color)
+                y += line_height
+            y += para.space_after * scale
+
+    def render(self, zf, part, size, media_cache=None, layouts=None):
+        """The slide part ``part`` of open .pptx ``zf`` as a Pillow image.
+
+        ``layouts`` is a ``Layouts`` of ``zf``, shared across the deck's slides.
+        """
+        slide_cx, slide_cy = size
+        scale = self.width / (slide_cx / EMU_PER_PT)  # pixels per point
+        height = round(self.width * slide_cy / slide_cx)
+        root = ET.fromstring(zf.read(part))
+        layouts = layouts or Layouts(zf)
+        placeholders = layouts.placeholders(part)
+        bg = _fill(layouts.background(part, root)) or (255, 255, 255)
+        image = Image.new("RGB", (self.width, height), bg)
+        draw = ImageDraw.Draw(image)
+        rels = _rels(zf, part)
+        media_cache = media_cache if media_cache is not None else {}
+        for el in root.find(_P + "cSld/" + _P + "spTree"):
+            inherited = placeholders.get(placeholder_key(el))
+            xfrm = el.find(".//" + _A + "xfrm")
+            if (xfrm is None or xfrm.find(_A + "off") is None) and inherited is not None:
+                xfrm = _xfrm(inherited)
+            if xfrm is None or xfrm.find(_A + "off") is None:
+                continue
+            off, ext = xfrm.find(_A + "off"), xfrm.find(_A + "ext")
+            box = tuple(int(v) / EMU_PER_PT * scale for v in (
+                off.get("x"), off.get("y"), ext.get("cx"), ext.get("cy")))
+            if el.tag == _P + "pic":
+                blip = el.find(".//" + _A + "blip")
+                target = rels.get(blip.get(_R + "embed")) if blip is not None else None
+                if target:
+                    self._picture(image, zf, target, box, media_cache)
+            elif el.tag == _P + "sp":
+                fill = _fill(el.find(_P + "spPr"))
+                if fill is not None:
+                    draw.rectangle([box[0], box[1], box[0] + box[2], box[1] + box[3]], fill=fill)
+                self._textbox(draw, el, box, scale, inherited)
+        return image
+
+    @staticmethod
+    def _picture(image, zf, target, box, media_cache):
+        size = (max(1, round(box[2])), max(1, round(box[3])))
+        key = (target, size)
+        tile = media_cache.get(key)
+        if tile is None:
+            with zf.open(target) as f, Image.open(f) as src:
+                src.draft("RGB", size)  # JPEG: decode at reduced scale
+                tile = media_cache[key] = src.convert("RGBA").resize(size, Image.BILINEAR)
+        image.paste(tile, (round(box[0]), round(box[1])), tile)
+
+
+def _rels(zf, part):
+    folder, name = posixpath.split(part)
+    try:
+        data = zf.read(posixpath.join(folder, "_rels", name + ".rels")).decode("utf-8")
+    except KeyError:
+        return {}
+    return {
+        rid: posixpath.normpath(posixpath.join(folder, target))
+        for rid, target in re.findall(r'Id="([^"]+)"[^>]*?Target="([^"]+)"', data)
+    }
+
+
+def _slide_size(zf):
+    m = re.search(r'<p:sldSz cx="(\d+)" cy="(\d+)"', zf.read("ppt/presentation.xml").decode("utf-8"))
+    return int(m.group(1)), int(m.group(2))
+
+
+def contact_sheet(thumbs, columns=SHEET_COLUMNS, thumb_width=SHEET_THUMB_WIDTH, fonts=None):
+    """One image with ``thumbs`` in a grid, each labelled with its slide number."""
+    if not thumbs:
+        raise ValueError("no slides")
+    fonts = fonts or _Fonts()
+    w = thumb_width
+    h = round(w * thumbs[0].height / thumbs[0].width)
+    gap, label = 12, 18
+    rows = (len(thumbs) + columns - 1) // columns
+    sheet = Image.new("RGB", (gap + columns * (w + gap), gap + rows * (h + label + gap)), (40, 40, 48))
+    draw = ImageDraw.Draw(sheet)
+    font = fonts.get(False, False, 12)
+    for i, thumb in enumerate(thumbs):
+        x = gap + (i % columns) * (w + gap)
+        y = gap + (i // columns) * (h + label + gap)
+        sheet.paste(thumb.resize((w, h), Image.BILINEAR), (x, y))
+        draw.text((x, y + h + 3), str(i + 1), font=font, fill=(200, 200, 200))
+    return sheet
+
+
+def render_deck(path, out_dir, width=THUMB_WIDTH, thumbs=True, sheet=True):
+    """Write ``<deck>-NN.png`` thumbnails and ``<deck>-sheet.png`` into ``out_dir``.
+
+    Returns ``(deck path, slide count, written paths)``.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    renderer = SlideRenderer(width)
+    written, images, media = [], [], {}
+    with zipfile.ZipFile(path) as zf:
+        size = _slide_size(zf)
+        layouts = Layouts(zf)
+        for number, part in enumerate(slide_names(zf), 1):
+            image = renderer.render(zf, part, size, media, layouts)
+            images.append(image)
+            if thumbs:
+                out = os.path.join(out_dir, "%s-%02d.png" % (stem, number))
+                image.save(out, compress_level=1)
+                written.append(out)
+    if sheet and images:
+        out = os.path.join(out_dir, "%s-sheet.png" % stem)
+        contact_sheet(images, fonts=renderer.fonts).save(out, compress_level=6)
+        written.append(out)
+    return path, len(images), written
+
+
+def render_decks(paths, out_dir, jobs=None, on_result=None, **options):
+    """``render_deck`` for every path, across ``jobs`` processes; returns the results."""
+    jobs = min(jobs or os.cpu_count() or 1, len(paths)) or 1
+    results = []
+    if jobs == 1:
+        for p in paths:
+            results.append(render_deck(p, out_dir, **options))
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(render_deck, p, out_dir, **options) for p in paths]
+        for future in futures:
+            results.append(future.result())
+            if on_result is not None:
+                on_result(results[-1])
+    return results
@@ -0,0 +1,207 @@
+"""
+Opt-in build profiler: where does a deck's build time go?
+
+``BuildProfiler.instrument(deck)`` wraps a deck's page methods (one span per
+slide) and its backend phases -- text stamping, pictures/media, notes, part
+writing, save -- recording wall time and net allocations (tracemalloc) per
+span. After ``save()`` the output zip is read back to attribute its
+compressed bytes to slides (slide, notes and the media each slide adds first).
+
+Results come out as a sorted table and a Chrome trace JSON (load it in
+chrome://tracing, Perfetto or speedscope).
+
+Set ``DECKGEN_PROFILE=<file.json | dir>`` to profile every deck built in the
+process, including the ones in generate_*.py scripts, or pass
+``--profile PATH`` to ``python -m deckgen build-deck`` or ``batch``.
+"""
+
+import collections
+import functools
+import json
+import os
+import posixpath
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import zipfile
+
+PAGE_METHODS = ("cover_slide", "content_slide", "data_slide", "split_slide", "closing_slide", "chart_slide")
+# backend method -> phase name; missing methods are skipped
+PHASES = {
+    "_new_slide": "new_slide",
+    "_stamp": "shapes",
+    "_picture": "picture",
+    "_chart": "chart",
+    "_media_part": "media",
+    "_notes": "notes",
+    "_write_slide": "write_parts",
+    "save": "save",
+}
+
+Span = collections.namedtuple("Span", "name cat start seconds alloc slide depth")
+
+
+class BuildProfiler:
+    """Collects spans for one or more decks built in this process."""
+
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self.spans = []
+        self.slide_bytes = {}  # slide number -> compressed bytes in the output
+        self.output = None
+        self._depth = 0
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get("DECKGEN_PROFILE")
+        return cls(path) if path else None
+
+    # --- instrumentation ---
+
+    def instrument(self, deck):
+        """Wrap ``deck``'s page methods and backend phases on the instance."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        for name in PAGE_METHODS:
+            setattr(deck, name, self._wrap(getattr(deck, name), name[:-len("_slide")], "slide", deck))
+        for name, phase in PHASES.items():
+            if hasattr(deck, name):
+                setattr(deck, name, self._wrap(getattr(deck, name), phase, "phase", deck))
+        deck.profiler = self
+        return deck
+
+    def _wrap(self, method, name, cat, deck):
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            depth = self._depth
+            self._depth += 1
+            alloc0 = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            result = None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            finally:
+                seconds = time.perf_counter() - start
+                alloc = tracemalloc.get_traced_memory()[0] - alloc0
+                self._depth = depth
+                slide = deck.slide_count if name != "save" else None
+                self.spans.append(Span(name, cat, start - self._origin, seconds, alloc, slide, depth))
+                if name == "save":
+                    self._saved(result)
+        return timed
+
+    def _saved(self, out_path):
+        self.output = out_path
+        try:
+            if self.output and os.path.exists(self.output):
+                self.slide_bytes = output_bytes(self.output)
+            if self.trace_path:
+                self.write_trace(self._trace_file())
+                print(self.report(), file=sys.stderr)
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop tracemalloc if ``instrument`` started it (a deck abandoned before ``save``)."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _trace_file(self):
+        if os.path.isdir(self.trace_path):
+            stem = os.path.splitext(os.path.basename(self.output or "deck"))[0]
+            return os.path.join(self.trace_path, stem + ".trace.json")
+        return self.trace_path
+
+    # --- output ---
+
+    def slides(self):
+        """Per-slide rows: ``(slide, kind, seconds, alloc, output bytes)``."""
+        return [
+            (s.slide, s.name, s.seconds, s.alloc, self.slide_bytes.get(s.slide, 0))
+            for s in self.spans if s.cat == "slide"
+        ]
+
+    def phases(self):
+        """Per-phase rows ``(phase, calls, seconds, alloc)``, slowest first."""
+        totals = collections.OrderedDict()
+        for s in self.spans:
+            if s.cat == "phase":
+                calls, seconds, alloc = totals.get(s.name, (0, 0.0, 0))
+                totals[s.name] = (calls + 1, seconds + s.seconds, alloc + s.alloc)
+        rows = [(name,) + v for name, v in totals.items()]
+        return sorted(rows, key=lambda r: -r[2])
+
+    def report(self, top=10):
+        """Phase totals plus the ``top`` slowest slides, as a text table."""
+        lines = ["%-12s %6s %10s %12s" % ("phase", "calls", "ms", "alloc KB")]
+        for name, calls, seconds, alloc in self.phases():
+            lines.append("%-12s %6d %10.1f %12.1f" % (name, calls, seconds * 1000, alloc / 1024))
+        slides = sorted(self.slides(), key=lambda r: -r[2])
+        if slides:
+            total = sum(r[2] for r in slides)
+            lines.append("")
+            lines.append("%-6s %-8s %10s %12s %12s" % ("slide", "kind", "ms", "alloc KB", "output KB"))
+            for slide, kind, seconds, alloc, size in slides[:top]:
+                lines.append("%-6d %-8s %10.2f %12.1f %12.1f"
+                             % (slide, kind, seconds * 1000, alloc / 1024, size / 1024))
+            lines.append("%d slides, %.1f ms in page methods" % (len(slides), total * 1000))
+        return "\n".join(lines)
+
+    def trace_events(self):
+        """Chrome trace "complete" events (microsecond timestamps)."""
+        pid, tid = os.getpid(), threading.get_ident()
+        events = []
+        for s in self.spans:
+            args = {"alloc_bytes": s.alloc}
+            if s.slide is not None:
+                args["slide"] = s.slide
+                if s.cat == "slide":
+                    args["output_bytes"] = self.slide_bytes.get(s.slide, 0)
+            events.append({
+                "name": s.name if s.cat == "phase" else "%s #%d" % (s.name, s.slide),
+                "cat": s.cat, "ph": "X", "pid": pid, "tid": tid,
+                "ts": round(s.start * 1e6, 3), "dur": round(s.seconds * 1e6, 3), "args": args,
+            })
+        events.sort(key=lambda e: (e["ts"], -e["dur"]))
+        return events
+
+    def write_trace(self, path):
+        data = {"traceEvents": self.trace_events(), "displayTimeUnit": "ms",
+                "otherData": {"output": self.output}}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return path
+
+
+_SLIDE_PART = re.compile(r"^ppt/slides/slide(\d+)\.xml$")
+
+
+def output_bytes(pptx_path):
+    """Slide number -> compressed bytes of its slide, notes and first-used media parts."""
+    sizes = {}
+    with zipfile.ZipFile(pptx_path) as zf:
+        infos = {i.filename: i for i in zf.infolist()}
+        seen_media = set()
+        numbers = sorted(int(m.group(1)) for m in map(_SLIDE_PART.match, infos) if m)
+        for n in numbers:
+            total = 0
+            rels_name = "ppt/slides/_rels/slide%d.xml.rels" % n
+            for name in ("ppt/slides/slide%d.xml" % n, rels_name,
+                         "ppt/notesSlides/notesSlide%d.xml" % n, "ppt/notesSlides/_rels/notesSlide%d.xml.rels" % n):
+                if name in infos:
+                    total += infos[name].compress_size
+            if rels_name in infos:
+                for target in re.findall(rb'Target="([^"]+)"', zf.read(rels_name)):
+                    part = posixpath.normpath(posixpath.join("ppt/slides", target.decode("utf-8")))
+                    if part.startswith("ppt/media/") and part in infos and part not in seen_media:
+                        seen_media.add(part)
+                        total += infos[part].compress_size
+            sizes[n] = total
+    return sizes
@@ -0,0 +1,160 @@
+"""
+Local render daemon: POST a deck spec, get the .pptx bytes back.
+
+A ``RenderServer`` keeps one warm DeckBuilder for its whole life -- python-pptx
+imported, each theme's template built once, themes compiled and image bytes
+cached (re-read only when a file changes) -- so a rebuild in the authoring
+loop costs only the render itself. It listens on TCP (``--port``) or, where
+the platform has them (not Windows), a Unix socket (``--socket``)::
+
+    python -m deckgen serve --port 8765 --root decks/
+    curl --data-binary @decks/v10.yaml -H 'Content-Type: application/yaml' \\
+        http://127.0.0.1:8765/render -o v10.pptx
+
+Endpoints:
+
+* ``POST /render`` -- body is a JSON spec (YAML with a ``yaml`` content type);
+  responds with the .pptx, ``X-Slide-Count`` and ``X-Render-Seconds``.
+  Relative image paths resolve against ``root``. Invalid specs get a 400.
+* ``GET /health`` -- JSON with the number of decks rendered and cached images.
+
+Renders are serialized; the builder and its caches are not thread-safe, and
+rendering is CPU-bound anyway.
+"""
+
+import http.server
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from .spec import DeckBuilder, SpecError, parse_spec
+
+PPTX_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+MAX_SPEC_BYTES = 16 << 20
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX")  # not on Windows
+
+# one slide of every page type, rendered at startup to warm every code path
+_WARMUP = {
+    "output": "warmup.pptx",
+    "slides": [
+        {"type": "cover", "title": "t", "subtitle": "s"},
+        {"type": "content", "title": "t", "bullets": ["## h", "# e", "b"]},
+        {"type": "data", "title": "t", "number": "1", "unit": "u", "explanation": "e"},
+        {"type": "split", "title": "t", "bullets": ["b"]},
+        {"type": "chart", "title": "t", "categories": ["a"], "series": {"s": [1]}},
+        {"type": "closing", "title": "t", "subtitle": "s"},
+    ],
+}
+
+
+class RenderService:
+    """The warm builder behind the daemon; usable without HTTP as well."""
+
+    def __init__(self, root=None, autofit=False):
+        self.root = os.path.abspath(root or os.getcwd())
+        self.builder = DeckBuilder(autofit=autofit)
+        self.rendered = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.render(dict(_WARMUP))
+        self.rendered = 0
+
+    def render(self, spec):
+        """Render a validated spec; returns ``(pptx bytes, slide count)``."""
+        spec.setdefault("_dir", self.root)
+        buf = io.BytesIO()
+        with self._lock:
+            count = self.builder.render(spec, buf)
+            self.rendered += 1
+        return buf.getvalue(), count
+
+    def health(self):
+        return {
+            "rendered": self.rendered,
+            "images": len(self.builder.images),
+            "uptime": round(time.time() - self.started, 1),
+            "pid": os.getpid(),
+        }
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    server_version = "deckgen"
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body, content_type, headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._reply(status, (message + "\n").encode("utf-8"), "text/plain; charset=utf-8")
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._error(404, "not found: %s" % self.path)
+        self._reply(200, json.dumps(self.server.service.health()).encode("utf-8"), "application/json")
+
+    def do_POST(self):
+        if self.path != "/render":
+            return self._error(404, "not found: %s" % self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if not 0 < length <= MAX_SPEC_BYTES:
+            return self._error(411 if not length else 413, "spec body required (at most %d bytes)" % MAX_SPEC_BYTES)
+        body = self.rfile.read(length)
+        start = time.perf_counter()
+        try:
+            spec = parse_spec(body.decode("utf-8"), "request", yaml="yaml" in self.headers.get("Content-Type", ""))
+            data, count = self.server.service.render(spec)
+        except (SpecError, UnicodeDecodeError) as e:
+            return self._error(400, str(e))
+        except Exception as e:  # keep the daemon alive; the client gets the error
+            return self._error(500, "%s: %s" % (type(e).__name__, e))
+        filename = os.path.basename(spec["output"])
+        self._reply(200, data, PPTX_TYPE, [
+            ("X-Slide-Count", str(count)),
+            ("X-Render-Seconds", "%.4f" % (time.perf_counter() - start)),
+            ("Content-Disposition", 'attachment; filename="%s"' % filename.replace('"', "")),
+        ])
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            sys.stderr.write("%s - %s\n" % (self.address_string(), format % args))
+
+
+class _TCPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+if UNIX_SOCKETS:
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(service, host="127.0.0.1", port=8765, socket_path=None, quiet=False):
+    """An HTTP server for ``service`` on ``host:port``, or on ``socket_path`` if given.
+
+    Raises ValueError for ``socket_path`` where Unix sockets are unavailable.
+    """
+    if socket_path:
+        if not UNIX_SOCKETS:
+            raise ValueError("Unix sockets are not available on this platform; listen on a TCP port instead")
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixServer(socket_path, _Handler)
+    else:
+        server = _TCPServer((host, port), _Handler)
+    server.service = service
+    server.quiet = quiet
+    return server
@@ -0,0 +1,223 @@
+"""
+Declarative deck specs (JSON / YAML) compiled to PPTX through DeckEngine.
+
+One spec file describes one deck::
+
+    output: Memory_Architecture_V10.pptx
+    theme: zoned                  # "default" (v9 layout) or "zoned" (§2.8 zones)
+    theme_overrides:              # optional, merged via derive_theme
+      data: {number: {color: FFD700}}
+    images:                       # optional aliases for the slides' "image" field
+      ngram: C:/.../concept_ngram_hashing.png
+    slides:
+      - {type: cover, title: ..., subtitle: ..., image: ngram, tagline: ..., notes: ...}
+      - {type: content, title: ..., bullets: [...], notes: ...}
+      - {type: data, title: ..., number: ..., unit: ..., explanation: ..., notes: ...}
+      - {type: split, title: ..., bullets: [...], image: ngram, notes: ...}
+      - {type: chart, title: ..., categories: [...], series: {name: [numbers]},
+         chart_type: column, number_format: '0"GB"', notes: ...}
+      - {type: closing, title: ..., subtitle: ..., notes: ...}
+
+Relative image paths resolve against the spec file; ``output`` resolves against
+the build's output directory (default: the spec file's directory).
+"""
+
+import json
+import os
+
+from .assets import ImageCache, default_images
+from .engine import THEME, ZONED_THEME, DeckEngine, derive_theme
+
+THEMES = {"default": THEME, "zoned": ZONED_THEME}
+
+# page type -> (required fields, optional fields); "notes" is always optional
+PAGE_FIELDS = {
+    "cover": (("title", "subtitle"), ("image", "tagline")),
+    "content": (("title", "bullets"), ()),
+    "data": (("title", "number", "unit", "explanation"), ()),
+    "split": (("title", "bullets"), ("image",)),
+    "closing": (("title", "subtitle"), ()),
+    "chart": (("title", "categories", "series"), ("chart_type", "number_format")),
+}
+CHART_TYPES = ("column", "stacked", "bar", "line", "pie")
+
+
+class SpecError(ValueError):
+    """A deck spec that cannot be rendered; the message names file and slide."""
+
+
+def load_spec(path):
+    """Read and validate the spec at ``path`` (``.json``, ``.yaml`` or ``.yml``)."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    spec = parse_spec(text, path, yaml=path.endswith((".yaml", ".yml")))
+    spec["_dir"] = os.path.dirname(os.path.abspath(path))
+    return spec
+
+
+def parse_spec(text, source="<spec>", yaml=False):
+    """Parse and validate spec ``text`` (JSON, or YAML when ``yaml`` is true)."""
+    if yaml:
+        try:
+            import yaml as _yaml
+        except ImportError:
+            raise SpecError("%s: YAML specs need PyYAML (pip install pyyaml)" % source) from None
+        try:
+            spec = _yaml.safe_load(text)
+        except _yaml.YAMLError as e:
+            raise SpecError("%s: %s" % (source, e)) from None
+    else:
+        try:
+            spec = json.loads(text)
+        except ValueError as e:
+            raise SpecError("%s: %s" % (source, e)) from None
+    validate_spec(spec, source)
+    return spec
+
+
+def validate_spec(spec, source="<spec>"):
+    if not isinstance(spec, dict):
+        raise SpecError("%s: top level must be a mapping" % source)
+    if not spec.get("output"):
+        raise SpecError("%s: missing 'output'" % source)
+    if spec.get("theme", "default") not in THEMES:
+        raise SpecError("%s: unknown theme %r (expected one of %s)"
+                        % (source, spec["theme"], ", ".join(THEMES)))
+    images = spec.get("images", {})
+    if not isinstance(images, dict) or not all(isinstance(v, str) for v in images.values()):
+        raise SpecError("%s: 'images' must map names to image paths" % source)
+    slides = spec.get("slides")
+    if not isinstance(slides, list) or not slides:
+        raise SpecError("%s: 'slides' must be a non-empty list" % source)
+    for idx, slide in enumerate(slides, 1):
+        kind = slide.get("type") if isinstance(slide, dict) else None
+        if kind not in PAGE_FIELDS:
+            raise SpecError("%s: slide %d: unknown type %r" % (source, idx, kind))
+        required, optional = PAGE_FIELDS[kind]
+        missing = [k for k in required if k not in slide]
+        if missing:
+            raise SpecError("%s: slide %d (%s): missing %s" % (source, idx, kind, ", ".join(missing)))
+        unknown = set(slide) - set(required) - set(optional) - {"type", "notes"}
+        if unknown:
+            raise SpecError("%s: slide %d (%s): unknown field(s) %s"
+                            % (source, idx, kind, ", ".join(sorted(unknown))))
+        bullets = slide.get("bullets", [])
+        if not isinstance(bullets, list) or not all(isinstance(b, str) for b in bullets):
+            raise SpecError("%s: slide %d (%s): 'bullets' must be a list of strings" % (source, idx, kind))
+        if kind == "chart":
+            _validate_chart(slide, "%s: slide %d (chart)" % (source, idx))
+
+
+def _validate_chart(slide, where):
+    if slide.get("chart_type", "column") not in CHART_TYPES:
+        raise SpecError("%s: unknown chart_type %r (expected one of %s)"
+                        % (where, slide["chart_type"], ", ".join(CHART_TYPES)))
+    categories, series = slide["categories"], slide["series"]
+    if not isinstance(categories, list) or not categories:
+        raise SpecError("%s: 'categories' must be a non-empty list" % where)
+    if not isinstance(series, dict) or not series:
+        raise SpecError("%s: 'series' must map series names to value lists" % where)
+    for name, values in series.items():
+        if not isinstance(values, list) or len(values) != len(categories):
+            raise SpecError("%s: series %r needs one value per category (%d)" % (where, name, len(categories)))
+        if not all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values):
+            raise SpecError("%s: series %r has non-numeric values" % (where, name))
+
+
+def theme_for(spec):
+    theme = THEMES[spec.get("theme", "default")]
+    if spec.get("theme_overrides"):
+        theme = derive_theme(theme, spec["theme_overrides"])
+    return theme
+
+
+def _image(spec, name):
+    if not name:
+        return None
+    path = spec.get("images", {}).get(name, name)
+    return os.path.join(spec.get("_dir", ""), path)
+
+
+def render_spec(spec, deck):
+    """Add every slide of ``spec`` to ``deck`` (a DeckEngine or StreamingDeckWriter)."""
+    for slide in spec["slides"]:
+        kind, notes = slide["type"], slide.get("notes", "")
+        if kind == "cover":
+            deck.cover_slide(slide["title"], slide["subtitle"], _image(spec, slide.get("image")),
+                             notes, tagline=slide.get("tagline"))
+        elif kind == "content":
+            deck.content_slide(slide["title"], slide["bullets"], notes)
+        elif kind == "data":
+            deck.data_slide(slide["title"], slide["number"], slide["unit"], slide["explanation"], notes)
+        elif kind == "split":
+            deck.split_slide(slide["title"], slide["bullets"], _image(spec, slide.get("image")), notes)
+        elif kind == "chart":
+            deck.chart_slide(slide["title"], slide["categories"], slide["series"], notes,
+                             chart_type=slide.get("chart_type"), number_format=slide.get("number_format"))
+        else:
+            deck.closing_slide(slide["title"], slide["subtitle"], notes)
+    return deck
+
+
+class DeckBuilder:
+    """Renders many specs in one process.
+
+    Each theme's template (``deckgen.master``) is built once and every deck
+    is opened from those bytes; images are read once per process through a shared ImageCache (or the
+    on-disk AssetCache when ``DECKGEN_ASSET_CACHE`` is set). With ``stream=True``
+    decks are written slide by slide through StreamingDeckWriter instead;
+    ``incremental=True`` also reuses unchanged slides of the previous output
+    (IncrementalDeckWriter). ``autofit=True`` sizes text to its boxes
+    (metrics.AutoFit), remembering chosen sizes in the asset cache if any.
+    """
+
+    def __init__(self, out_dir=None, stream=False, incremental=False, autofit=False):
+        self.out_dir = out_dir
+        self.stream = stream
+        self.incremental = incremental
+        self.images = default_images()
+        if self.images is None:
+            self.images = ImageCache()
+        self.autofit = None
+        if autofit:
+            from .metrics import AutoFit
+
+            cache_dir = getattr(self.images, "cache_dir", None)
+            self.autofit = AutoFit(cache_path=cache_dir and os.path.join(cache_dir, "autofit.json"))
+
+    def output_path(self, spec):
+        return os.path.join(self.out_dir or spec["_dir"], spec["output"])
+
+    def build(self, spec_path):
+        """Render ``spec_path``; returns ``(out_path, slide_count)``."""
+        spec = load_spec(spec_path)
+        out_path = self.output_path(spec)
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        return out_path, self.render(spec, out_path)
+
+    def render(self, spec, out):
+        """Render a loaded spec to ``out``, a path or a binary file; returns the slide count.
+
+        File objects always go through DeckEngine; the streaming writers need a path.
+        """
+        deck = None
+        try:
+            if (self.stream or self.incremental) and isinstance(out, str):
+                from .incremental import IncrementalDeckWriter
+                from .writer import StreamingDeckWriter
+
+                writer = IncrementalDeckWriter if self.incremental else StreamingDeckWriter
+                with writer(out, theme_for(spec), images=self.images) as deck:
+                    deck.autofit = self.autofit
+                    render_spec(spec, deck)
+            else:
+                deck = DeckEngine(theme_for(spec), images=self.images)
+                deck.autofit = self.autofit
+                render_spec(spec, deck)
+                deck.save(out)
+        finally:
+            if deck is not None and deck.profiler is not None:
+                deck.profiler.stop()
+        if self.autofit is not None:
+            self.autofit.save()
+        return deck.slide_count
@@ -0,0 +1,344 @@
+"""
+Streaming PPTX writer: slides go straight into the zip as they are produced.
+
+``DeckEngine`` keeps python-pptx's whole package graph -- every slide, notes
+slide and image blob -- in memory until ``save()``. ``StreamingDeckWriter``
+offers the same page methods but writes each slide part, its notes part and
+any new media part to the output zip immediately, keeping only a few integers
+per slide, so a 500-slide deck builds in constant memory. Image files are
+memory-mapped rather than read: the SHA1 python-pptx names media by is taken
+over the map and the mapped pages are compressed straight into the zip.
+
+The non-slide parts (the theme's master and page layouts, themes, notes
+master) come from ``deckgen.master.template`` opened and serialized once per
+process, theme and slide size; slide and notes XML is exactly what DeckEngine
+produces.
+"""
+
+import collections
+import io
+import json
+import mmap
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from pptx import Presentation
+from pptx.parts.image import Image
+from pptx.util import Inches, lazyproperty
+
+from .engine import CHART, PICTURE, THEME, _NSDECLS, BaseDeck, _paragraphs
+from .master import LAYOUTS, template
+from .package import _CT, _RELS_NS, _RT, _XML_DECL, stamp_core, write_buffer, write_str
+
+# Parts the writer produces itself; everything else is copied from the skeleton.
+_GENERATED = re.compile(
+    r"^(\[Content_Types\]\.xml|ppt/presentation\.xml|ppt/_rels/presentation\.xml\.rels"
+    r"|ppt/(slides|notesSlides)/.*)$"
+)
+
+_XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_CHART_TYPE = "application/vnd.openxmlformats-officedocument.drawingml.chart+xml"
+
+_SLIDE_HEAD = (
+    '<p:sld %s><p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/>'
+    "<p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>" % _NSDECLS
+)
+_SLIDE_TAIL = "</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>"
+
+_PIC = (
+    '<p:pic><p:nvPicPr><p:cNvPr id="%d" name="Picture %d" descr="%s"/><p:cNvPicPr>'
+    '<a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/></p:nvPicPr><p:blipFill>'
+    '<a:blip r:embed="%s"/><a:stretch><a:fillRect/></a:stretch></p:blipFill><p:spPr>'
+    '<a:xfrm><a:off x="%d" y="%d"/><a:ext cx="%d" cy="%d"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+)
+
+_Media = collections.namedtuple("_Media", "partname descr ext content_type size dpi")
+# an image cache's file for a picture: mapped like a path, but embedded without a filename
+_Source = collections.namedtuple("_Source", "path")
+
+
+class _MappedImage(Image):
+    """python-pptx's Image over an mmap; Pillow reads only the header from the map.
+
+    ``Image._pil_props`` would first copy the whole blob into a BytesIO.
+    """
+
+    @lazyproperty
+    def _pil_props(self):
+        from PIL import Image as PIL_Image
+
+        self._blob.seek(0)
+        with PIL_Image.open(self._blob) as pil:
+            return pil.format, pil.size, pil.info.get("dpi")
+
+
+_skeletons = {}
+
+
+class _Skeleton:
+    """The fixed parts of a theme's empty deck, split out of one python-pptx save."""
+
+    def __init__(self, theme, slide_width, slide_height):
+        prs = Presentation(io.BytesIO(template(theme)))
+        prs.slide_width, prs.slide_height = slide_width, slide_height
+        prs.slides.add_slide(prs.slide_layouts[0]).notes_slide.notes_text_frame.text = ""
+        buf = io.BytesIO()
+        prs.save(buf)
+        with zipfile.ZipFile(buf) as zf:
+            self.parts = [(n, zf.read(n)) for n in zf.namelist() if not _GENERATED.match(n)]
+            presentation = zf.read("ppt/presentation.xml").decode("utf-8")
+            rels = zf.read("ppt/_rels/presentation.xml.rels").decode("utf-8")
+            types = zf.read("[Content_Types].xml").decode("utf-8")
+            notes = zf.read("ppt/notesSlides/notesSlide1.xml").decode("utf-8")
+        layouts = {layout.name: layout.part.partname for layout in prs.slide_layouts}
+        self.layouts = {kind: ".." + layouts[name][len("/ppt"):] for kind, name in LAYOUTS.items()}
+        # presentation.xml around the slide id list
+        self.presentation = re.split(r"<p:sldIdLst>.*?</p:sldIdLst>", presentation)
+        # package rels minus the slide; slide 1 keeps its rId, later slides number on
+        # from the highest rId the other parts (notes master included) took
+        rels = re.findall(r"<Relationship [^>]*/>", rels)
+        rid = re.compile(r'Id="rId(\d+)"')
+        self.rels = [r for r in rels if "/slide\"" not in r]
+        self.first_slide_rid = next(int(rid.search(r).group(1)) for r in rels if "/slide\"" in r)
+        self.last_rid = max(int(rid.search(r).group(1)) for r in self.rels)
+        self.defaults = dict(re.findall(r'<Default Extension="([^"]+)" ContentType="([^"]+)"/>', types))
+        self.overrides = {
+            k: v for k, v in re.findall(r'<Override PartName="([^"]+)" ContentType="([^"]+)"/>', types)
+            if not k.startswith(("/ppt/slides/", "/ppt/notesSlides/"))
+        }
+        # notes slide around the body placeholder's paragraphs
+        self.notes = notes[len(_XML_DECL):].split("<a:p/>")
+        assert len(self.notes) == 2, "unexpected notes slide template"
+
+
+def _skeleton(theme, slide_width, slide_height):
+    key = (json.dumps(theme, sort_keys=True), slide_width, slide_height)
+    skel = _skeletons.get(key)
+    if skel is None:
+        skel = _skeletons[key] = _Skeleton(theme, slide_width, slide_height)
+    return skel
+
+
+def _rels(rels):
+    return (
+        _XML_DECL + '<Relationships xmlns="%s">' % _RELS_NS
+        + "".join('<Relationship Id="%s" Type="%s%s" Target="%s"/>' % r for r in rels)
+        + "</Relationships>"
+    )
+
+
+def slide_parts(n):
+    """Zip entry names written for slide ``n``."""
+    return (
+        "ppt/slides/slide%d.xml" % n,
+        "ppt/slides/_rels/slide%d.xml.rels" % n,
+        "ppt/notesSlides/notesSlide%d.xml" % n,
+        "ppt/notesSlides/_rels/notesSlide%d.xml.rels" % n,
+    )
+
+
+class StreamingDeckWriter(BaseDeck):
+    """Writes a deck to ``out_path`` one slide at a time.
+
+    Use it like DeckEngine, then call ``save()`` (or use it as a context
+    manager) to write the package index. Page methods return the slide number.
+    """
+
+    def __init__(self, out_path, theme=THEME, images=None):
+        super().__init__(theme, images)
+        self.out_path = out_path
+        self.slide_width = Inches(theme["slide_width"])
+        self.slide_height = Inches(theme["slide_height"])
+        self._skel = _skeleton(theme, self.slide_width, self.slide_height)
+        self._media = {}  # sha1 -> _Media
+        self._images = 0  # highest ppt/media/imageN index in use
+        self._charts = 0  # ppt/charts/chartN and its ppt/embeddings workbook
+        self._count = 0
+        self._zip = zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED)
+        self._write_fixed_parts()
+
+    @property
+    def slide_count(self):
+        return self._count
+
+    def _write_fixed_parts(self):
+        for name, blob in self._skel.parts:
+            if name == "docProps/core.xml":
+                blob = stamp_core(blob.decode("utf-8"))
+            write_str(self._zip, name, blob)
+
+    def _image(self, img_path, spec):
+        # the cache's file rather than its bytes, so _media_part can map it
+        source = getattr(self.images, "source", None)
+        if source is None:
+            return super()._image(img_path, spec)
+        path = source(img_path, spec.get("width"), spec.get("height"))
+        return _Source(path) if path else None
+
+    def _media_part(self, image):
+        """Partname and descr for ``image``, writing it on first use (deduped by SHA1).
+
+        Raises ValueError for an empty image file, which cannot be mapped.
+        """
+        if isinstance(image, (str, _Source)):
+            path, filename = (image, os.path.basename(image)) if isinstance(image, str) else (image.path, None)
+            if os.path.getsize(path) == 0:
+                raise ValueError("%s: empty image file" % path)
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+                return self._media_entry(_MappedImage(blob, filename), blob)
+        blob = image.read()
+        return self._media_entry(Image.from_blob(blob), blob)
+
+    def _media_entry(self, img, blob):
+        entry = self._media.get(img.sha1)
+        if entry is None:
+            entry = self._media[img.sha1] = self._add_media(img, blob)
+        return entry
+
+    def _add_media(self, img, blob):
+        self._images += 1
+        partname = "ppt/media/image%d.%s" % (self._images, img.ext)
+        write_buffer(self._zip, partname, blob)
+        # keep the metadata only; the blob is already in the zip
+        return _Media(partname, img.filename or "image.%s" % img.ext, img.ext, img.content_type, img.size, img.dpi)
+
+    def _picture(self, shape_id, img_path, spec, rels):
+        image = self._image(img_path, spec)
+        if image is None:
+            return None
+        media = self._media_part(image)
+        rid = rels.get(media.partname)
+        if rid is None:
+            rid = rels[media.partname] = "rId%d" % (len(rels) + 2)
+        cx = Inches(spec["width"]) if spec.get("width") else None
+        cy = Inches(spec["height"]) if spec.get("height") else None
+        if spec.get("left") is None:
+            left = (self.slide_width - (cx or 0)) // 2
+        else:
+            left = Inches(spec["left"])
+        cx, cy = self._scale(media, cx, cy)
+        return _PIC % (shape_id, shape_id - 1, escape(media.descr, {'"': "&quot;"}), rid,
+                       left, Inches(spec["top"]), cx, cy)
+
+    def _chart(self, shape_id, spec, rels):
+        """Write a chart part and its workbook; returns the slide's graphicFrame."""
+        from .charts import chart_parts, graphic_frame
+
+        n = self._charts = self._charts + 1
+        partname = "ppt/charts/chart%d.xml" % n
+        rid = rels[partname] = "rId%d" % (len(rels) + 2)
+        chart_xml, xlsx = chart_parts(spec)
+        write_str(self._zip, partname, chart_xml)
+        write_str(self._zip, "ppt/charts/_rels/chart%d.xml.rels" % n, _rels([
+            ("rId1", _RT, "package", "../embeddings/Microsoft_Excel_Sheet%d.xlsx" % n),
+        ]))
+        write_str(self._zip, "ppt/embeddings/Microsoft_Excel_Sheet%d.xlsx" % n, xlsx)
+        return graphic_frame(shape_id, rid, *(Inches(v) for v in spec["box"]))
+
+    @staticmethod
+    def _scale(media, cx, cy):
+        """``ImagePart.scale``: fill in the missing dimension from the native size."""
+        (px_w, px_h), (dpi_x, dpi_y) = media.size, media.dpi
+        native_cx, native_cy = int(914400 * px_w / dpi_x), int(914400 * px_h / dpi_y)
+        if cx and cy:
+            return cx, cy
+        if cx:
+            return cx, int(round(native_cy * float(cx) / float(native_cx)))
+        if cy:
+            return int(round(native_cx * float(cy) / float(native_cy))), cy
+        return native_cx, native_cy
+
+    def _add_slide(self, kind, shapes, notes):
+        n = self._count = self._count + 1
+        self._write_slide(n, kind, shapes, notes)
+        return n
+
+    def _write_slide(self, n, kind, shapes, notes):
+        """Write slide ``n`` and its notes; returns the media partnames it references."""
+        rels = {}  # media or chart partname -> rId; rId1 is the layout
+        fragments, shape_id = [], 2
+        for render, *args in shapes:
+            if render == PICTURE:
+                xml = self._picture(shape_id, *args, rels)
+            elif render == CHART:
+                xml = self._chart(shape_id, *args, rels)
+            else:
+                xml = render(shape_id, *args)
+            if xml is not None:
+                fragments.append(xml)
+                shape_id += 1
+        slide_rels = [("rId1", _RT, "slideLayout", self._skel.layouts[kind])]
+        slide_rels += [(rid, _RT, "chart" if part.startswith("ppt/charts/") else "image", "../" + part[4:])
+                       for part, rid in rels.items()]
+        slide_rels.append(("rId%d" % (len(rels) + 2), _RT, "notesSlide", "../notesSlides/notesSlide%d.xml" % n))
+        head, tail = self._skel.notes
+        slide, slide_rels_part, notes_part, notes_rels = slide_parts(n)
+        write_str(self._zip, slide, _XML_DECL + _SLIDE_HEAD + "".join(fragments) + _SLIDE_TAIL)
+        write_str(self._zip, slide_rels_part, _rels(slide_rels))
+        write_str(self._zip, notes_part, _XML_DECL + head + _paragraphs(notes) + tail)
+        write_str(self._zip, notes_rels, _rels([
+            ("rId1", _RT, "notesMaster", "../notesMasters/notesMaster1.xml"),
+            ("rId2", _RT, "slide", "../slides/slide%d.xml" % n),
+        ]))
+        return [part for part in rels if part.startswith("ppt/media/")]
+
+    def _slide_rid(self, n):
+        """rId number of slide ``n`` in presentation.xml.rels, as python-pptx assigns it."""
+        return self._skel.first_slide_rid if n == 1 else self._skel.last_rid + n - 1
+
+    def save(self, out_path=None):
+        """Write presentation.xml, its rels and the content types; close the zip."""
+        if out_path is not None and os.path.abspath(out_path) != os.path.abspath(self.out_path):
+            raise ValueError("StreamingDeckWriter writes to %s, not %s" % (self.out_path, out_path))
+        if self._zip is None:
+            return self.out_path
+        skel, count = self._skel, self._count
+        before, after = skel.presentation
+        ids = "".join('<p:sldId id="%d" r:id="rId%d"/>' % (255 + n, self._slide_rid(n)) for n in range(1, count + 1))
+        id_list = "<p:sldIdLst>%s</p:sldIdLst>" % ids if ids else ""
+        write_str(self._zip, "ppt/presentation.xml", before + id_list + after)
+        slides = ['<Relationship Id="rId%d" Type="%sslide" Target="slides/slide%d.xml"/>'
+                  % (self._slide_rid(n), _RT, n) for n in range(1, count + 1)]
+        rels = sorted(skel.rels + slides, key=lambda r: int(re.search(r'Id="rId(\d+)"', r).group(1)))
+        write_str(self._zip, "ppt/_rels/presentation.xml.rels", "".join([
+            _XML_DECL, '<Relationships xmlns="%s">' % _RELS_NS, *rels, "</Relationships>"
+        ]))
+        defaults = dict(skel.defaults)
+        for media in self._media.values():
+            defaults[media.ext] = media.content_type
+        if self._charts:
+            defaults["xlsx"] = _XLSX_TYPE
+        overrides = dict(skel.overrides)
+        for n in range(1, self._charts + 1):
+            overrides["/ppt/charts/chart%d.xml" % n] = _CHART_TYPE
+        for n in range(1, count + 1):
+            overrides["/ppt/slides/slide%d.xml" % n] = _CT + "slide+xml"
+            overrides["/ppt/notesSlides/notesSlide%d.xml" % n] = _CT + "notesSlide+xml"
+        write_str(self._zip, "[Content_Types].xml", "".join([
+            _XML_DECL, '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">',
+            *('<Default Extension="%s" ContentType="%s"/>' % kv for kv in sorted(defaults.items())),
+            *('<Override PartName="%s" ContentType="%s"/>' % kv for kv in sorted(overrides.items())),
+            "</Types>",
+        ]))
+        self._zip.close()
+        self._zip = None
+        return self.out_path
+
+    def close(self):
+        """Abandon an unfinished deck: close the zip and remove the partial file."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+            os.remove(self.out_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.save()
+        else:
+            self.close()
@@ -5,212 +5,38 @@ DeepSeek Engram - 20 Pages PPT
 """
 
 import os
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
+
+from deckgen import DEEPSEEK_GREEN, DeckEngine, derive_theme
+from deckgen import THEME as BASE_THEME
 
 # --- IMAGE PATHS ---
 IMG_ENGRAM = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/ppt_engram_software_1768527643236.png"
 IMG_NGRAM = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/concept_ngram_hashing_1768530510183.png"
 IMG_PREFETCH = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/concept_prefetch_strategy_1768530526058.png"
 
-# --- CONSTANTS ---
-SLIDE_WIDTH = Inches(13.333)
-SLIDE_HEIGHT = Inches(7.5)
-BG_COLOR = RGBColor(15, 15, 25)
-
-# --- FONT SIZES (leijunskill §2.4) ---
-TITLE_SIZE = Pt(54)
-BIG_NUMBER_SIZE = Pt(120)
-SUBTITLE_SIZE = Pt(32)
-BODY_SIZE = Pt(26)
-
-# Colors
-WHITE = RGBColor(255, 255, 255)
-GOLD = RGBColor(255, 215, 0)
-LIGHT_GRAY = RGBColor(220, 220, 220)
-TIANYI_BLUE = RGBColor(0, 191, 255)
-DEEPSEEK_GREEN = RGBColor(46, 204, 113)
+# --- THEME (leijunskill §2.4: 120pt emphasis, DeepSeek green numbers) ---
+THEME = derive_theme(BASE_THEME, {
+    "content": {"emphasis": {"size": 120}},
+    "data": {"number": {"color": DEEPSEEK_GREEN}},
+})
 
 
 def create_engram_ppt():
-    prs = Presentation()
-    prs.slide_width = SLIDE_WIDTH
-    prs.slide_height = SLIDE_HEIGHT
-
-    def set_bg(slide):
-        fill = slide.background.fill
-        fill.solid()
-        fill.fore_color.rgb = BG_COLOR
-
-    def add_notes(slide, text):
-        slide.notes_slide.notes_text_frame.text = text
-
-    def add_signature(slide, is_cover=True):
-        box = slide.shapes.add_textbox(
-            (SLIDE_WIDTH - Inches(5)) / 2,
-            SLIDE_HEIGHT - Inches(1),
-            Inches(5), Inches(0.9)
-        )
-        tf = box.text_frame
-        p1 = tf.add_paragraph()
-        p1.text = "天翼云湖北分公司" + (" 作者" if is_cover else "")
-        p1.font.size = Pt(16)
-        p1.font.color.rgb = TIANYI_BLUE
-        p1.alignment = PP_ALIGN.CENTER
-        p2 = tf.add_paragraph()
-        p2.text = "王理"
-        p2.font.size = Pt(24)
-        p2.font.color.rgb = GOLD
-        p2.font.bold = True
-        p2.alignment = PP_ALIGN.CENTER
-
-    def content_slide(title, bullets, notes):
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.5))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        # Content
-        content_box = s.shapes.add_textbox(Inches(1), Inches(2.0), SLIDE_WIDTH - Inches(2), Inches(4.5))
-        tf = content_box.text_frame
-        tf.word_wrap = True
-        for line in bullets:
-            para = tf.add_paragraph()
-            para.space_after = Pt(14)
-            if line.startswith("##"):
-                para.text = line[2:].strip()
-                para.font.size = BIG_NUMBER_SIZE
-                para.font.color.rgb = GOLD
-                para.font.bold = True
-                para.alignment = PP_ALIGN.CENTER
-            elif line.startswith("#"):
-                para.text = line[1:].strip()
-                para.font.size = SUBTITLE_SIZE
-                para.font.color.rgb = WHITE
-                para.font.bold = True
-            else:
-                para.text = "• " + line
-                para.font.size = BODY_SIZE
-                para.font.color.rgb = LIGHT_GRAY
-        add_notes(s, notes)
-        return s
-
-    def data_slide(title, number, unit, explanation, notes):
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.2))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        # Big Number
-        num_box = s.shapes.add_textbox(Inches(0), Inches(2.2), SLIDE_WIDTH, Inches(2))
-        p = num_box.text_frame.add_paragraph()
-        p.text = number
-        p.font.size = Pt(120)
-        p.font.bold = True
-        p.font.color.rgb = DEEPSEEK_GREEN
-        p.alignment = PP_ALIGN.CENTER
-        # Unit
-        unit_box = s.shapes.add_textbox(Inches(0), Inches(4.2), SLIDE_WIDTH, Inches(0.8))
-        p = unit_box.text_frame.add_paragraph()
-        p.text = unit
-        p.font.size = Pt(36)
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        # Explanation
-        exp_box = s.shapes.add_textbox(Inches(1), Inches(5.2), SLIDE_WIDTH - Inches(2), Inches(1))
-        p = exp_box.text_frame.add_paragraph()
-        p.text = explanation
-        p.font.size = Pt(24)
-        p.font.color.rgb = LIGHT_GRAY
-        p.alignment = PP_ALIGN.CENTER
-        add_notes(s, notes)
-        return s
-
-    def split_slide(title, bullets, img_path, notes):
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.5))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        # Left content
-        left_box = s.shapes.add_textbox(Inches(0.5), Inches(2.0), Inches(5.5), Inches(4.5))
-        tf = left_box.text_frame
-        tf.word_wrap = True
-        for line in bullets:
-            para = tf.add_paragraph()
-            para.space_after = Pt(12)
-            if line.startswith("#"):
-                para.text = line[1:].strip()
-                para.font.size = Pt(28)
-                para.font.color.rgb = WHITE
-                para.font.bold = True
-            else:
-                para.text = line
-                para.font.size = Pt(22)
-                para.font.color.rgb = LIGHT_GRAY
-        # Right image
-        if img_path and os.path.exists(img_path):
-            s.shapes.add_picture(img_path, Inches(6.5), Inches(2.0), width=Inches(6.3))
-        add_notes(s, notes)
-        return s
-
-    def closing_slide(title, subtitle, notes):
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        box = s.shapes.add_textbox(Inches(0), Inches(2.5), SLIDE_WIDTH, Inches(1.5))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = Pt(80)
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        sub = s.shapes.add_textbox(Inches(0), Inches(4.2), SLIDE_WIDTH, Inches(0.8))
-        p = sub.text_frame.add_paragraph()
-        p.text = subtitle
-        p.font.size = Pt(28)
-        p.font.color.rgb = LIGHT_GRAY
-        p.alignment = PP_ALIGN.CENTER
-        add_signature(s, is_cover=False)
-        add_notes(s, notes)
-        return s
+    deck = DeckEngine(THEME)
+    title_slide = deck.cover_slide
+    content_slide = deck.content_slide
+    data_slide = deck.data_slide
+    split_slide = deck.split_slide
+    closing_slide = deck.closing_slide
 
     # ==================== 20 PAGES: ENGRAM DEEP DIVE ====================
 
     # --- P1: Cover ---
-    s = prs.slides.add_slide(prs.slide_layouts[6])
-    set_bg(s)
-    box = s.shapes.add_textbox(Inches(0.5), Inches(0.4), SLIDE_WIDTH - Inches(1), Inches(1.8))
-    p = box.text_frame.add_paragraph()
-    p.text = "DeepSeek Engram\n条件记忆：稀疏性的新维度"
-    p.font.size = Pt(56)
-    p.font.bold = True
-    p.font.color.rgb = WHITE
-    p.alignment = PP_ALIGN.CENTER
-    if os.path.exists(IMG_ENGRAM):
-        s.shapes.add_picture(IMG_ENGRAM, Inches(4), Inches(2.3), height=Inches(2.8))
-    sub = s.shapes.add_textbox(Inches(0), Inches(5.4), SLIDE_WIDTH, Inches(0.8))
-    p = sub.text_frame.add_paragraph()
-    p.text = "Conditional Memory via Scalable Lookup | arXiv 2601.07372"
-    p.font.size = Pt(24)
-    p.font.color.rgb = LIGHT_GRAY
-    p.alignment = PP_ALIGN.CENTER
-    add_signature(s, is_cover=True)
-    add_notes(s, """朋友们，大家好！
+    title_slide(
+        "DeepSeek Engram\n条件记忆：稀疏性的新维度",
+        "Conditional Memory via Scalable Lookup | arXiv 2601.07372",
+        IMG_ENGRAM,
+    """朋友们，大家好！
 
 今天，我想给大家介绍一项可能改变AI未来的技术——DeepSeek Engram。
 
@@ -619,9 +445,9 @@ Engram只是开始。DeepSeek说，这将成为下一代稀疏模型的"必备
 
     # --- Save ---
     out_path = os.path.join(os.getcwd(), 'DeepSeek_Engram_20pages.pptx')
-    prs.save(out_path)
+    deck.save(out_path)
     print(f"Presentation saved to: {out_path}")
-    print(f"Total slides: {len(prs.slides)}")
+    print(f"Total slides: {len(deck.prs.slides)}")
 
 
 if __name__ == "__main__":
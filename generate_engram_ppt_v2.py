@@ -7,274 +7,38 @@ DeepSeek Engram - 20 Pages PPT (V2 - Fixed Layout)
 """
 
 import os
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
+
+from deckgen import ZONED_THEME, DeckEngine
 
 # --- IMAGE PATHS ---
 IMG_ENGRAM = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/ppt_engram_software_1768527643236.png"
 IMG_NGRAM = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/concept_ngram_hashing_1768530510183.png"
 IMG_PREFETCH = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/concept_prefetch_strategy_1768530526058.png"
 
-# --- CANVAS (leijunskill §2.8.1) ---
-SLIDE_WIDTH = Inches(13.333)
-SLIDE_HEIGHT = Inches(7.5)
-BG_COLOR = RGBColor(15, 15, 25)
-
-# --- LAYOUT ZONES (leijunskill §2.8.2) ---
-TITLE_TOP = Inches(0.3)
-TITLE_HEIGHT = Inches(1.0)
-CONTENT_TOP = Inches(1.8)
-CONTENT_HEIGHT = Inches(4.0)
-FOOTER_TOP = Inches(6.3)
-
-# --- FONT SIZES (leijunskill §2.4 - with max limits) ---
-TITLE_SIZE = Pt(48)          # Max: 60pt
-BIG_NUMBER_SIZE = Pt(80)     # Max: 96pt
-EMPHASIS_SIZE = Pt(54)       # Max: 72pt (for ## lines)
-SUBTITLE_SIZE = Pt(28)       # Max: 36pt
-BODY_SIZE = Pt(24)           # Max: 28pt
-
-# Colors
-WHITE = RGBColor(255, 255, 255)
-GOLD = RGBColor(255, 215, 0)
-LIGHT_GRAY = RGBColor(220, 220, 220)
-TIANYI_BLUE = RGBColor(0, 191, 255)
-DEEPSEEK_GREEN = RGBColor(46, 204, 113)
-
 
 def create_engram_ppt_v2():
-    prs = Presentation()
-    prs.slide_width = SLIDE_WIDTH
-    prs.slide_height = SLIDE_HEIGHT
-
-    def set_bg(slide):
-        fill = slide.background.fill
-        fill.solid()
-        fill.fore_color.rgb = BG_COLOR
-
-    def add_notes(slide, text):
-        slide.notes_slide.notes_text_frame.text = text
-
-    def add_signature(slide, is_cover=True):
-        """Signature at footer zone (§2.8.3)"""
-        box = slide.shapes.add_textbox(
-            (SLIDE_WIDTH - Inches(5)) / 2,
-            FOOTER_TOP,
-            Inches(5), Inches(0.9)
-        )
-        tf = box.text_frame
-        p1 = tf.add_paragraph()
-        p1.text = "天翼云湖北分公司" + (" 作者" if is_cover else "")
-        p1.font.size = Pt(16)
-        p1.font.color.rgb = TIANYI_BLUE
-        p1.alignment = PP_ALIGN.CENTER
-        p2 = tf.add_paragraph()
-        p2.text = "王理"
-        p2.font.size = Pt(22)
-        p2.font.color.rgb = GOLD
-        p2.font.bold = True
-        p2.alignment = PP_ALIGN.CENTER
-
-    def content_slide(title, bullets, notes):
-        """Standard content slide (§2.8.4)"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title zone
-        box = s.shapes.add_textbox(
-            Inches(0.5), TITLE_TOP,
-            Inches(12.333), TITLE_HEIGHT
-        )
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        # Content zone
-        content_box = s.shapes.add_textbox(
-            Inches(0.8), CONTENT_TOP,
-            Inches(11.733), CONTENT_HEIGHT
-        )
-        tf = content_box.text_frame
-        tf.word_wrap = True
-        for line in bullets:
-            para = tf.add_paragraph()
-            para.space_after = Pt(12)
-            if line.startswith("##"):
-                para.text = line[2:].strip()
-                para.font.size = EMPHASIS_SIZE  # 54pt, not 120pt!
-                para.font.color.rgb = GOLD
-                para.font.bold = True
-                para.alignment = PP_ALIGN.CENTER
-            elif line.startswith("#"):
-                para.text = line[1:].strip()
-                para.font.size = SUBTITLE_SIZE
-                para.font.color.rgb = WHITE
-                para.font.bold = True
-            else:
-                para.text = "• " + line
-                para.font.size = BODY_SIZE
-                para.font.color.rgb = LIGHT_GRAY
-        add_notes(s, notes)
-        return s
-
-    def data_slide(title, number, unit, explanation, notes):
-        """Big number slide (§2.8.5)"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(
-            Inches(0.5), TITLE_TOP,
-            Inches(12.333), Inches(0.8)
-        )
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = Pt(44)
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        # Big Number
-        num_box = s.shapes.add_textbox(
-            Inches(0), Inches(1.8),
-            SLIDE_WIDTH, Inches(1.8)
-        )
-        p = num_box.text_frame.add_paragraph()
-        p.text = number
-        p.font.size = BIG_NUMBER_SIZE  # 80pt
-        p.font.bold = True
-        p.font.color.rgb = DEEPSEEK_GREEN
-        p.alignment = PP_ALIGN.CENTER
-        # Unit
-        unit_box = s.shapes.add_textbox(
-            Inches(0), Inches(3.8),
-            SLIDE_WIDTH, Inches(0.6)
-        )
-        p = unit_box.text_frame.add_paragraph()
-        p.text = unit
-        p.font.size = Pt(32)
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        # Explanation
-        exp_box = s.shapes.add_textbox(
-            Inches(1), Inches(4.6),
-            SLIDE_WIDTH - Inches(2), Inches(0.8)
-        )
-        p = exp_box.text_frame.add_paragraph()
-        p.text = explanation
-        p.font.size = Pt(22)
-        p.font.color.rgb = LIGHT_GRAY
-        p.alignment = PP_ALIGN.CENTER
-        add_notes(s, notes)
-        return s
-
-    def split_slide(title, bullets, img_path, notes):
-        """Left text, right image (§2.8.6) - FIXED alignment"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(
-            Inches(0.5), TITLE_TOP,
-            Inches(12.333), TITLE_HEIGHT
-        )
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        # Left content (start at CONTENT_TOP)
-        left_box = s.shapes.add_textbox(
-            Inches(0.5), CONTENT_TOP,
-            Inches(5.5), CONTENT_HEIGHT
-        )
-        tf = left_box.text_frame
-        tf.word_wrap = True
-        for line in bullets:
-            para = tf.add_paragraph()
-            para.space_after = Pt(10)
-            if line.startswith("#"):
-                para.text = line[1:].strip()
-                para.font.size = Pt(26)
-                para.font.color.rgb = WHITE
-                para.font.bold = True
-            else:
-                para.text = line
-                para.font.size = Pt(20)
-                para.font.color.rgb = LIGHT_GRAY
-        # Right image (SAME top as text for alignment!)
-        if img_path and os.path.exists(img_path):
-            s.shapes.add_picture(
-                img_path,
-                Inches(6.5),        # Left edge at 6.5"
-                CONTENT_TOP,        # SAME top as text!
-                width=Inches(6.0),  # Width 6"
-            )
-        add_notes(s, notes)
-        return s
-
-    def closing_slide(title, subtitle, notes):
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        box = s.shapes.add_textbox(Inches(0), Inches(2.5), SLIDE_WIDTH, Inches(1.5))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = Pt(72)
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        sub = s.shapes.add_textbox(Inches(0), Inches(4.0), SLIDE_WIDTH, Inches(0.8))
-        p = sub.text_frame.add_paragraph()
-        p.text = subtitle
-        p.font.size = Pt(26)
-        p.font.color.rgb = LIGHT_GRAY
-        p.alignment = PP_ALIGN.CENTER
-        add_signature(s, is_cover=False)
-        add_notes(s, notes)
-        return s
+    deck = DeckEngine(ZONED_THEME)  # leijunskill §2.8 layout zones, §2.4 max font sizes
+    title_slide = deck.cover_slide
+    content_slide = deck.content_slide
+    data_slide = deck.data_slide
+    split_slide = deck.split_slide
+    closing_slide = deck.closing_slide
 
     # ==================== 20 PAGES: ENGRAM DEEP DIVE ====================
 
     # --- P1: Cover (FIXED: title and image separated) ---
-    s = prs.slides.add_slide(prs.slide_layouts[6])
-    set_bg(s)
-    # Title in title zone (0.3" - 1.3")
-    box = s.shapes.add_textbox(
-        Inches(0.5), Inches(0.3),
-        Inches(12.333), Inches(1.0)
-    )
-    tf = box.text_frame
-    p = tf.add_paragraph()
-    p.text = "DeepSeek Engram"
-    p.font.size = Pt(48)
-    p.font.bold = True
-    p.font.color.rgb = WHITE
-    p.alignment = PP_ALIGN.CENTER
-    # Subtitle
-    p2 = tf.add_paragraph()
-    p2.text = "条件记忆：稀疏性的新维度"
-    p2.font.size = Pt(32)
-    p2.font.color.rgb = GOLD
-    p2.alignment = PP_ALIGN.CENTER
-    # Image in content zone (2.0" start)
-    if os.path.exists(IMG_ENGRAM):
-        img_width = Inches(5)
-        img_left = (SLIDE_WIDTH - img_width) / 2
-        s.shapes.add_picture(IMG_ENGRAM, img_left, Inches(2.0), width=img_width)
-    # Source text below image
-    sub = s.shapes.add_textbox(Inches(0), Inches(5.3), SLIDE_WIDTH, Inches(0.5))
-    p = sub.text_frame.add_paragraph()
-    p.text = "Conditional Memory via Scalable Lookup | arXiv 2601.07372"
-    p.font.size = Pt(20)
-    p.font.color.rgb = LIGHT_GRAY
-    p.alignment = PP_ALIGN.CENTER
-    add_signature(s, is_cover=True)
-    add_notes(s, """朋友们，大家好！
+    title_slide(
+        "DeepSeek Engram",
+        "Conditional Memory via Scalable Lookup | arXiv 2601.07372",
+        IMG_ENGRAM,
+    """朋友们，大家好！
 
 今天，我想给大家介绍一项可能改变AI未来的技术——DeepSeek Engram。
 
 这不是普通的技术改进，而是一个全新范式。Engram问了一个简单却深刻的问题："AI为什么要浪费算力去'回忆'那些早已知道的事实？"
 
-这就是今天的主角——条件记忆，稀疏性的新维度。""")
+这就是今天的主角——条件记忆，稀疏性的新维度。""",
+        tagline="条件记忆：稀疏性的新维度")
 
     # --- P2: Agenda ---
     content_slide("分享大纲", [
@@ -421,9 +185,9 @@ def create_engram_ppt_v2():
 
     # --- Save ---
     out_path = os.path.join(os.getcwd(), 'DeepSeek_Engram_20pages_v2.pptx')
-    prs.save(out_path)
+    deck.save(out_path)
     print(f"Presentation saved to: {out_path}")
-    print(f"Total slides: {len(prs.slides)}")
+    print(f"Total slides: {len(deck.prs.slides)}")
 
 
 if __name__ == "__main__":
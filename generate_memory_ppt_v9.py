@@ -10,10 +10,8 @@ Generated with leijunskill v2.0 enhancements:
 """
 
 import os
-from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.dml.color import RGBColor
-from pptx.enum.text import PP_ALIGN
+
+from deckgen import DeckEngine
 
 # --- IMAGE PATHS ---
 IMG_TITLE = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/ppt_cover_memory_wall_1768527608448.png"
@@ -25,210 +23,14 @@ IMG_KV_CACHE = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e
 IMG_NGRAM = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/concept_ngram_hashing_1768530510183.png"
 IMG_PREFETCH = r"C:/Users/mgcpn/.gemini/antigravity/brain/362d749a-8462-4250-84e0-af5da822d504/concept_prefetch_strategy_1768530526058.png"
 
-# --- CONSTANTS (leijunskill §6) ---
-SLIDE_WIDTH = Inches(13.333)
-SLIDE_HEIGHT = Inches(7.5)
-BG_COLOR = RGBColor(15, 15, 25)
-
-# --- FONT SIZE CONTRAST (leijunskill §2.4) ---
-TITLE_SIZE = Pt(54)
-BIG_NUMBER_SIZE = Pt(96)  # Core numbers 80-120pt
-SUBTITLE_SIZE = Pt(32)
-BODY_SIZE = Pt(26)
-CAPTION_SIZE = Pt(16)
-
-# Colors
-WHITE = RGBColor(255, 255, 255)
-GOLD = RGBColor(255, 215, 0)
-LIGHT_GRAY = RGBColor(220, 220, 220)
-TIANYI_BLUE = RGBColor(0, 191, 255)
-
 
 def create_ppt_v9():
-    prs = Presentation()
-    prs.slide_width = SLIDE_WIDTH
-    prs.slide_height = SLIDE_HEIGHT
-
-    def set_bg(slide):
-        fill = slide.background.fill
-        fill.solid()
-        fill.fore_color.rgb = BG_COLOR
-
-    def add_notes(slide, text):
-        slide.notes_slide.notes_text_frame.text = text
-
-    def add_signature(slide, is_cover=True):
-        """Signature only on cover and closing - leijunskill §5"""
-        box = slide.shapes.add_textbox(
-            (SLIDE_WIDTH - Inches(5)) / 2,
-            SLIDE_HEIGHT - Inches(1),
-            Inches(5), Inches(0.9)
-        )
-        tf = box.text_frame
-        p1 = tf.add_paragraph()
-        p1.text = "天翼云湖北分公司" + (" 作者" if is_cover else "")
-        p1.font.size = Pt(16)
-        p1.font.color.rgb = TIANYI_BLUE
-        p1.alignment = PP_ALIGN.CENTER
-        p2 = tf.add_paragraph()
-        p2.text = "王理"
-        p2.font.size = Pt(24)
-        p2.font.color.rgb = GOLD
-        p2.font.bold = True
-        p2.alignment = PP_ALIGN.CENTER
-
-    def title_slide(title, subtitle, img_path, notes):
-        """Cover slide with centered layout"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(Inches(0.5), Inches(0.4), SLIDE_WIDTH - Inches(1), Inches(1.8))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = Pt(56)
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        # Image
-        if img_path and os.path.exists(img_path):
-            s.shapes.add_picture(img_path, Inches(4), Inches(2.3), height=Inches(2.8))
-        # Subtitle
-        sub = s.shapes.add_textbox(Inches(0), Inches(5.4), SLIDE_WIDTH, Inches(0.8))
-        p = sub.text_frame.add_paragraph()
-        p.text = subtitle
-        p.font.size = Pt(24)
-        p.font.color.rgb = LIGHT_GRAY
-        p.alignment = PP_ALIGN.CENTER
-        add_signature(s, is_cover=True)
-        add_notes(s, notes)
-        return s
-
-    def content_slide(title, bullets, notes):
-        """Standard content slide with left-aligned bullets"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.5))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        # Content
-        content_box = s.shapes.add_textbox(Inches(1), Inches(2.0), SLIDE_WIDTH - Inches(2), Inches(4.5))
-        tf = content_box.text_frame
-        tf.word_wrap = True
-        for line in bullets:
-            para = tf.add_paragraph()
-            para.space_after = Pt(14)
-            if line.startswith("##"):
-                para.text = line[2:].strip()
-                para.font.size = BIG_NUMBER_SIZE
-                para.font.color.rgb = GOLD
-                para.font.bold = True
-                para.alignment = PP_ALIGN.CENTER
-            elif line.startswith("#"):
-                para.text = line[1:].strip()
-                para.font.size = SUBTITLE_SIZE
-                para.font.color.rgb = WHITE
-                para.font.bold = True
-            else:
-                para.text = "• " + line
-                para.font.size = BODY_SIZE
-                para.font.color.rgb = LIGHT_GRAY
-        add_notes(s, notes)
-        return s
-
-    def data_slide(title, number, unit, explanation, notes):
-        """Big number slide - leijunskill §2.4 Font Size Contrast"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.2))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        # Big Number (Core: 80-120pt Gold)
-        num_box = s.shapes.add_textbox(Inches(0), Inches(2.2), SLIDE_WIDTH, Inches(2))
-        p = num_box.text_frame.add_paragraph()
-        p.text = number
-        p.font.size = Pt(120)
-        p.font.bold = True
-        p.font.color.rgb = GOLD
-        p.alignment = PP_ALIGN.CENTER
-        # Unit
-        unit_box = s.shapes.add_textbox(Inches(0), Inches(4.2), SLIDE_WIDTH, Inches(0.8))
-        p = unit_box.text_frame.add_paragraph()
-        p.text = unit
-        p.font.size = Pt(36)
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        # Explanation
-        exp_box = s.shapes.add_textbox(Inches(1), Inches(5.2), SLIDE_WIDTH - Inches(2), Inches(1))
-        p = exp_box.text_frame.add_paragraph()
-        p.text = explanation
-        p.font.size = Pt(24)
-        p.font.color.rgb = LIGHT_GRAY
-        p.alignment = PP_ALIGN.CENTER
-        add_notes(s, notes)
-        return s
-
-    def split_slide(title, bullets, img_path, notes):
-        """Left text, right image - leijunskill §6.3"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        # Title
-        box = s.shapes.add_textbox(Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.5))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = TITLE_SIZE
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        # Left content
-        left_box = s.shapes.add_textbox(Inches(0.5), Inches(2.0), Inches(5.5), Inches(4.5))
-        tf = left_box.text_frame
-        tf.word_wrap = True
-        for line in bullets:
-            para = tf.add_paragraph()
-            para.space_after = Pt(12)
-            if line.startswith("#"):
-                para.text = line[1:].strip()
-                para.font.size = Pt(28)
-                para.font.color.rgb = WHITE
-                para.font.bold = True
-            else:
-                para.text = line
-                para.font.size = Pt(22)
-                para.font.color.rgb = LIGHT_GRAY
-        # Right image
-        if img_path and os.path.exists(img_path):
-            s.shapes.add_picture(img_path, Inches(6.5), Inches(2.0), width=Inches(6.3))
-        add_notes(s, notes)
-        return s
-
-    def closing_slide(title, subtitle, notes):
-        """Closing slide with signature"""
-        s = prs.slides.add_slide(prs.slide_layouts[6])
-        set_bg(s)
-        box = s.shapes.add_textbox(Inches(0), Inches(2.5), SLIDE_WIDTH, Inches(1.5))
-        p = box.text_frame.add_paragraph()
-        p.text = title
-        p.font.size = Pt(80)
-        p.font.bold = True
-        p.font.color.rgb = WHITE
-        p.alignment = PP_ALIGN.CENTER
-        sub = s.shapes.add_textbox(Inches(0), Inches(4.2), SLIDE_WIDTH, Inches(0.8))
-        p = sub.text_frame.add_paragraph()
-        p.text = subtitle
-        p.font.size = Pt(28)
-        p.font.color.rgb = LIGHT_GRAY
-        p.alignment = PP_ALIGN.CENTER
-        add_signature(s, is_cover=False)
-        add_notes(s, notes)
-        return s
+    deck = DeckEngine()
+    title_slide = deck.cover_slide
+    content_slide = deck.content_slide
+    data_slide = deck.data_slide
+    split_slide = deck.split_slide
+    closing_slide = deck.closing_slide
 
     # ==================== 40 PAGES GENERATION ====================
 
@@ -870,9 +672,9 @@ AI不再会遗忘。它将永远记得你。
 
     # --- Save ---
     out_path = os.path.join(os.getcwd(), 'Memory_Architecture_V9_leijunskill2.pptx')
-    prs.save(out_path)
+    deck.save(out_path)
     print(f"Presentation saved to: {out_path}")
-    print(f"Total slides: {len(prs.slides)}")
+    print(f"Total slides: {len(deck.prs.slides)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+import json
+import zipfile
+
+import pytest
+
+from deckgen.spec import DeckBuilder
+
+SLIDES = [
+    {"type": "cover", "title": "DeepSeek Engram", "subtitle": "arXiv 2601", "image": "hero.png",
+     "tagline": "条件记忆", "notes": "大家好"},
+    {"type": "content", "title": "汇报大纲", "bullets": ["1. 内存墙", "#小标题", "##强调"], "notes": "第一段\n\n第二段"},
+    {"type": "data", "title": "带宽", "number": "22 TB/s", "unit": "HBM4", "explanation": "三倍于 H100"},
+    {"type": "split", "title": "架构", "bullets": ["#哈希", "O(1) 查表"], "image": "hero.png", "notes": "图 & 表 <1>"},
+    {"type": "closing", "title": "谢谢", "subtitle": "Q&A"},
+]
+CHART = {"type": "chart", "title": "带宽对比", "categories": ["H100", "H200", "B200"],
+         "series": {"TB/s": [3.35, 4.8, 8.0]}, "number_format": "0.0", "notes": "图表"}
+
+
+@pytest.fixture
+def hero(tmp_path):
+    from PIL import Image
+
+    path = tmp_path / "hero.png"
+    Image.new("RGB", (320, 200), (200, 40, 40)).save(path)
+    return path
+
+
+@pytest.fixture
+def build(tmp_path, hero):
+    """``build(slides, name, theme="default", **builder options)`` -> path of the built deck."""
+
+    def build(slides=SLIDES, name="deck.pptx", theme="default", **options):
+        spec = tmp_path / (name + ".json")
+        spec.write_text(json.dumps({"output": name, "theme": theme, "slides": slides}, ensure_ascii=False),
+                        encoding="utf-8")
+        out_path, _ = DeckBuilder(out_dir=str(tmp_path / "build"), **options).build(str(spec))
+        return out_path
+
+    return build
+
+
+def parts(path):
+    """``{name: bytes}`` of every entry of a .pptx."""
+    with zipfile.ZipFile(path) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
@@ -0,0 +1,62 @@
+import hashlib
+import os
+
+from PIL import Image
+
+from deckgen.assets import AssetCache, ImageCache
+
+
+def test_image_cache_rereads_changed_file(hero):
+    cache = ImageCache()
+    first = cache.open(str(hero)).read()
+    assert cache.open(str(hero)).read() == first
+
+    Image.new("RGB", (64, 64), (0, 0, 0)).save(hero)
+    assert cache.open(str(hero)).read() == hero.read_bytes() != first
+    assert cache.open(str(hero.with_name("missing.png"))) is None
+
+
+def test_opaque_image_is_downscaled_to_jpeg(tmp_path, hero):
+    cache = AssetCache(str(tmp_path / "cache"), dpi=100)
+    path = cache.rendition_path(str(hero), width=1.6)
+
+    assert path.endswith(".jpg")
+    with Image.open(path) as img:
+        assert img.format == "JPEG" and img.size == (160, 100)
+    assert cache.source(str(hero), width=1.6) == path
+
+
+def test_alpha_image_stays_png(tmp_path):
+    src = tmp_path / "logo.png"
+    Image.new("RGBA", (320, 200), (0, 0, 0, 0)).save(src)
+    path = AssetCache(str(tmp_path / "cache"), dpi=100).rendition_path(str(src), height=1.0)
+
+    assert path.endswith(".png")
+    with Image.open(path) as img:
+        assert img.mode == "RGBA" and img.size == (160, 100)
+
+
+def test_image_is_never_upscaled(tmp_path, hero):
+    path = AssetCache(str(tmp_path / "cache"), dpi=300).rendition_path(str(hero), width=10)
+    with Image.open(path) as img:
+        assert img.size == (320, 200)
+
+
+def test_digest_index_follows_file_changes(tmp_path, hero):
+    cache_dir = tmp_path / "cache"
+    cache = AssetCache(str(cache_dir))
+    assert cache.digest(str(hero)) == hashlib.sha256(hero.read_bytes()).hexdigest()
+    assert len(os.listdir(cache_dir / "index")) == 1
+
+    # a warm lookup is answered from the index, not by re-hashing the file
+    index = cache_dir / "index" / os.listdir(cache_dir / "index")[0]
+    index.write_text("stale")
+    assert AssetCache(str(cache_dir)).digest(str(hero)) == "stale"
+
+    Image.new("RGB", (64, 64), (0, 0, 0)).save(hero)
+    assert cache.digest(str(hero)) == hashlib.sha256(hero.read_bytes()).hexdigest()
+    assert len(os.listdir(cache_dir / "index")) == 2
+
+    path = cache.rendition_path(str(hero))
+    with Image.open(path) as img:
+        assert img.size == (64, 64)
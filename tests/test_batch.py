@@ -0,0 +1,49 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+from deckgen.batch import BatchError, build_one, run_batch
+from deckgen.incremental import manifest_path
+
+from .conftest import SLIDES
+
+
+def _specs(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / (name + ".json")
+        path.write_text(json.dumps({"output": name + ".pptx", "slides": SLIDES[1:3]}, ensure_ascii=False),
+                        encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_builder_follows_out_dir_and_options(tmp_path):
+    spec, = _specs(tmp_path, ["deck"])
+    first = build_one(spec, str(tmp_path / "a"))
+    second = build_one(spec, str(tmp_path / "b"))
+    assert first["output"] == str(tmp_path / "a" / "deck.pptx")
+    assert second["output"] == str(tmp_path / "b" / "deck.pptx")
+    assert not os.path.exists(manifest_path(second["output"]))
+    third = build_one(spec, str(tmp_path / "b"), {"incremental": True})
+    assert os.path.exists(manifest_path(third["output"]))
+
+
+def test_run_batch(tmp_path):
+    specs = _specs(tmp_path, ["one", "two", "three"])
+    results = run_batch(specs, jobs=2, out_dir=str(tmp_path / "out"))
+    assert sorted(r["target"] for r in results) == sorted(specs)
+    for r in results:
+        assert r["slides"] == 2
+        with zipfile.ZipFile(r["output"]) as zf:
+            assert zf.testzip() is None
+
+
+def test_run_batch_failure(tmp_path):
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps({"output": "bad.pptx", "slides": []}), encoding="utf-8")
+    with pytest.raises(BatchError) as e:
+        run_batch(_specs(tmp_path, ["good"]) + [str(bad)], jobs=1, out_dir=str(tmp_path / "out"))
+    assert e.value.target == str(bad)
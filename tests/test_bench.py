@@ -0,0 +1,32 @@
+import json
+import tracemalloc
+
+from deckgen import bench
+
+from .conftest import SLIDES
+
+
+def _metrics(**memory):
+    return dict({"seconds": 1.0, "size": 1000, "parts": {"slides": 100}}, **memory)
+
+
+def test_compare_only_matches_like_memory_metrics():
+    baseline = {"targets": {"a": _metrics(peak_rss=100), "b": _metrics(peak_traced=100)}}
+    results = {"a": _metrics(peak_traced=500), "b": _metrics(peak_traced=130)}
+    assert [(r.target, r.metric) for r in bench.compare(baseline, results)] == [("b", "peak_traced")]
+
+
+def test_child_falls_back_to_tracemalloc(monkeypatch, tmp_path, hero, capsys):
+    monkeypatch.setattr(bench, "resource", None)
+    monkeypatch.setattr(bench, "MEMORY_METRIC", "peak_traced")
+    spec = tmp_path / "deck.json"
+    spec.write_text(json.dumps({"output": "deck.pptx", "slides": SLIDES}), encoding="utf-8")
+
+    try:
+        bench._child(str(spec), str(tmp_path / "out"), {})
+    finally:
+        tracemalloc.stop()
+
+    result = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert result["peak_traced"] > 0 and "peak_rss" not in result
+    assert result["slides"] == len(SLIDES)
@@ -0,0 +1,36 @@
+import pytest
+
+from deckgen import cli
+
+
+def test_slides_lists_each_slide(build, capsys):
+    deck = build()
+    assert cli.main(["slides", deck]) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 5
+    assert lines[0].startswith("%s:   1  DeepSeek Engram " % deck) and lines[0].endswith("1 pic  大家好")
+    assert lines[1].endswith("第一段  第二段")
+
+
+def test_slides_full_notes_and_unreadable_deck(build, tmp_path, capsys):
+    notes = "很长的备注" * 10
+    deck = build([{"type": "closing", "title": "谢谢", "subtitle": "Q&A", "notes": notes}])
+    assert cli.main(["slides", deck]) == 0
+    assert capsys.readouterr().out.rstrip().endswith(notes[:40] + "...")
+    assert cli.main(["slides", "--notes", deck]) == 0
+    assert capsys.readouterr().out.rstrip().endswith(notes)
+
+    missing = str(tmp_path / "missing.pptx")
+    assert cli.main(["slides", missing, deck]) == 1
+    out = capsys.readouterr()
+    assert out.err.startswith("error: %s:" % missing) and out.out.count("\n") == 1
+
+
+@pytest.mark.parametrize("module, expected", [("deckgen.outline", 0), ("deckgen.preview", 1)])
+def test_import_budget_exit_code(monkeypatch, capsys, module, expected):
+    # a generous budget, so only loading pptx / lxml / PIL fails (preview imports PIL)
+    monkeypatch.setattr(cli, "IMPORT_BUDGETS", {module: 10000})
+    assert cli.main(["import-budget", "-n", "1"]) == expected
+    out = capsys.readouterr().out
+    assert out.startswith(module) and ("loads " in out) == bool(expected)
@@ -0,0 +1,162 @@
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pytest
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN
+from pptx.util import Inches, Pt
+
+from deckgen.lint import Layouts, _xfrm, level_styles, placeholder_key, slide_names
+from deckgen.preview import _ParaStyle, _fill
+
+from .conftest import CHART, SLIDES
+
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+# the cover tagline came after the single-script generator
+PAGES = [{k: v for k, v in slide.items() if k != "tagline"} for slide in SLIDES]
+
+SLIDE_WIDTH, SLIDE_HEIGHT = Inches(13.333), Inches(7.5)
+BG_COLOR = RGBColor(15, 15, 25)
+WHITE = RGBColor(255, 255, 255)
+GOLD = RGBColor(255, 215, 0)
+LIGHT_GRAY = RGBColor(220, 220, 220)
+TIANYI_BLUE = RGBColor(0, 191, 255)
+
+
+def _text(slide, box, text, size, color, bold=False, align=None):
+    p = slide.shapes.add_textbox(*box).text_frame.add_paragraph()
+    p.text = text
+    p.font.size = Pt(size)
+    p.font.bold = bold or None
+    p.font.color.rgb = color
+    if align is not None:
+        p.alignment = align
+
+
+def _bullets(slide, box, lines, space_after, styles):
+    tf = slide.shapes.add_textbox(*box).text_frame
+    tf.word_wrap = True
+    for line in lines:
+        para = tf.add_paragraph()
+        para.space_after = Pt(space_after)
+        for prefix, strip, size, color, bold, align in styles:
+            if line.startswith(prefix):
+                para.text = strip(line)
+                para.font.size = Pt(size)
+                para.font.color.rgb = color
+                para.font.bold = bold or None
+                if align is not None:
+                    para.alignment = align
+                break
+
+
+def _signature(slide, is_cover):
+    tf = slide.shapes.add_textbox((SLIDE_WIDTH - Inches(5)) / 2, SLIDE_HEIGHT - Inches(1),
+                                  Inches(5), Inches(0.9)).text_frame
+    for text, size, color, bold in (("天翼云湖北分公司" + (" 作者" if is_cover else ""), 16, TIANYI_BLUE, False),
+                                    ("王理", 24, GOLD, True)):
+        p = tf.add_paragraph()
+        p.text = text
+        p.font.size = Pt(size)
+        p.font.color.rgb = color
+        p.font.bold = bold or None
+        p.alignment = PP_ALIGN.CENTER
+
+
+def baseline(pages, image, out_path):
+    """The pages drawn with python-pptx's object model, as the single-script generator did."""
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = SLIDE_WIDTH, SLIDE_HEIGHT
+    title_box = (Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.5))
+    for page in pages:
+        s = prs.slides.add_slide(prs.slide_layouts[6])
+        s.background.fill.solid()
+        s.background.fill.fore_color.rgb = BG_COLOR
+        kind = page["type"]
+        if kind == "cover":
+            _text(s, (Inches(0.5), Inches(0.4), SLIDE_WIDTH - Inches(1), Inches(1.8)), page["title"], 56, WHITE,
+                  True, PP_ALIGN.CENTER)
+            s.shapes.add_picture(image, Inches(4), Inches(2.3), height=Inches(2.8))
+            _text(s, (Inches(0), Inches(5.4), SLIDE_WIDTH, Inches(0.8)), page["subtitle"], 24, LIGHT_GRAY,
+                  align=PP_ALIGN.CENTER)
+            _signature(s, True)
+        elif kind == "content":
+            _text(s, title_box, page["title"], 54, WHITE, True)
+            _bullets(s, (Inches(1), Inches(2.0), SLIDE_WIDTH - Inches(2), Inches(4.5)), page["bullets"], 14, [
+                ("##", lambda line: line[2:].strip(), 96, GOLD, True, PP_ALIGN.CENTER),
+                ("#", lambda line: line[1:].strip(), 32, WHITE, True, None),
+                ("", lambda line: "• " + line, 26, LIGHT_GRAY, False, None),
+            ])
+        elif kind == "data":
+            _text(s, (Inches(0.5), Inches(0.3), SLIDE_WIDTH - Inches(1), Inches(1.2)), page["title"], 54, WHITE,
+                  True, PP_ALIGN.CENTER)
+            _text(s, (Inches(0), Inches(2.2), SLIDE_WIDTH, Inches(2)), page["number"], 120, GOLD, True,
+                  PP_ALIGN.CENTER)
+            _text(s, (Inches(0), Inches(4.2), SLIDE_WIDTH, Inches(0.8)), page["unit"], 36, WHITE,
+                  align=PP_ALIGN.CENTER)
+            _text(s, (Inches(1), Inches(5.2), SLIDE_WIDTH - Inches(2), Inches(1)), page["explanation"], 24,
+                  LIGHT_GRAY, align=PP_ALIGN.CENTER)
+        elif kind == "split":
+            _text(s, title_box, page["title"], 54, WHITE, True)
+            _bullets(s, (Inches(0.5), Inches(2.0), Inches(5.5), Inches(4.5)), page["bullets"], 12, [
+                ("#", lambda line: line[1:].strip(), 28, WHITE, True, None),
+                ("", lambda line: line, 22, LIGHT_GRAY, False, None),
+            ])
+            s.shapes.add_picture(image, Inches(6.5), Inches(2.0), width=Inches(6.3))
+        elif kind == "closing":
+            _text(s, (Inches(0), Inches(2.5), SLIDE_WIDTH, Inches(1.5)), page["title"], 80, WHITE, True,
+                  PP_ALIGN.CENTER)
+            _text(s, (Inches(0), Inches(4.2), SLIDE_WIDTH, Inches(0.8)), page["subtitle"], 28, LIGHT_GRAY,
+                  align=PP_ALIGN.CENTER)
+            _signature(s, False)
+        s.notes_slide.notes_text_frame.text = page.get("notes", "")
+    prs.save(out_path)
+    return out_path
+
+
+def _shown(style):
+    # an empty paragraph only shows as its line height
+    return vars(style) if style.text else style.size
+
+
+def rendered(path):
+    """Per slide: background, then each shape's box and its paragraphs as they display."""
+    slides = []
+    with zipfile.ZipFile(path) as zf:
+        layouts = Layouts(zf)
+        for part in slide_names(zf):
+            root = ET.fromstring(zf.read(part))
+            inherited = layouts.placeholders(part)
+            shapes = []
+            for el in root.find(_P + "cSld/" + _P + "spTree"):
+                if el.tag not in (_P + "sp", _P + "pic"):
+                    continue
+                base = inherited.get(placeholder_key(el))
+                xfrm = _xfrm(el) if _xfrm(el) is not None else _xfrm(base)
+                box = tuple(int(xfrm.find(_A + tag).get(k)) for tag, k in
+                            (("off", "x"), ("off", "y"), ("ext", "cx"), ("ext", "cy")))
+                levels = level_styles(base)
+                paras = [_shown(_ParaStyle(p, levels)) for p in el.iter(_A + "p")]
+                shapes.append((el.tag[len(_P):], box, paras))
+            slides.append((_fill(layouts.background(part, root)), shapes))
+    prs = Presentation(path)
+    notes = [s.notes_slide.notes_text_frame.text for s in prs.slides]
+    return slides, notes
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page["type"] for page in PAGES])
+def test_engine_matches_object_model_baseline(build, hero, tmp_path, page):
+    expected = rendered(baseline([page], str(hero), str(tmp_path / "baseline.pptx")))
+    assert rendered(build([page])) == expected
+
+
+def test_streamed_deck_is_byte_identical(build, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "315532800")
+    slides = SLIDES[:-1] + [CHART] + SLIDES[-1:]
+    with open(build(slides, "engine.pptx"), "rb") as f:
+        engine = f.read()
+    with open(build(slides, "stream.pptx", stream=True), "rb") as f:
+        assert f.read() == engine
@@ -0,0 +1,54 @@
+import io
+import re
+import zipfile
+
+import pytest
+from pptx import Presentation
+
+from deckgen.fonts import _EOT_HEADER, _EOT_MAGIC, embed_fonts
+from deckgen.metrics import find_font
+
+TTFont = pytest.importorskip("fontTools.ttLib").TTFont
+DEJAVU = find_font(["DejaVuSans.ttf"])
+pytestmark = pytest.mark.skipif(DEJAVU is None, reason="needs DejaVu Sans")
+
+
+def _font_parts(path):
+    """``{family: {style: fntdata bytes}}`` reached from presentation.xml's embeddedFontLst."""
+    with zipfile.ZipFile(path) as zf:
+        pres = zf.read("ppt/presentation.xml").decode("utf-8")
+        rels = zf.read("ppt/_rels/presentation.xml.rels").decode("utf-8")
+        targets = dict(re.findall(r'Id="(rId\d+)"[^>]*Target="([^"]+)"', rels))
+        fonts = {}
+        for family, body in re.findall(r'<p:embeddedFont><p:font typeface="([^"]+)"/>(.*?)</p:embeddedFont>', pres):
+            styles = re.findall(r'<p:(\w+) r:id="(\w+)"/>', body)
+            fonts[family] = {style: zf.read("ppt/" + targets[rid]) for style, rid in styles}
+        return fonts
+
+
+def _eot(blob):
+    fields = _EOT_HEADER.unpack_from(blob)
+    size, data_size, magic = fields[0], fields[1], fields[9]
+    assert size == len(blob) and magic == _EOT_MAGIC
+    return TTFont(io.BytesIO(blob[-data_size:]))
+
+
+def test_embedded_font_list_round_trips(build, tmp_path):
+    deck = build()
+    fonts = {(script, False): DEJAVU for script in ("latin", "ea")}
+
+    stats = embed_fonts(deck, fonts=fonts)
+    first = _font_parts(deck)
+    embed_fonts(deck, fonts=fonts)  # re-embedding replaces the list and parts
+
+    assert _font_parts(deck) == first
+    assert list(first) == ["DejaVu Sans"]
+    styles = first["DejaVu Sans"]
+    font = _eot(styles["regular"])
+    assert ord("D") in font.getBestCmap() and font["name"].getDebugName(1) == "DejaVu Sans"
+    assert stats.font_bytes == sum(map(len, styles.values()))
+    with zipfile.ZipFile(deck) as zf:
+        assert len([n for n in zf.namelist() if n.startswith("ppt/fonts/")]) == len(styles)
+        assert '<a:latin typeface="DejaVu Sans"' in zf.read("ppt/theme/theme1.xml").decode("utf-8")
+        assert zf.testzip() is None
+    Presentation(deck)
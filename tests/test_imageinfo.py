@@ -0,0 +1,62 @@
+import io
+import struct
+
+import pytest
+from PIL import Image
+from pptx.parts.image import Image as PptxImage
+
+from deckgen import imageinfo
+from deckgen.imageinfo import ImageError, ImageInfo, fit_size, probe, probe_file
+
+
+def _encode(fmt, size=(320, 200), mode="RGB", **params):
+    buf = io.BytesIO()
+    Image.new(mode, size, 0).save(buf, fmt, **params)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("fmt, params", [
+    ("PNG", {}),
+    ("PNG", {"dpi": (150, 150)}),
+    ("JPEG", {}),
+    ("JPEG", {"dpi": (300, 300)}),
+    ("WEBP", {}),
+    ("WEBP", {"lossless": True}),
+    ("GIF", {}),
+])
+def test_probe_matches_python_pptx(fmt, params):
+    blob = _encode(fmt, **params)
+    expected = PptxImage.from_blob(blob)
+    info = probe(io.BytesIO(blob))
+    assert (info.format, info.width, info.height) == (fmt, 320, 200)
+    assert info.dpi == expected.dpi
+
+
+def test_probe_rejects_unknown_truncated_and_empty_images():
+    assert probe(io.BytesIO(b"BM" + b"\0" * 64)) is None
+    assert probe(io.BytesIO(_encode("PNG")[:20])) is None
+    header = b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII5B", 13, b"IHDR", 0, 200, 8, 2, 0, 0, 0) + b"\0" * 4
+    assert probe(io.BytesIO(header)) is None
+
+
+def test_fit_size():
+    info = ImageInfo("PNG", 320, 200, (72, 72))
+    assert fit_size(info) == (320 / 72, 200 / 72)
+    assert fit_size(info, width=4.0) == (4.0, 2.5)
+    assert fit_size(info, width=8.0, max_width=6.0, max_height=4.0) == (6.0, 3.75)
+    assert fit_size(info, height=4.0, max_height=3.0) == pytest.approx((4.8, 3.0))
+    with pytest.raises(ImageError):
+        fit_size(ImageInfo("PNG", 0, 200, (72, 72)), width=4.0)
+
+
+def test_probe_file_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(imageinfo, "PROBE_CACHE_SIZE", 2)
+    monkeypatch.setattr(imageinfo, "_probed", imageinfo._probed.__class__())
+    paths = []
+    for n in range(3):
+        path = tmp_path / ("%d.png" % n)
+        path.write_bytes(_encode("PNG", size=(10 + n, 10)))
+        paths.append(str(path))
+    assert [probe_file(p).width for p in paths] == [10, 11, 12]
+    assert len(imageinfo._probed) == 2
+    assert probe_file(str(tmp_path / "missing.png")) is None
@@ -0,0 +1,53 @@
+import pytest
+
+from deckgen.incremental import IncrementalDeckWriter
+from deckgen.writer import StreamingDeckWriter, slide_parts
+
+from .conftest import parts
+
+
+def _pages(deck, hero, number):
+    deck.cover_slide("DeepSeek Engram", "arXiv 2601", str(hero), "大家好")
+    deck.content_slide("汇报大纲", ["1. 内存墙", "#小标题"], "第一段")
+    deck.data_slide("带宽", number, "HBM4", "三倍于 H100", "")
+    deck.split_slide("架构", ["#哈希", "O(1) 查表"], str(hero), "图 & 表 <1>")
+    deck.closing_slide("谢谢", "Q&A", "")
+    return deck
+
+
+@pytest.fixture(autouse=True)
+def reproducible(monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "315532800")
+
+
+def _build(path, hero, number):
+    deck = _pages(IncrementalDeckWriter(str(path)), hero, number)
+    deck.save()
+    return deck.rebuilt
+
+
+def test_unchanged_slides_are_copied(tmp_path, hero):
+    path = tmp_path / "deck.pptx"
+    assert _build(path, hero, "22 TB/s") == [1, 2, 3, 4, 5]
+    before = parts(path)
+    assert _build(path, hero, "22 TB/s") == []
+    assert parts(path) == before
+
+    assert _build(path, hero, "8 TB/s") == [3]
+    after = parts(path)
+    for n in (1, 2, 4, 5):
+        for name in slide_parts(n):
+            assert after[name] == before[name]
+    assert after[slide_parts(3)[0]] != before[slide_parts(3)[0]]
+
+    fresh = _pages(StreamingDeckWriter(str(tmp_path / "fresh.pptx")), hero, "8 TB/s")
+    with open(fresh.save(), "rb") as f, open(path, "rb") as g:
+        assert g.read() == f.read()
+
+
+def test_modified_output_is_rebuilt(tmp_path, hero):
+    path = tmp_path / "deck.pptx"
+    _build(path, hero, "22 TB/s")
+    with open(path, "ab") as f:
+        f.write(b"\0")
+    assert _build(path, hero, "22 TB/s") == [1, 2, 3, 4, 5]
@@ -0,0 +1,31 @@
+from deckgen.lint import Shape, lint_deck, lint_slide
+
+from .conftest import CHART, SLIDES
+
+
+def _zone_messages(shapes):
+    return [(s.name, message) for s, rule, message in lint_slide(shapes, False, False, "-") if rule == "zone"]
+
+
+def test_template_content_position_is_compliant():
+    shapes = [
+        Shape(2, "Title 1", "sp", 0.5, 0.3, 12.333, 1.0, "标题"),
+        Shape(3, "Body 2", "sp", 0.8, 1.8, 11.733, 4.0, "正文"),
+    ]
+    assert _zone_messages(shapes) == []
+
+
+def test_shape_crossing_zones_is_flagged():
+    shapes = [
+        Shape(2, "Title 1", "sp", 0.5, 0.3, 12.333, 1.5, "标题"),
+        Shape(3, "Body 2", "sp", 0.8, 1.6, 11.733, 4.5, "正文"),
+    ]
+    assert _zone_messages(shapes) == [
+        ("Title 1", '0.30-1.80" spans title + subtitle'),
+        ("Body 2", '1.60-6.10" spans subtitle + content + footer + gap'),
+    ]
+
+
+def test_zoned_deck_has_no_zone_violations(build):
+    deck = build(SLIDES + [CHART], theme="zoned")
+    assert [v for v in lint_deck(deck) if v.rule == "zone"] == []
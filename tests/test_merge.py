@@ -0,0 +1,87 @@
+import zipfile
+
+from pptx import Presentation
+
+from deckgen.lint import slide_names
+from deckgen.merge import merge_decks
+
+from .conftest import CHART, SLIDES
+
+
+def test_merge_across_themes_keeps_each_master(build, tmp_path):
+    a = build(name="a.pptx")
+    b = build(name="b.pptx", theme="zoned")
+    out = str(tmp_path / "merged.pptx")
+
+    stats = merge_decks([a, b, a], out)
+
+    assert stats.slides == 3 * len(SLIDES)
+    prs = Presentation(out)
+    assert [len(m.slide_layouts) for m in prs.slide_masters] == [6, 6]
+    masters = [str(s.slide_layout.slide_master.part.partname) for s in prs.slides]
+    n = len(SLIDES)
+    assert masters == ["/ppt/slideMasters/slideMaster1.xml"] * n + ["/ppt/slideMasters/slideMaster2.xml"] * n + [
+        "/ppt/slideMasters/slideMaster1.xml"] * n
+    # zoned titles keep their own layout's box
+    assert list(prs.slides)[n + 1].shapes.title.top == Presentation(b).slides[1].shapes.title.top
+    assert list(prs.slides)[1].shapes.title.top == Presentation(a).slides[1].shapes.title.top
+
+
+def test_merge_same_theme_shares_master_and_media(build, tmp_path):
+    a = build(name="a.pptx")
+    out = str(tmp_path / "merged.pptx")
+
+    stats = merge_decks([a, a], out)
+
+    assert stats.media == 1 and stats.shared == 1
+    with zipfile.ZipFile(out) as zf:
+        assert len(slide_names(zf)) == 2 * len(SLIDES)
+        assert [n for n in zf.namelist() if n.startswith("ppt/slideMasters/slideMaster")] == [
+            "ppt/slideMasters/slideMaster1.xml"]
+        ids = zf.read("ppt/presentation.xml").decode("utf-8").count("<p:sldMasterId ")
+    assert ids == 1
+
+
+def test_merge_copies_charts_and_workbooks(build, tmp_path):
+    a = build(SLIDES + [CHART], name="a.pptx")
+    b = build([CHART, CHART], name="b.pptx", theme="zoned")
+    out = str(tmp_path / "merged.pptx")
+
+    merge_decks([a, b], out)
+
+    prs = Presentation(out)
+    charts = [shape.chart for slide in prs.slides for shape in slide.shapes if shape.has_chart]
+    assert len(charts) == 3
+    assert [tuple(c.plots[0].categories) for c in charts] == [("H100", "H200", "B200")] * 3
+    with zipfile.ZipFile(out) as zf:
+        names = zf.namelist()
+        types = zf.read("[Content_Types].xml").decode("utf-8")
+        assert zf.testzip() is None
+    assert sorted(n for n in names if n.startswith("ppt/embeddings/")) == [
+        "ppt/embeddings/Microsoft_Excel_Sheet%d.xlsx" % i for i in (1, 2, 3)]
+    assert types.count("drawingml.chart+xml") == 3 and 'Extension="xlsx"' in types
+    # the workbook behind each chart still opens
+    assert all(c.part.chart_workbook.xlsx_part.blob[:2] == b"PK" for c in charts)
+
+
+def test_merge_reports_merged_counts_in_app_properties(build, tmp_path):
+    a = build(name="a.pptx")
+    b = build(SLIDES[:2], name="b.pptx")
+    with zipfile.ZipFile(a) as zf:
+        app = zf.read("docProps/app.xml").decode("utf-8")
+    # what PowerPoint writes into a saved deck's app.xml
+    app = app.replace("<Words>0</Words>", "<Words>42</Words>").replace(
+        "<Slides>0</Slides>", "<Slides>%d</Slides>" % len(SLIDES))
+    with zipfile.ZipFile(a) as src, zipfile.ZipFile(str(tmp_path / "a2.pptx"), "w") as dst:
+        for info in src.infolist():
+            dst.writestr(info, app if info.filename == "docProps/app.xml" else src.read(info))
+    out = str(tmp_path / "merged.pptx")
+
+    merge_decks([str(tmp_path / "a2.pptx"), b], out)
+
+    with zipfile.ZipFile(out) as zf:
+        merged = zf.read("docProps/app.xml").decode("utf-8")
+    n = len(SLIDES) + 2
+    assert "<Slides>%d</Slides>" % n in merged and "<Notes>%d</Notes>" % n in merged
+    assert "<Words>" not in merged and "TitlesOfParts" not in merged and "HeadingPairs" not in merged
+    assert len(Presentation(out).slides) == n
@@ -0,0 +1,59 @@
+import pytest
+
+from deckgen.engine import _Element
+from deckgen.metrics import (
+    EMPTY_PARA_PT, FONT_LIMITS, INSET_Y_PT, AutoFit, LayoutDeck, OverflowCheck, TextMeasurer, box_extent,
+)
+from deckgen.spec import ZONED_THEME, render_spec
+
+from .conftest import CHART, SLIDES
+
+
+def test_template_boxes_do_not_overflow(hero):
+    # a tagline really does push the cover title past its 1.2" box
+    slides = [{k: v for k, v in s.items() if k != "tagline"} for s in SLIDES]
+    spec = {"slides": slides + [CHART], "_dir": str(hero.parent)}
+    deck = render_spec(spec, LayoutDeck(ZONED_THEME))
+    assert deck.overflow.measure()
+    assert deck.overflow.run() == []
+
+
+def test_long_text_overflows():
+    spec = {"slides": [{"type": "content", "title": "标题" * 40, "bullets": ["正文"]}]}
+    deck = render_spec(spec, LayoutDeck(ZONED_THEME, OverflowCheck(TextMeasurer())))
+    assert [(o.kind, o.shape) for o in deck.overflow.run()] == [("content", "title")]
+
+
+def test_box_extent_counts_the_leading_paragraph():
+    m = TextMeasurer()
+    box, paras = _Element(ZONED_THEME["data"]["title"], "title").layout("带宽")
+    lines, _, height = box_extent(m, box, paras)
+    assert lines == 1
+    assert height == pytest.approx(INSET_Y_PT + (EMPTY_PARA_PT + 44) * m.line_height)
+
+
+def test_line_count_wraps_at_break_opportunities():
+    m = TextMeasurer()
+    word = m.width("memory") * 24 / 1000
+    assert m.line_count("memory memory", 24, word * 1.5)[0] == 2
+    assert m.line_count("记忆" * 10, 24, 24 * 5)[0] == 4
+    # a word wider than the box breaks anywhere
+    assert m.line_count("m" * 30, 24, word)[0] > 1
+    assert m.line_count("memory\nmemory", 24, 1000, wrap=False) == (2, word)
+    assert m.width("𠀀a") == 1000 + m.width("a")
+
+
+def test_autofit_only_shrinks():
+    fit = AutoFit(TextMeasurer())
+    short = {"type": "content", "title": "短", "bullets": ["一", "#二", "##三"]}
+    long = {"type": "content", "title": "短", "bullets": ["很长的一段正文" * 12] * 5}
+    for slide, shrunk in ((short, False), (long, True)):
+        deck = LayoutDeck(ZONED_THEME, OverflowCheck(fit.measurer))
+        deck.autofit = fit
+        render_spec({"slides": [slide]}, deck)
+        sizes = {p.name: p.size for _, _, name, _, paras in deck.overflow.boxes for p, _ in paras}
+        assert sizes["title"] == ZONED_THEME["content"]["title"]["size"]
+        if shrunk:
+            assert FONT_LIMITS["body"][0] <= sizes["bullet"] < ZONED_THEME["content"]["bullet"]["size"]
+        else:
+            assert sizes == {"title": 48, "bullet": 24, "heading": 28, "emphasis": 54}
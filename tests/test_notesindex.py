@@ -0,0 +1,45 @@
+import io
+import json
+
+from deckgen.notesindex import NotesIndex, export_notes, tokenize
+
+from .conftest import SLIDES
+
+
+def _spec(tmp_path, notes):
+    path = tmp_path / "notes.json"
+    slides = [{"type": "content", "title": "第%d页" % n, "bullets": ["x"], "notes": text}
+              for n, text in enumerate(notes, 1)]
+    path.write_text(json.dumps({"output": "notes.pptx", "slides": slides}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_tokenize():
+    assert tokenize("Engram 条件记忆") == ["engram", "条件", "件记", "记忆"]
+    assert tokenize("图") == ["图"]
+    assert sorted(tokenize("图表", unigrams=True)) == sorted(["图表", "图", "表"])
+
+
+def test_single_character_query_matches_inside_runs(tmp_path):
+    index = NotesIndex()
+    assert index.add_source(_spec(tmp_path, ["图表", "图 & 表", "条件记忆模块", "无关"])) == 4
+    assert sorted(h.slide for h in index.search("图")) == [1, 2]
+    assert [h.slide for h in index.search("条件记忆")] == [3]
+    assert index.search("记忆 图") == []
+
+
+def test_unchanged_sources_are_skipped(tmp_path):
+    source = _spec(tmp_path, ["内存墙"])
+    index = NotesIndex()
+    index.add_source(source)
+    index.save(str(tmp_path / "index.json"))
+    loaded = NotesIndex.load(str(tmp_path / "index.json"))
+    assert loaded.add_source(source) == 0
+    assert [h.notes for h in loaded.search("内存")] == ["内存墙"]
+
+
+def test_export_built_deck(build):
+    out = io.StringIO()
+    assert export_notes([build()], out) == len(SLIDES)
+    notes = [json.loads(line)["notes"] for line in out.getvalue().splitlines()]
+    assert notes == [s.get("notes", "") for s in SLIDES]
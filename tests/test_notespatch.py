@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from pptx import Presentation
+
+from deckgen.notespatch import NotesPatchError, patch_notes
+
+from .conftest import SLIDES, parts
+
+NOTES = 'a & b <c> "d"\n\n第二段'
+
+
+def test_patched_notes_are_escaped(build, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "315532800")
+    path = build()
+    assert patch_notes(path, {2: NOTES}) == [2]
+
+    xml = parts(path)["ppt/notesSlides/notesSlide2.xml"].decode("utf-8")
+    assert "<a:t>a &amp; b &lt;c&gt; \"d\"</a:t></a:r></a:p><a:p/><a:p>" in xml
+    notes = [s.notes_slide.notes_text_frame.text for s in Presentation(path).slides]
+    assert notes == [s.get("notes", "") for s in SLIDES[:1]] + [NOTES] + [s.get("notes", "") for s in SLIDES[2:]]
+
+    slides = [dict(s, notes=NOTES) if i == 1 else s for i, s in enumerate(SLIDES)]
+    assert parts(path) == parts(build(slides, "fresh.pptx"))
+
+
+def test_unchanged_notes_leave_the_deck_alone(build):
+    path = build()
+    mtime = os.stat(path).st_mtime_ns
+    assert patch_notes(path, {4: SLIDES[3]["notes"]}) == []
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_unknown_slide(build):
+    with pytest.raises(NotesPatchError, match="no slide 9"):
+        patch_notes(build(), {9: "x"})
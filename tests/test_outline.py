@@ -0,0 +1,17 @@
+from deckgen.outline import outline
+
+from .conftest import SLIDES
+
+
+def test_outline_lists_titles_pictures_and_notes(build):
+    slides = outline(build())
+
+    assert [s.number for s in slides] == [1, 2, 3, 4, 5]
+    assert [s.part for s in slides] == ["ppt/slides/slide%d.xml" % n for n in range(1, 6)]
+    assert [s.title for s in slides] == [slide["title"] for slide in SLIDES]
+    assert [s.pictures for s in slides] == [1, 0, 0, 1, 0]
+    assert [s.notes for s in slides] == [slide.get("notes", "") for slide in SLIDES]
+
+
+def test_outline_of_a_streamed_deck_matches(build):
+    assert outline(build(stream=True)) == outline(build(name="engine.pptx"))
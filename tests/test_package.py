@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+import pytest
+
+from deckgen import package
+
+
+def _copy_all(src_path, monkeypatch, raw):
+    monkeypatch.setattr(package, "_RAW_WRITES", raw and package._RAW_WRITES)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(src_path) as src, zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as dst:
+        for name in src.namelist():
+            package.copy_entry(src, dst, name)
+    with zipfile.ZipFile(buf) as zf:
+        assert zf.testzip() is None
+        return [(info.filename, info.compress_type, zf.read(info)) for info in zf.infolist()]
+
+
+def test_raw_writes_checked_on_this_python():
+    assert package._RAW_WRITES
+
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_copy_entry_round_trips(build, monkeypatch, raw):
+    deck = build()
+    with zipfile.ZipFile(deck) as zf:
+        expected = [(info.filename, info.compress_type, zf.read(info)) for info in zf.infolist()]
+    assert _copy_all(deck, monkeypatch, raw) == expected
+
+
+def test_write_parts_keeps_order_and_a_bounded_window():
+    buf = io.BytesIO()
+    ahead = []
+    with zipfile.ZipFile(buf, "w") as dst:
+        def parts():
+            for i in range(40):
+                ahead.append(i - len(dst.filelist))
+                yield "ppt/slides/slide%d.xml" % i, "<p:sld>%d</p:sld>" % i
+
+        package.write_parts(dst, parts(), jobs=2)
+    with zipfile.ZipFile(buf) as zf:
+        assert zf.namelist() == ["ppt/slides/slide%d.xml" % i for i in range(40)]
+        assert zf.read("ppt/slides/slide7.xml") == b"<p:sld>7</p:sld>"
+    assert max(ahead) <= 4
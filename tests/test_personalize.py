@@ -0,0 +1,60 @@
+import pytest
+from pptx import Presentation
+
+from deckgen.personalize import PersonalizeError, load_presenters, output_name, personalize
+
+from .conftest import SLIDES, parts
+
+
+def _signatures(path):
+    """Non-empty lines of the last shape (the signature block) of the cover and closing slides."""
+    prs = Presentation(path)
+    return [[line for line in list(prs.slides[i].shapes)[-1].text_frame.text.split("\n") if line]
+            for i in (0, len(prs.slides) - 1)]
+
+
+def test_personalize_stamps_each_presenter(build, tmp_path):
+    deck = build()
+    presenters = [{"author": "张三"}, {"author": " 李四 ", "company": "天翼云湖南分公司", "output": "li.pptx"}]
+    written = personalize(deck, presenters, str(tmp_path / "out"))
+
+    assert [p.rsplit("/", 1)[-1] for p in written] == ["deck-张三.pptx", "li.pptx"]
+    assert _signatures(written[0]) == [["天翼云湖北分公司 作者", "张三"], ["天翼云湖北分公司", "张三"]]
+    assert _signatures(written[1]) == [["天翼云湖南分公司 作者", "李四"], ["天翼云湖南分公司", "李四"]]
+    props = Presentation(written[1]).core_properties
+    assert props.author == props.last_modified_by == "李四"
+    assert "<Company>天翼云湖南分公司</Company>" in parts(written[1])["docProps/app.xml"].decode("utf-8")
+
+    original = parts(deck)
+    stamped = parts(written[0])
+    assert sorted(stamped) == sorted(original)
+    assert sorted(n for n in original if original[n] != stamped[n]) == [
+        "docProps/app.xml", "docProps/core.xml", "ppt/slides/slide1.xml", "ppt/slides/slide5.xml"]
+
+
+def test_company_named_like_the_old_author_is_not_replaced_again(build, tmp_path):
+    written = personalize(build(), [{"author": "张三", "company": "王理"}], str(tmp_path / "out"))
+    assert _signatures(written[0]) == [["王理 作者", "张三"], ["王理", "张三"]]
+
+
+def test_deck_without_signature_is_rejected(build, tmp_path):
+    with pytest.raises(PersonalizeError, match="no signature block"):
+        personalize(build(SLIDES[1:2]), [{"author": "张三"}], str(tmp_path / "out"))
+
+
+def test_load_presenters(tmp_path):
+    csv_path = tmp_path / "presenters.csv"
+    csv_path.write_text("﻿author,company\n张三,\n李四,天翼云\n", encoding="utf-8")
+    assert load_presenters(str(csv_path)) == [{"author": "张三", "company": ""}, {"author": "李四", "company": "天翼云"}]
+
+    json_path = tmp_path / "presenters.json"
+    json_path.write_text('[{"author": "张三"}, {"company": "天翼云"}]', encoding="utf-8")
+    with pytest.raises(PersonalizeError, match="presenter 2 has no author"):
+        load_presenters(str(json_path))
+    json_path.write_text('{"author": "张三"}', encoding="utf-8")
+    with pytest.raises(PersonalizeError, match="expected a list"):
+        load_presenters(str(json_path))
+
+
+def test_output_name_replaces_unsafe_characters():
+    assert output_name("build/v10.pptx", " Li / Si ") == "v10-Li_Si.pptx"
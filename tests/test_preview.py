@@ -0,0 +1,30 @@
+import os
+
+from PIL import Image
+
+from deckgen.preview import render_deck, render_decks
+
+from .conftest import SLIDES
+
+
+def test_render_deck_writes_a_thumbnail_per_slide(build, tmp_path):
+    deck = build()
+    out_dir = str(tmp_path / "preview")
+    path, count, written = render_deck(deck, out_dir)
+
+    assert path == deck and count == len(SLIDES)
+    assert [os.path.basename(p) for p in written] == ["deck-%02d.png" % n for n in range(1, 6)] + ["deck-sheet.png"]
+    for thumb in written[:-1]:
+        with Image.open(thumb) as img:
+            assert img.size == (640, 360)
+            assert img.getpixel((2, 2)) == (15, 15, 25)
+    with Image.open(written[-1]) as sheet:
+        assert sheet.size == (12 + 5 * (320 + 12), 12 + 180 + 18 + 12)
+
+
+def test_render_decks_without_thumbnails(build, tmp_path):
+    decks = [build(name="a.pptx"), build(SLIDES[:2], name="b.pptx", theme="zoned")]
+    results = render_decks(decks, str(tmp_path / "preview"), jobs=1, width=320, thumbs=False)
+
+    assert [(count, [os.path.basename(p) for p in written]) for _, count, written in results] == [
+        (5, ["a-sheet.png"]), (2, ["b-sheet.png"])]
@@ -0,0 +1,34 @@
+import json
+import tracemalloc
+
+import pytest
+
+from deckgen.engine import BaseDeck
+
+from .conftest import SLIDES
+
+
+@pytest.mark.parametrize("stream", [False, True], ids=["engine", "stream"])
+def test_profiled_build_writes_a_trace(build, tmp_path, monkeypatch, stream):
+    trace = tmp_path / "trace.json"
+    monkeypatch.setenv("DECKGEN_PROFILE", str(trace))
+    build(stream=stream)
+
+    events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+    slides = [e["name"] for e in events if e["cat"] == "slide"]
+    assert slides == ["%s #%d" % (s["type"], n) for n, s in enumerate(SLIDES, 1)]
+    assert any(e["name"] == "save" for e in events)
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.parametrize("stream", [False, True], ids=["engine", "stream"])
+def test_failed_build_stops_tracemalloc(build, tmp_path, monkeypatch, stream):
+    def data_slide(self, *args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setenv("DECKGEN_PROFILE", str(tmp_path / "trace.json"))
+    monkeypatch.setattr(BaseDeck, "data_slide", data_slide)
+    with pytest.raises(RuntimeError, match="boom"):
+        build(stream=stream)
+    assert not tracemalloc.is_tracing()
+    assert not (tmp_path / "trace.json").exists()
@@ -0,0 +1,41 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from deckgen import server
+from deckgen.cli import main
+from deckgen.server import RenderService, make_server
+
+from .conftest import SLIDES
+
+
+@pytest.fixture(scope="module")
+def service():
+    return RenderService()
+
+
+def test_render_over_tcp(service, hero):
+    httpd = make_server(service, port=0, quiet=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection(*httpd.server_address)
+        spec = {"output": "x.pptx", "slides": SLIDES}
+        service.root = str(hero.parent)
+        conn.request("POST", "/render", json.dumps(spec), {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        body = response.read()
+        assert response.status == 200 and body[:2] == b"PK"
+        assert response.getheader("X-Slide-Count") == str(len(SLIDES))
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_socket_rejected_without_unix_sockets(service, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(server, "UNIX_SOCKETS", False)
+    with pytest.raises(ValueError):
+        make_server(service, socket_path=str(tmp_path / "d.sock"))
+    assert main(["serve", "--socket", str(tmp_path / "d.sock")]) == 1
+    assert "--port" in capsys.readouterr().err
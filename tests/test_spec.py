@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from deckgen.spec import SpecError, load_spec, parse_spec
+
+from .conftest import CHART, SLIDES
+
+
+def _parse(slides=None, **fields):
+    spec = dict({"output": "deck.pptx", "slides": SLIDES if slides is None else slides}, **fields)
+    return parse_spec(json.dumps(spec, ensure_ascii=False))
+
+
+def test_valid_spec():
+    assert _parse(SLIDES + [CHART], theme="zoned", images={"hero": "hero.png"})["theme"] == "zoned"
+
+
+def test_yaml_spec(tmp_path):
+    path = tmp_path / "deck.yaml"
+    path.write_text("output: deck.pptx\nslides:\n  - {type: content, title: 大纲, bullets: [一, '#二']}\n",
+                    encoding="utf-8")
+    spec = load_spec(str(path))
+    assert spec["slides"][0]["bullets"] == ["一", "#二"]
+    assert spec["_dir"] == str(tmp_path)
+
+
+@pytest.mark.parametrize("fields, message", [
+    ({"output": ""}, "missing 'output'"),
+    ({"theme": "neon"}, "unknown theme 'neon'"),
+    ({"slides": []}, "'slides' must be a non-empty list"),
+    ({"images": ["hero.png"]}, "'images' must map names to image paths"),
+    ({"images": {"hero": 1}}, "'images' must map names to image paths"),
+    ({"slides": [{"type": "poster"}]}, "slide 1: unknown type 'poster'"),
+    ({"slides": [{"type": "data", "title": "带宽"}]}, r"slide 1 \(data\): missing number, unit, explanation"),
+    ({"slides": [{"type": "closing", "title": "谢谢", "subtitle": "", "image": "x"}]}, "unknown field"),
+    ({"slides": [{"type": "content", "title": "大纲", "bullets": "一二三"}]}, "'bullets' must be a list of strings"),
+    ({"slides": [{"type": "split", "title": "架构", "bullets": ["一", 2]}]}, "'bullets' must be a list of strings"),
+    ({"slides": [dict(CHART, series={"TB/s": [1, 2]})]}, "needs one value per category"),
+    ({"slides": [dict(CHART, chart_type="radar")]}, "unknown chart_type 'radar'"),
+])
+def test_invalid_spec(fields, message):
+    with pytest.raises(SpecError, match=message):
+        _parse(**fields)
+
+
+def test_parse_errors():
+    with pytest.raises(SpecError, match="<spec>"):
+        parse_spec("{")
+    with pytest.raises(SpecError, match="top level must be a mapping"):
+        parse_spec("[]")
@@ -0,0 +1,25 @@
+import pytest
+
+from .conftest import CHART, SLIDES, parts
+
+
+def test_streamed_parts_match_engine(build):
+    slides = SLIDES + [CHART, dict(CHART, chart_type="pie")]
+    engine = parts(build(slides, name="engine.pptx"))
+    streamed = parts(build(slides, name="streamed.pptx", stream=True))
+
+    assert sorted(streamed) == sorted(engine)
+    differ = [name for name in engine if engine[name] != streamed[name] and name != "docProps/core.xml"
+              and not name.startswith("ppt/embeddings/")]
+    assert differ == []
+
+
+def test_streamed_chart_frame_declares_no_namespaces(build):
+    slide = parts(build([CHART], stream=True))["ppt/slides/slide1.xml"].decode("utf-8")
+    assert slide.count('xmlns:a="') == 1 and slide.count('xmlns:r="') == 1
+
+
+def test_empty_image_file_is_rejected(build, hero):
+    hero.write_bytes(b"")
+    with pytest.raises(ValueError, match="empty image file"):
+        build(SLIDES[3:4], stream=True)